@@ -0,0 +1,117 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Each measured configuration runs in its own spawned process, so RSS
+reflects that configuration alone and nothing is inherited by fork.
+Run scripts from the repository root, e.g.
+`python -m benchmarks.flat_vs_chroma`.
+"""
+import importlib.util
+import multiprocessing as mp
+import os
+import resource
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def rss_bytes() -> int:
+    """
+    Current resident set size; peak RSS where /proc is unavailable.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS.
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+
+
+def memory_breakdown() -> Dict[str, int]:
+    """
+    rss / pss / private bytes of this process (Linux only; rss elsewhere).
+    PSS splits shared pages between the processes mapping them, so it is
+    the fair per-worker cost when memory is shared.
+    """
+    fields = {"Rss": "rss", "Pss": "pss", "Private_Clean": "private", "Private_Dirty": "private"}
+    out = {"rss": 0, "pss": 0, "private": 0}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in fields:
+                    out[fields[key]] += int(rest.split()[0]) * 1024
+    except OSError:
+        rss = rss_bytes()
+        out = {"rss": rss, "pss": rss, "private": rss}
+    return out
+
+
+def _child(queue, fn, args) -> None:
+    try:
+        queue.put(("ok", fn(*args)))
+    except BaseException as exc:  # reported to the parent
+        queue.put(("error", f"{type(exc).__name__}: {exc}"))
+
+
+def run_isolated(fn: Callable, *args):
+    """
+    Runs `fn(*args)` in a fresh spawned process and returns its result.
+    `fn` must be a module-level function.
+    """
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_child, args=(queue, fn, args))
+    proc.start()
+    status, value = queue.get()
+    proc.join()
+    if status != "ok":
+        raise RuntimeError(value)
+    return value
+
+
+def latency_ms(fn: Callable, calls: List, warmup: int = 5) -> Dict[str, float]:
+    """
+    Calls `fn(arg)` for each arg; returns p50 / p95 / mean in milliseconds.
+    """
+    for arg in calls[:warmup]:
+        fn(arg)
+    times = []
+    for arg in calls:
+        start = time.perf_counter()
+        fn(arg)
+        times.append((time.perf_counter() - start) * 1000)
+    times = np.asarray(times)
+    return {
+        "p50": float(np.percentile(times, 50)),
+        "p95": float(np.percentile(times, 95)),
+        "mean": float(times.mean()),
+    }
+
+
+def unit_vectors(n: int, dim: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def mib(n: float) -> str:
+    return f"{n / (1024 * 1024):8.1f}"
+
+
+def print_table(headers: List[str], rows: List[List]) -> None:
+    cells = [headers] + [[str(c) for c in row] for row in rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(headers))]
+    for i, row in enumerate(cells):
+        print("  ".join(c.rjust(w) for c, w in zip(row, widths)))
+        if i == 0:
+            print("  ".join("-" * w for w in widths))
@@ -0,0 +1,84 @@
+"""
+Session encoding throughput: per-text `encode` loop vs `encode_many`.
+
+Encodes synthetic session texts of mixed length and reports
+sessions/sec for the former one-call-per-session loop, for
+`encode_many` at several batch sizes, and for `encode_many` with a
+thread pool. Each variant runs `--repeat` times; the best run counts.
+
+The default model is the offline hashing test model, which has no
+per-call overhead to amortize; pass `--model all-MiniLM-L6-v2` (needs
+sentence-transformers) to measure a real encoder.
+
+    python -m benchmarks.encode_throughput [--sessions 2000] [--model NAME]
+"""
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from benchmarks._common import print_table
+
+WORDS = (
+    "i feel tired again today work was long and my plan fell apart "
+    "sleep never comes easy why does everything keep going wrong "
+    "family dinner helped a little maybe tomorrow will be better"
+).split()
+
+
+def _texts(n: int, seed: int = 0) -> List[str]:
+    # Lengths from a sentence to a few paragraphs, like journal entries.
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choices(WORDS, k=rng.choice([8, 20, 60, 150, 300])))
+        for _ in range(n)
+    ]
+
+
+def _best_rate(fn: Callable[[], object], n: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return n / best
+
+
+def main() -> None:
+    from mindtrace.core.registry import TEST_MODEL_NAME, get_encoder
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--model", default=TEST_MODEL_NAME)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    encoder = get_encoder(args.model)
+    texts = _texts(args.sessions)
+    encoder.encode_many(texts[:64])  # warm up lazy model state
+
+    variants = [("encode loop", lambda: [encoder.encode(t) for t in texts])]
+    for size in args.batch_sizes:
+        variants.append((
+            f"encode_many(batch_size={size})",
+            lambda size=size: encoder.encode_many(texts, batch_size=size),
+        ))
+    variants.append((
+        f"encode_many(batch_size=64, workers={args.workers})",
+        lambda: encoder.encode_many(texts, batch_size=64, workers=args.workers),
+    ))
+
+    print(f"model={args.model} sessions={args.sessions}\n")
+    baseline = None
+    rows = []
+    for name, fn in variants:
+        rate = _best_rate(fn, len(texts), args.repeat)
+        baseline = baseline or rate
+        rows.append([name, f"{rate:,.0f}", f"{rate / baseline:.2f}x"])
+    print_table(["variant", "sessions/s", "vs loop"], rows)
+
+
+if __name__ == "__main__":
+    main()
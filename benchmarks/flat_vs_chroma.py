@@ -0,0 +1,123 @@
+"""
+Flat NumPy index vs Chroma: query latency and resident memory.
+
+For each backend and corpus size, one process builds a user's index
+from random unit vectors; a second, fresh process opens it from disk
+and runs single-query searches. Reported per configuration:
+
+- build_s:    time to upsert the corpus (batches of 5000);
+- import_mib: resident memory added by importing the backend;
+- open_ms:    opening the persisted index plus the first query;
+- p50 / p95:  single-query latency, top_k=5;
+- index_mib:  resident memory added by the open index after querying.
+
+Chroma rows are skipped when chromadb is not installed.
+
+    python -m benchmarks.flat_vs_chroma [--sizes 1000 10000 100000]
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks._common import (
+    has_module,
+    latency_ms,
+    mib,
+    print_table,
+    rss_bytes,
+    run_isolated,
+    unit_vectors,
+)
+
+USER_ID = "bench"
+BATCH = 5000
+
+
+def _store(backend: str, persist_dir: str, dtype: str):
+    from mindtrace.nlp.quantization import EmbeddingCodec
+    from mindtrace.storage.vector_store import create_vector_store
+
+    codec = EmbeddingCodec(dtype) if dtype != "float32" else None
+    return create_vector_store(backend, persist_dir=persist_dir, codec=codec)
+
+
+def _build(backend: str, persist_dir: str, n: int, dim: int, dtype: str) -> float:
+    vectors = unit_vectors(n, dim)
+    store = _store(backend, persist_dir, dtype)
+    start = time.perf_counter()
+    for i in range(0, n, BATCH):
+        ids = [f"s{j}" for j in range(i, min(i + BATCH, n))]
+        store.upsert_sessions(
+            USER_ID,
+            ids=ids,
+            embeddings=vectors[i:i + len(ids)].tolist(),
+            texts=[f"session {sid}" for sid in ids],
+            metadatas=[{"n": j} for j in range(i, i + len(ids))],
+        )
+    return time.perf_counter() - start
+
+
+def _measure(backend: str, persist_dir: str, dim: int, queries: int, dtype: str) -> dict:
+    probes = unit_vectors(queries, dim, seed=1).tolist()
+
+    before_import = rss_bytes()
+    import mindtrace.storage.vector_store  # noqa: F401
+    if backend == "chroma":
+        import chromadb  # noqa: F401
+    else:
+        import mindtrace.storage.flat_index  # noqa: F401
+    baseline = rss_bytes()
+
+    start = time.perf_counter()
+    store = _store(backend, persist_dir, dtype)
+    store.query_similar_sessions(USER_ID, probes[0], top_k=5)
+    open_ms = (time.perf_counter() - start) * 1000
+
+    latency = latency_ms(
+        lambda q: store.query_similar_sessions(USER_ID, q, top_k=5), probes
+    )
+    return {
+        "import": baseline - before_import,
+        "open_ms": open_ms,
+        "index": rss_bytes() - baseline,
+        **latency,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument(
+        "--flat-dtype", default="float32", choices=["float32", "float16", "int8"],
+        help="storage dtype for the flat index (Chroma always stores float32)",
+    )
+    args = parser.parse_args()
+
+    backends = ["flat"]
+    if has_module("chromadb"):
+        backends.append("chroma")
+    else:
+        print("chromadb is not installed; Chroma rows are skipped.\n")
+
+    rows = []
+    for n in args.sizes:
+        for backend in backends:
+            dtype = args.flat_dtype if backend == "flat" else "float32"
+            with tempfile.TemporaryDirectory() as persist_dir:
+                build_s = run_isolated(_build, backend, persist_dir, n, args.dim, dtype)
+                r = run_isolated(_measure, backend, persist_dir, args.dim, args.queries, dtype)
+            label = backend if backend == "chroma" else f"flat/{dtype}"
+            rows.append([
+                label, n, f"{build_s:.2f}", mib(r["import"]).strip(), f"{r['open_ms']:.1f}",
+                f"{r['p50']:.3f}", f"{r['p95']:.3f}", mib(r["index"]).strip(),
+            ])
+    print_table(
+        ["backend", "vectors", "build_s", "import_mib", "open_ms", "p50_ms", "p95_ms", "index_mib"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
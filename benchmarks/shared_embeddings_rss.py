@@ -0,0 +1,100 @@
+"""
+Per-worker memory with and without shared embedding matrices.
+
+The parent publishes one matrix; `--workers` spawned processes then
+each get it either
+
+- private: `np.load` into their own memory (a copy per worker, as
+  when every worker loads the same users' vectors), or
+- shared:  `shared_embeddings()`, mapping the published generation
+  read-only,
+
+score every row once, and read their memory while all of them are
+alive. Reported per worker, as growth over its pre-load baseline:
+RSS, PSS (shared pages split between the processes mapping them) and
+private bytes. PSS and private need Linux; elsewhere all three are RSS.
+
+    python -m benchmarks.shared_embeddings_rss [--rows 100000] [--workers 4]
+"""
+import argparse
+import json
+import multiprocessing as mp
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks._common import memory_breakdown, mib, print_table, unit_vectors
+
+NAME = "bench"
+
+
+def _worker(mode: str, path: str, barrier, queue) -> None:
+    from mindtrace.nlp.embeddings import EmbeddingMatrix
+    from mindtrace.storage.shared_embeddings import shared_embeddings
+
+    before = memory_breakdown()
+    if mode == "shared":
+        embeddings = shared_embeddings(NAME, Path(path))
+    else:
+        generation = Path(path) / NAME / "gen-0"
+        embeddings = EmbeddingMatrix(
+            np.load(f"{generation}.npy"),
+            json.loads(Path(f"{generation}.ids.json").read_text(encoding="utf-8")),
+        )
+    # Touch every row, as a scoring pass would.
+    float((embeddings.matrix @ embeddings.matrix[0]).sum())
+
+    barrier.wait()
+    after = memory_breakdown()
+    queue.put({k: after[k] - before[k] for k in after})
+    barrier.wait()
+
+
+def _run(mode: str, path: str, workers: int) -> list:
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    queue = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(mode, path, barrier, queue))
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return results
+
+
+def main() -> None:
+    from mindtrace.nlp.embeddings import EmbeddingMatrix
+    from mindtrace.storage.shared_embeddings import publish_embeddings
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        ids = [f"s{i}" for i in range(args.rows)]
+        publish_embeddings(NAME, EmbeddingMatrix(unit_vectors(args.rows, args.dim), ids), Path(path))
+
+        matrix_bytes = args.rows * args.dim * 4
+        print(f"rows={args.rows} dim={args.dim} matrix={mib(matrix_bytes).strip()} MiB "
+              f"workers={args.workers}\n")
+
+        rows = []
+        for mode in ("private", "shared"):
+            results = _run(mode, path, args.workers)
+            mean = {k: sum(r[k] for r in results) / len(results) for k in results[0]}
+            rows.append([
+                mode, mib(mean["rss"]).strip(), mib(mean["pss"]).strip(),
+                mib(mean["private"]).strip(), mib(mean["pss"] * args.workers).strip(),
+            ])
+        print_table(["mode", "rss_mib", "pss_mib", "private_mib", "total_pss_mib"], rows)
+
+
+if __name__ == "__main__":
+    main()
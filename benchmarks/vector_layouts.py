@@ -0,0 +1,111 @@
+"""
+Chroma layouts: one collection per user vs one shared collection.
+
+For each layout and user count, one process writes `--sessions`
+records per user; a fresh process then opens the store and queries.
+Reported per configuration:
+
+- build_s:    time to write every user's records;
+- startup_ms: client construction plus the first user's first query;
+- rss_mib:    resident memory after querying `--touch` distinct users;
+- p50 / p95:  single-query latency, top_k=5, across random users.
+
+The flat backend has no shared mode, so it is not part of this
+comparison; see `benchmarks.flat_vs_chroma`.
+
+    python -m benchmarks.vector_layouts [--users 10 100 1000]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks._common import (
+    has_module,
+    latency_ms,
+    mib,
+    print_table,
+    rss_bytes,
+    run_isolated,
+    unit_vectors,
+)
+
+
+def _store(persist_dir: str, shared: bool):
+    from mindtrace.storage.vector_store import MindTraceVectorStore
+
+    return MindTraceVectorStore(persist_dir=persist_dir, shared_collection=shared)
+
+
+def _build(persist_dir: str, shared: bool, users: int, sessions: int, dim: int) -> float:
+    vectors = unit_vectors(users * sessions, dim)
+    store = _store(persist_dir, shared)
+    start = time.perf_counter()
+    for u in range(users):
+        rows = vectors[u * sessions:(u + 1) * sessions]
+        ids = [f"s{i}" for i in range(sessions)]
+        store.upsert_sessions(
+            f"user{u}",
+            ids=ids,
+            embeddings=rows.tolist(),
+            texts=[f"session {sid}" for sid in ids],
+            metadatas=[{"n": i} for i in range(sessions)],
+        )
+    return time.perf_counter() - start
+
+
+def _measure(persist_dir: str, shared: bool, users: int, dim: int, touch: int, queries: int) -> dict:
+    import chromadb  # noqa: F401  (import cost is the same for both layouts)
+
+    rng = random.Random(0)
+    probes = unit_vectors(queries, dim, seed=1).tolist()
+    baseline = rss_bytes()
+
+    start = time.perf_counter()
+    store = _store(persist_dir, shared)
+    store.query_similar_sessions("user0", probes[0], top_k=5)
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    for u in rng.sample(range(users), min(touch, users)):
+        store.query_similar_sessions(f"user{u}", probes[0], top_k=5)
+    rss = rss_bytes() - baseline
+
+    calls = [(f"user{rng.randrange(users)}", q) for q in probes]
+    latency = latency_ms(
+        lambda call: store.query_similar_sessions(call[0], call[1], top_k=5), calls
+    )
+    return {"startup_ms": startup_ms, "rss": rss, **latency}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--sessions", type=int, default=20, help="records per user")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--touch", type=int, default=100, help="users queried before RSS is read")
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    if not has_module("chromadb"):
+        print("chromadb is not installed; nothing to compare.")
+        sys.exit(0)
+
+    rows = []
+    for users in args.users:
+        for shared in (False, True):
+            with tempfile.TemporaryDirectory() as persist_dir:
+                build_s = run_isolated(_build, persist_dir, shared, users, args.sessions, args.dim)
+                r = run_isolated(
+                    _measure, persist_dir, shared, users, args.dim, args.touch, args.queries
+                )
+            rows.append([
+                "shared" if shared else "per-user", users, f"{build_s:.2f}",
+                f"{r['startup_ms']:.1f}", mib(r["rss"]).strip(),
+                f"{r['p50']:.3f}", f"{r['p95']:.3f}",
+            ])
+    print_table(["layout", "users", "build_s", "startup_ms", "rss_mib", "p50_ms", "p95_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional, Union
 from collections import defaultdict
 from datetime import timedelta
 from mindtrace.core.types import Session
 from mindtrace.nlp.features import extract_features
-from mindtrace.nlp.embeddings import cosine_similarity
+from mindtrace.nlp.embeddings import (
+    EmbeddingMatrix,
+    as_embedding_matrix,
+    mean_pairwise_cosine,
+    normalize_rows,
+)
 from mindtrace.core.observation import Observation
 from mindtrace.core.schemas.render_payload import RenderPayload
 
@@ -15,10 +20,11 @@ MIN_FEATURE_SIGNALS = 2       # number of feature deltas required
 DELTA_THRESHOLD = 0.05        # per-feature significance threshold
 
 
-def _group_by_confirmed_tag(sessions: List[Session]) -> Dict[str, List[Session]]:
+def _group_by_confirmed_tag(sessions: Iterable[Session]) -> Dict[str, List[Session]]:
     """
     Groups sessions by user-confirmed tags.
     Sessions with multiple tags appear in multiple groups.
+    Consumes `sessions` in a single pass, so a lazy iterator works.
     """
     buckets: Dict[str, List[Session]] = defaultdict(list)
     for s in sessions:
@@ -34,21 +40,17 @@ def _group_by_confirmed_tag(sessions: List[Session]) -> Dict[str, List[Session]]
 
 def _average_coherence(
     sessions: List[Session],
-    embeddings: Dict[str, list],
+    embeddings: Union[EmbeddingMatrix, Dict[str, list]],
 ) -> float:
     """
     Computes average pairwise cosine similarity across a chain.
+    The chain is gathered into one normalized matrix and reduced in
+    closed form from its sum vector, so cost is O(n*d), not O(n^2).
     """
-    sims = []
-    for i, s1 in enumerate(sessions):
-        for s2 in sessions[i + 1:]:
-            sims.append(
-                cosine_similarity(
-                    embeddings[s1.session_id],
-                    embeddings[s2.session_id],
-                )
-            )
-    return sum(sims) / len(sims) if sims else 0.0
+    if len(sessions) < 2:
+        return 0.0
+    rows = as_embedding_matrix(embeddings).take([s.session_id for s in sessions])
+    return mean_pairwise_cosine(normalize_rows(rows))
 
 
 def _feature_drift(
@@ -58,9 +60,13 @@ def _feature_drift(
     """
     Computes feature deltas between first and last session only.
     """
-    f_start = extract_features(start_text)
-    f_end = extract_features(end_text)
+    return _feature_deltas(extract_features(start_text), extract_features(end_text))
 
+
+def _feature_deltas(
+    f_start: Dict[str, float],
+    f_end: Dict[str, float],
+) -> Dict[str, float]:
     deltas = {}
     for k in f_start.keys() & f_end.keys():
         delta = f_end[k] - f_start[k]
@@ -81,9 +87,25 @@ def compute_confidence(chain_length: int, coherence: float) -> float:
 
     return round(min(1.0, base + length_bonus + coherence_bonus), 2)
 
+def _chain_observation(
+    tag: str,
+    session_ids: List[str],
+    coherence: float,
+    deltas: Dict[str, float],
+) -> Observation:
+    confidence = compute_confidence(len(session_ids), coherence)
+    return Observation(
+        type="recurring_chain",
+        tag=tag,
+        session_ids=session_ids,
+        coherence=round(coherence, 3),
+        signals=deltas,
+        confidence=confidence,
+    )
+
 def aggregate_patterns(
-    sessions: List[Session],
-    embeddings: Dict[str, list],
+    sessions: Iterable[Session],
+    embeddings: Union[EmbeddingMatrix, Dict[str, list]],
 ) -> List[dict]:
     """
     Produces chain-based observations:
@@ -94,6 +116,8 @@ def aggregate_patterns(
     """
     observations = []
 
+    # Dict input is packed once here, not per chain.
+    embeddings = as_embedding_matrix(embeddings)
     by_tag = _group_by_confirmed_tag(sessions)
 
     for tag, chain in by_tag.items():
@@ -108,16 +132,8 @@ def aggregate_patterns(
         if len(deltas) < MIN_FEATURE_SIGNALS:
             continue
         
-        confidence = compute_confidence(len(chain) ,coherence)
         observations.append(
-            Observation(
-                type="recurring_chain",
-                tag=tag,
-                session_ids=[s.session_id for s in chain],
-                coherence=round(coherence, 3),
-                signals=deltas,
-                confidence=confidence,
-            )
+            _chain_observation(tag, [s.session_id for s in chain], coherence, deltas)
         )
 
 
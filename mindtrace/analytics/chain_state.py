@@ -0,0 +1,369 @@
+import bisect
+import json
+import os
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from mindtrace.analytics.aggregator import (
+    MIN_AVG_COHERENCE,
+    MIN_CHAIN_LENGTH,
+    MIN_FEATURE_SIGNALS,
+    _chain_observation,
+    _feature_deltas,
+    _group_by_confirmed_tag,
+)
+from mindtrace.core.observation import Observation
+from mindtrace.core.types import Session
+from mindtrace.nlp.embeddings import (
+    EmbeddingMatrix,
+    coherence_from_sum,
+    fixed_point_rows,
+    normalize_rows,
+)
+from mindtrace.nlp.features import extract_features
+from mindtrace.storage.session_store import DATA_DIR, user_path_name
+
+CHAIN_STATE_DIR = DATA_DIR / "chain_state"
+CHAIN_STATE_VERSION = 1
+
+
+def _embedding_row(embedding) -> Tuple[np.ndarray, bool]:
+    """
+    A session's fixed-point unit row, and whether it is non-zero.
+    Goes through the same helpers as the batch path, from the same
+    float32 values that `aggregate_patterns` packs dict inputs into.
+    """
+    vector = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+    unit = normalize_rows(vector)
+    return fixed_point_rows(unit)[0], bool(unit.any())
+
+
+@dataclass
+class ChainState:
+    """
+    Running state of one tag chain.
+
+    Holds the chronological session list, the fixed-point sum of unit
+    embeddings (so mean pairwise coherence is O(d) per update) and each
+    member's text features (so the first/last drift survives removals).
+    """
+    tag: str
+    session_ids: List[str] = field(default_factory=list)
+    # Sort keys: (started_at, arrival order in the store), matching the
+    # batch path's stable sort over sessions in store order.
+    keys: List[Tuple[datetime, int]] = field(default_factory=list)
+    total: Optional[np.ndarray] = None
+    nonzero: int = 0
+    features: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    observation: Optional[Observation] = None
+
+    def __len__(self) -> int:
+        return len(self.session_ids)
+
+    def add(
+        self,
+        session: Session,
+        seq: int,
+        row: np.ndarray,
+        nonzero: bool,
+        features: Dict[str, float],
+    ) -> bool:
+        if session.session_id in self.features:
+            return False
+
+        key = (session.started_at, seq)
+        pos = bisect.bisect_right(self.keys, key)
+        self.keys.insert(pos, key)
+        self.session_ids.insert(pos, session.session_id)
+
+        self.total = row.copy() if self.total is None else self.total + row
+        self.nonzero += int(nonzero)
+        self.features[session.session_id] = features
+        return True
+
+    def remove(self, session_id: str, row: np.ndarray, nonzero: bool) -> bool:
+        if session_id not in self.features:
+            return False
+
+        pos = self.session_ids.index(session_id)
+        del self.session_ids[pos]
+        del self.keys[pos]
+        self.total = self.total - row
+        self.nonzero -= int(nonzero)
+        del self.features[session_id]
+        return True
+
+    def evaluate(self) -> Optional[Observation]:
+        """
+        Same checks, in the same order, as `aggregate_patterns`.
+        """
+        self.observation = None
+        n = len(self.session_ids)
+        if n < MIN_CHAIN_LENGTH:
+            return None
+
+        coherence = coherence_from_sum(self.total, n, self.nonzero)
+        if coherence < MIN_AVG_COHERENCE:
+            return None
+
+        deltas = _feature_deltas(
+            self.features[self.session_ids[0]],
+            self.features[self.session_ids[-1]],
+        )
+        if len(deltas) < MIN_FEATURE_SIGNALS:
+            return None
+
+        self.observation = _chain_observation(self.tag, list(self.session_ids), coherence, deltas)
+        return self.observation
+
+    # -------- Persistence --------
+
+    def to_dict(self) -> dict:
+        return {
+            "tag": self.tag,
+            "session_ids": self.session_ids,
+            "keys": [[started.isoformat(), seq] for started, seq in self.keys],
+            "total": self.total.tolist() if self.total is not None else None,
+            "nonzero": self.nonzero,
+            "features": self.features,
+            "observation": asdict(self.observation) if self.observation else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ChainState":
+        return cls(
+            tag=data["tag"],
+            session_ids=list(data["session_ids"]),
+            keys=[(datetime.fromisoformat(started), seq) for started, seq in data["keys"]],
+            total=np.array(data["total"], dtype=np.int64) if data["total"] is not None else None,
+            nonzero=data["nonzero"],
+            features=data["features"],
+            observation=Observation(**data["observation"]) if data["observation"] else None,
+        )
+
+
+class ChainStateStore:
+    """
+    Persisted per-(user, tag) chain states.
+
+    Adding a session, or changing its tags, touches only the chains of
+    the tags involved, in O(d) each (plus the feature extraction of that
+    one session). Observations equal what `aggregate_patterns` returns
+    for the same sessions and embeddings: sums are exact fixed-point
+    integers, so update order never changes a result.
+
+    `sync` is the entry point for callers that hold the full session
+    list (`run_mindtrace_pipeline`, `analyze_sessions`): it folds in
+    only what changed since the last call.
+    """
+
+    def __init__(self, user_id: Optional[str] = None, path: Path = CHAIN_STATE_DIR):
+        self.user_id = user_id
+        name = user_path_name(user_id) if user_id is not None else "_all"
+        self.path = Path(path) / f"{name}.json"
+        self.chains: Dict[str, ChainState] = {}
+        # Arrival order of every session seen, the tie-break for equal
+        # started_at.
+        self.arrival: Dict[str, int] = {}
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data.get("version") != CHAIN_STATE_VERSION:
+            raise ValueError(f"Unsupported chain state version: {data.get('version')}")
+        self.chains = {c["tag"]: ChainState.from_dict(c) for c in data["chains"]}
+        self.arrival = data["arrival"]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(
+            json.dumps({
+                "version": CHAIN_STATE_VERSION,
+                "chains": [c.to_dict() for c in self.chains.values()],
+                "arrival": self.arrival,
+            }),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+
+    # -------- Updates --------
+
+    def _add(self, session: Session, tags, row, nonzero, features) -> List[str]:
+        seq = self.arrival.setdefault(session.session_id, len(self.arrival))
+        touched = []
+        for tag in tags:
+            chain = self.chains.get(tag)
+            if chain is None:
+                chain = self.chains[tag] = ChainState(tag=tag)
+            if chain.add(session, seq, row, nonzero, features):
+                touched.append(tag)
+        return touched
+
+    def _remove(self, session_id: str, tags, row, nonzero) -> List[str]:
+        touched = []
+        for tag in tags:
+            chain = self.chains.get(tag)
+            if chain is not None and chain.remove(session_id, row, nonzero):
+                touched.append(tag)
+                if not chain:
+                    del self.chains[tag]
+        return touched
+
+    def _evaluate(self, tags: List[str]) -> List[Observation]:
+        return [
+            obs for obs in (self.chains[t].evaluate() for t in tags if t in self.chains)
+            if obs is not None
+        ]
+
+    def add_session(self, session: Session, embedding) -> List[Observation]:
+        """
+        Folds a new session into the chains of its confirmed tags.
+        Returns the current observations of the chains it touched.
+        """
+        self.arrival.setdefault(session.session_id, len(self.arrival))
+        if not session.confirmed_tags:
+            return []
+        row, nonzero = _embedding_row(embedding)
+        touched = self._add(
+            session, session.confirmed_tags, row, nonzero, extract_features(session.text)
+        )
+        return self._evaluate(touched)
+
+    def update_tags(self, session: Session, embedding, tags: List[str]) -> List[Observation]:
+        """
+        Applies a tag confirmation change: `session.confirmed_tags` are
+        the tags it had, `tags` the ones it has now.
+        """
+        old, new = set(session.confirmed_tags), set(tags)
+        row, nonzero = _embedding_row(embedding)
+        touched = self._remove(
+            session.session_id, [t for t in session.confirmed_tags if t not in new], row, nonzero
+        )
+        added = [t for t in tags if t not in old]
+        if added:
+            touched += self._add(session, added, row, nonzero, extract_features(session.text))
+        return self._evaluate(touched)
+
+    def remove_session(self, session: Session, embedding) -> List[Observation]:
+        row, nonzero = _embedding_row(embedding)
+        return self._evaluate(
+            self._remove(session.session_id, session.confirmed_tags, row, nonzero)
+        )
+
+    def rebuild(
+        self,
+        sessions: List[Session],
+        embeddings: Union[EmbeddingMatrix, Dict[str, list]],
+    ) -> List[Observation]:
+        """
+        Recomputes every chain from scratch, e.g. to seed the state.
+        """
+        sessions = list(sessions)
+        self.chains = {}
+        self.arrival = {}
+        for s in sessions:
+            self.arrival.setdefault(s.session_id, len(self.arrival))
+
+        features: Dict[str, Dict[str, float]] = {}
+        for tag, chain in _group_by_confirmed_tag(sessions).items():
+            state = self.chains[tag] = ChainState(tag=tag)
+            for s in chain:
+                row, nonzero = _embedding_row(embeddings[s.session_id])
+                if s.session_id not in features:
+                    features[s.session_id] = extract_features(s.text)
+                state.add(s, self.arrival[s.session_id], row, nonzero, features[s.session_id])
+        return self._evaluate(list(self.chains))
+
+    def sync(
+        self,
+        sessions: Iterable[Session],
+        embeddings: Union[EmbeddingMatrix, Dict[str, list]],
+    ) -> List[Observation]:
+        """
+        Brings the state in line with `sessions` (in store order) and
+        returns what `aggregate_patterns(sessions, embeddings)` would.
+
+        Only new sessions, sessions whose tags changed and tracked
+        sessions no longer listed are processed; sessions are otherwise
+        matched by id, so edits to their text or times need `rebuild`.
+        Falls back to `rebuild` when the order disagrees with the order
+        sessions were first seen in, or a dropped session's embedding
+        is no longer available.
+        """
+        sessions = list(sessions)
+        if not self._apply_changes(sessions, embeddings):
+            self.rebuild(sessions, embeddings)
+
+        # aggregate_patterns reports tags in order of first appearance.
+        tags = dict.fromkeys(t for s in sessions for t in s.confirmed_tags)
+        return [
+            self.chains[t].observation for t in tags
+            if t in self.chains and self.chains[t].observation is not None
+        ]
+
+    def _apply_changes(self, sessions: List[Session], embeddings) -> bool:
+        """
+        The incremental part of `sync`; False (with nothing changed)
+        when a rebuild is needed instead.
+        """
+        tracked = self._tracked_tags()
+
+        next_seq, last = len(self.arrival), -1
+        listed: Set[str] = set()
+        for s in sessions:
+            seq = self.arrival.get(s.session_id)
+            if seq is None:
+                seq, next_seq = next_seq, next_seq + 1
+            if seq <= last:
+                return False
+            last = seq
+            listed.add(s.session_id)
+
+        dropped = [sid for sid in tracked if sid not in listed]
+        if any(sid not in embeddings for sid in dropped):
+            return False
+
+        touched: Set[str] = set()
+        for sid in dropped:
+            row, nonzero = _embedding_row(embeddings[sid])
+            touched.update(self._remove(sid, tracked[sid], row, nonzero))
+        self._evaluate(list(touched))
+        for s in sessions:
+            old = tracked.get(s.session_id, set())
+            if set(s.confirmed_tags) == old:
+                self.arrival.setdefault(s.session_id, len(self.arrival))
+            elif old:
+                self.update_tags(
+                    replace(s, confirmed_tags=sorted(old)),
+                    embeddings[s.session_id],
+                    s.confirmed_tags,
+                )
+            else:
+                self.add_session(s, embeddings[s.session_id])
+        return True
+
+    def tracked_session_ids(self) -> Set[str]:
+        """
+        Sessions currently in some chain; `sync` needs their embeddings
+        if they are untagged or dropped.
+        """
+        return set(self._tracked_tags())
+
+    def _tracked_tags(self) -> Dict[str, Set[str]]:
+        tags: Dict[str, Set[str]] = {}
+        for tag, chain in self.chains.items():
+            for sid in chain.session_ids:
+                tags.setdefault(sid, set()).add(tag)
+        return tags
+
+    # -------- Read --------
+
+    def observations(self) -> List[Observation]:
+        return [c.observation for c in self.chains.values() if c.observation is not None]
@@ -1,8 +1,8 @@
-from typing import List
-from sentence_transformers import SentenceTransformer
+from typing import Dict, List, Optional
 
-from mindtrace.storage.vector_store import MindTraceVectorStore
-from mindtrace.storage.session_store import load_sessions
+from mindtrace.core.registry import get_encoder, get_vector_store
+from mindtrace.storage.vector_store import session_from_hit
+from mindtrace.storage.session_store import get_sessions_by_ids
 from mindtrace.core.types import Session
 
 
@@ -10,24 +10,31 @@ def retrieve_candidate_sessions(
     user_id: str,
     query_text: str,
     top_k: int = 10,
+    where: Optional[Dict] = None,
 ) -> List[Session]:
     """
     Retrieve candidate sessions using semantic similarity.
     This does NOT perform any reasoning or aggregation.
     """
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    vector_store = MindTraceVectorStore()
+    # Loaded once per process and reused; see core.registry.warm_up.
+    encoder = get_encoder()
+    vector_store = get_vector_store()
 
-    query_embedding = model.encode(query_text).tolist()
+    query_embedding = encoder.encode(query_text).tolist()
 
-    session_ids = vector_store.query_similar_sessions(
+    hits = vector_store.query_similar_sessions_batch(
         user_id=user_id,
-        query_embedding=query_embedding,
+        query_embeddings=[query_embedding],
         top_k=top_k,
-    )
+        where=where,
+        include_documents=True,
+    )[0]
 
-    # Load full sessions from factual store
-    all_sessions = load_sessions()
-    session_map = {s.session_id: s for s in all_sessions}
+    # Hits stored with `session_metadata` rebuild without touching disk;
+    # only older entries fall back to the factual store.
+    resolved = {h.session_id: session_from_hit(h) for h in hits}
+    missing = [sid for sid, s in resolved.items() if s is None]
+    if missing:
+        resolved.update((s.session_id, s) for s in get_sessions_by_ids(missing))
 
-    return [session_map[sid] for sid in session_ids if sid in session_map]
+    return [resolved[h.session_id] for h in hits if resolved.get(h.session_id)]
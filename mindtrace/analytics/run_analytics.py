@@ -1,20 +1,41 @@
-from typing import List
+from typing import Iterable
 from mindtrace.core.types import Session
-from mindtrace.nlp.embeddings import EmbeddingEncoder
+from mindtrace.nlp.embeddings import EmbeddingEncoder, EmbeddingMatrix
 from mindtrace.analytics.aggregator import aggregate_patterns
 
 def analyze_sessions(
-    sessions: List[Session],
-    embedding_model
+    sessions: Iterable[Session],
+    embedding_model,
+    embedding_cache=None,
+    model_name=None,
+    chain_state=None,
 ):
-    encoder = EmbeddingEncoder(embedding_model)
+    # With an EmbeddingCache, repeat runs only embed sessions not seen before.
+    encoder = EmbeddingEncoder(
+        embedding_model,
+        cache=embedding_cache,
+        model_name=model_name,
+    )
+
+    # Single pass over the source, so `iter_sessions()` can be passed
+    # directly. Untagged sessions never join a chain, so only tagged
+    # ones are kept and embedded, plus, with a chain state, the ones
+    # it still tracks (untagging them must leave their chains).
+    tracked = chain_state.tracked_session_ids() if chain_state is not None else ()
+    tagged = [s for s in sessions if s.confirmed_tags or s.session_id in tracked]
+
+    # One batched call into one float32 matrix, indexed without copying.
+    embeddings = EmbeddingMatrix(
+        encoder.encode_many([s.text for s in tagged]),
+        [s.session_id for s in tagged],
+    )
 
-    embeddings = {
-        s.session_id: encoder.encode(s.text)
-        for s in sessions
-    }
+    # With a ChainStateStore, only changed sessions are processed; the
+    # caller decides when to save() it.
+    if chain_state is not None:
+        return chain_state.sync(tagged, embeddings)
 
     return aggregate_patterns(
-        sessions=sessions,
+        sessions=tagged,
         embeddings=embeddings
     )
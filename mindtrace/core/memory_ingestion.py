@@ -5,6 +5,8 @@ from mindtrace.core.memory_schemas import (
     EpisodicMemory,
     BehavioralMemory,
 )
+from mindtrace.core.repetition import RepetitionTracker, get_repetition_tracker
+from mindtrace.nlp.text_analyzer import analyze_text
 
 
 class MemoryIngestor:
@@ -12,8 +14,18 @@ class MemoryIngestor:
     Handles ingestion of raw user input into structured memory.
     """
 
-    def __init__(self, user_id: UUID):
+    def __init__(
+        self,
+        user_id: UUID,
+        encoder=None,
+        repetition_tracker: RepetitionTracker | None = None,
+    ):
         self.user_id = user_id
+        # Defaults to the process-wide encoder (core.registry). Servers
+        # should load it with registry.warm_up() at startup; otherwise
+        # the first ingest loads it.
+        self._encoder = encoder
+        self.repetition_tracker = repetition_tracker or get_repetition_tracker()
 
     # -------------------------------------------------
     # Public API
@@ -52,10 +64,10 @@ class MemoryIngestor:
         These are placeholders and will be replaced by ML later.
         """
 
-        text = episodic.text.lower()
+        text = episodic.text
 
         sentiment_score = self._naive_sentiment(text)
-        repetition_score = 0.0  # placeholder (embedding later)
+        repetition_score = self._repetition_score(text)
         absolutist_language = self._detect_absolutist_language(text)
         time_bucket = self._time_bucket(episodic.timestamp)
 
@@ -77,23 +89,26 @@ class MemoryIngestor:
         """
         Extremely naive sentiment approximation.
         This exists ONLY to wire the pipeline.
+        Lexicon words match whole tokens (see nlp.text_analyzer).
         """
-        negative_words = ["bad", "stuck", "tired", "hate", "nothing"]
-        positive_words = ["good", "better", "calm", "happy", "progress"]
+        return analyze_text(text).sentiment_score
 
-        score = 0.0
-        for w in negative_words:
-            if w in text:
-                score -= 0.2
-        for w in positive_words:
-            if w in text:
-                score += 0.2
+    def _repetition_score(self, text: str) -> float:
+        """
+        Similarity of this entry to the user's recent entries (0-1).
+        0.0 when no embedding model can be loaded (e.g. offline).
+        """
+        if self._encoder is None:
+            from mindtrace.core.registry import try_get_encoder
 
-        return max(min(score, 1.0), -1.0)
+            encoder = try_get_encoder()
+            if encoder is None:
+                return 0.0
+            self._encoder = encoder
+        return self.repetition_tracker.score(self.user_id, self._encoder.encode(text))
 
     def _detect_absolutist_language(self, text: str) -> bool:
-        absolutist_terms = ["always", "never", "nothing", "everything"]
-        return any(term in text for term in absolutist_terms)
+        return analyze_text(text).absolutist
 
     def _time_bucket(self, timestamp: datetime) -> str:
         hour = timestamp.hour
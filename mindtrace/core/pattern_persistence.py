@@ -1,8 +1,54 @@
 from datetime import datetime , UTC
-from typing import List 
+from typing import Dict, List, Tuple
 from mindtrace.core.memory_schemas import CognitivePattern
 from mindtrace.core.patterns import PatternResult
 
+PATTERN_DESCRIPTIONS = {
+    "spiral": "Sustained repetitive cognitive patterns detected over time.",
+    "rumination": "Repetitive negative thought loops with low emotional resolution.",
+}
+
+
+def detected_pattern_types(pattern_result: PatternResult) -> List[str]:
+    """
+    Long-term pattern types a PatternResult reports, in upsert order.
+    """
+    types = []
+    if pattern_result.spiral_detected:
+        types.append("spiral")
+    if pattern_result.rumination_detected:
+        types.append("rumination")
+    return types
+
+
+def upsert_pattern(
+    index: Dict[str, CognitivePattern],
+    user_id,
+    pattern_type: str,
+    recurrence_level: str,
+    now: datetime,
+) -> Tuple[CognitivePattern, bool]:
+    """
+    Refreshes the pattern of `pattern_type` in `index` (pattern_type ->
+    pattern), creating it if missing. Returns (pattern, created).
+    """
+    pattern = index.get(pattern_type)
+    if pattern is not None:
+        pattern.last_detected = now
+        pattern.recurrence_level = recurrence_level
+        return pattern, False
+
+    pattern = index[pattern_type] = CognitivePattern(
+        user_id=user_id,
+        pattern_type=pattern_type,
+        description=PATTERN_DESCRIPTIONS[pattern_type],
+        recurrence_level=recurrence_level,
+        first_detected=now,
+        last_detected=now,
+    )
+    return pattern, True
+
+
 def persist_cognitive_patterns(
     user_id,
     pattern_result: PatternResult,
@@ -10,38 +56,23 @@ def persist_cognitive_patterns(
 ) -> List[CognitivePattern]:
     """
     Converts PatternResult into long-term CognitivePattern memory.
+
+    Stateless form; `storage.pattern_store.CognitivePatternStore` keeps
+    the same patterns indexed and persisted per user.
     """
     now = datetime.now(UTC)
     updated_patterns = existing_patterns.copy()
 
-    def upsert(pattern_type: str, description: str):
-        for p in updated_patterns:
-            if p.pattern_type == pattern_type:
-                p.last_detected = now
-                p.recurrence_level = pattern_result.risk_level
-                return
-
-        updated_patterns.append(
-            CognitivePattern(
-                user_id=user_id,
-                pattern_type=pattern_type,
-                description=description,
-                recurrence_level=pattern_result.risk_level,
-                first_detected=now,
-                last_detected=now,
-            )
-        )
+    # First pattern of each type wins, as with the former linear scan.
+    index: Dict[str, CognitivePattern] = {}
+    for p in updated_patterns:
+        index.setdefault(p.pattern_type, p)
 
-    if pattern_result.spiral_detected:
-        upsert(
-            "spiral",
-            "Sustained repetitive cognitive patterns detected over time.",
-        )
-
-    if pattern_result.rumination_detected:
-        upsert(
-            "rumination",
-            "Repetitive negative thought loops with low emotional resolution.",
+    for pattern_type in detected_pattern_types(pattern_result):
+        pattern, created = upsert_pattern(
+            index, user_id, pattern_type, pattern_result.risk_level, now
         )
+        if created:
+            updated_patterns.append(pattern)
 
-    return updated_patterns
\ No newline at end of file
+    return updated_patterns
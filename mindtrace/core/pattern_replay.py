@@ -0,0 +1,209 @@
+from dataclasses import dataclass
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from mindtrace.core.memory_schemas import BehavioralMemory
+from mindtrace.core.patterns import (
+    ABSOLUTIST_MIN_COUNT,
+    ABSOLUTIST_WINDOW,
+    RUMINATION_MIN_COUNT,
+    RUMINATION_REPETITION,
+    RUMINATION_SENTIMENT,
+    RUMINATION_WINDOW,
+    SPIRAL_MIN_COUNT,
+    SPIRAL_REPETITION,
+    SPIRAL_WINDOW,
+    TREND_DELTA,
+    TREND_WINDOW,
+    PatternResult,
+    build_pattern_result,
+)
+
+# Trend codes in PatternReplay.trend; index into TREND_LABELS.
+TREND_NONE, TREND_DECLINING, TREND_STABLE, TREND_IMPROVING = 0, 1, 2, 3
+TREND_LABELS = (None, "declining", "stable", "improving")
+
+
+@dataclass(frozen=True)
+class PatternThresholds:
+    """
+    Detector parameters. Defaults are the live ones in core.patterns;
+    pass different values to re-score history under new thresholds.
+    """
+    spiral_window: int = SPIRAL_WINDOW
+    spiral_repetition: float = SPIRAL_REPETITION
+    spiral_min_count: int = SPIRAL_MIN_COUNT
+    trend_window: int = TREND_WINDOW
+    trend_delta: float = TREND_DELTA
+    rumination_window: int = RUMINATION_WINDOW
+    rumination_repetition: float = RUMINATION_REPETITION
+    rumination_sentiment: float = RUMINATION_SENTIMENT
+    rumination_min_count: int = RUMINATION_MIN_COUNT
+    absolutist_window: int = ABSOLUTIST_WINDOW
+    absolutist_min_count: int = ABSOLUTIST_MIN_COUNT
+
+
+DEFAULT_THRESHOLDS = PatternThresholds()
+
+
+@dataclass
+class PatternReplay:
+    """
+    Pattern outputs for every timestep of a timeline, one array each.
+    Row i is `evaluate_patterns(history[:i], history[i])`.
+    """
+    spiral: np.ndarray       # bool
+    trend: np.ndarray        # int8 trend codes
+    rumination: np.ndarray   # bool
+    absolutist: np.ndarray   # bool
+    risk: np.ndarray         # bool, True where risk_level is "medium"
+
+    def __len__(self) -> int:
+        return len(self.spiral)
+
+    def slice(self, start: int, stop: int) -> "PatternReplay":
+        return PatternReplay(
+            spiral=self.spiral[start:stop],
+            trend=self.trend[start:stop],
+            rumination=self.rumination[start:stop],
+            absolutist=self.absolutist[start:stop],
+            risk=self.risk[start:stop],
+        )
+
+    def result(self, i: int) -> PatternResult:
+        return build_pattern_result(
+            bool(self.spiral[i]),
+            TREND_LABELS[self.trend[i]],
+            bool(self.rumination[i]),
+            bool(self.absolutist[i]),
+        )
+
+    def results(self) -> List[PatternResult]:
+        return [self.result(i) for i in range(len(self))]
+
+
+def history_columns(history: Sequence[BehavioralMemory]):
+    """
+    (repetition, sentiment, absolutist) columns for a timeline.
+    """
+    n = len(history)
+    repetition = np.fromiter((m.repetition_score for m in history), np.float64, n)
+    sentiment = np.fromiter((m.sentiment_score for m in history), np.float64, n)
+    absolutist = np.fromiter((m.absolutist_language for m in history), bool, n)
+    return repetition, sentiment, absolutist
+
+
+def _window_count(flags: np.ndarray, starts: np.ndarray, lo: np.ndarray, hi: np.ndarray):
+    """
+    Count of `flags` in [max(starts, lo), hi) per row, via one cumsum.
+    Windows never cross a timeline boundary.
+    """
+    csum = np.concatenate(([0], np.cumsum(flags, dtype=np.int64)))
+    return csum[hi] - csum[np.maximum(starts, lo)]
+
+
+def replay_columns(
+    repetition: np.ndarray,
+    sentiment: np.ndarray,
+    absolutist: np.ndarray,
+    lengths: Optional[Sequence[int]] = None,
+    thresholds: PatternThresholds = DEFAULT_THRESHOLDS,
+) -> PatternReplay:
+    """
+    Evaluates every timestep of one or more timelines laid end to end.
+
+    `lengths` splits the columns into consecutive timelines (one per
+    user); by default they form a single timeline.
+    """
+    t = thresholds
+    repetition = np.asarray(repetition, dtype=np.float64)
+    sentiment = np.asarray(sentiment, dtype=np.float64)
+    absolutist = np.asarray(absolutist, dtype=bool)
+    n = len(repetition)
+    if lengths is None:
+        lengths = [n]
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if int(lengths.sum()) != n:
+        raise ValueError("Timeline lengths do not add up to the column length")
+
+    idx = np.arange(n, dtype=np.int64)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    pos = idx - starts  # entries of history before each row
+
+    # Windows include the current entry for spiral and rumination.
+    spiral = _window_count(
+        repetition >= t.spiral_repetition, starts, idx - t.spiral_window, idx + 1
+    ) >= t.spiral_min_count
+
+    repetitive = _window_count(
+        repetition >= t.rumination_repetition, starts, idx - t.rumination_window, idx + 1
+    )
+    negative = _window_count(
+        sentiment <= t.rumination_sentiment, starts, idx - t.rumination_window, idx + 1
+    )
+    rumination = (repetitive >= t.rumination_min_count) & (negative >= t.rumination_min_count)
+
+    past_absolutist = _window_count(absolutist, starts, idx - t.absolutist_window, idx)
+    escalation = absolutist & (past_absolutist >= t.absolutist_min_count)
+
+    # Trend compares history[-2w:-w] with history[-w:]. Block sums are
+    # accumulated left to right on shifted columns so the averages match
+    # the scalar detector bit for bit.
+    w = t.trend_window
+    trend = np.zeros(n, dtype=np.int8)
+    rows = np.flatnonzero(pos >= 2 * w)
+    if len(rows):
+        earlier = np.zeros(len(rows))
+        recent = np.zeros(len(rows))
+        for k in range(w):
+            earlier += sentiment[rows - 2 * w + k]
+            recent += sentiment[rows - w + k]
+        earlier /= w
+        recent /= w
+        codes = np.full(len(rows), TREND_STABLE, dtype=np.int8)
+        codes[recent > earlier + t.trend_delta] = TREND_IMPROVING
+        codes[recent < earlier - t.trend_delta] = TREND_DECLINING
+        trend[rows] = codes
+
+    risk = spiral & (trend == TREND_DECLINING) & escalation
+
+    return PatternReplay(
+        spiral=spiral,
+        trend=trend,
+        rumination=rumination,
+        absolutist=escalation,
+        risk=risk,
+    )
+
+
+def replay_patterns(
+    history: Sequence[BehavioralMemory],
+    thresholds: PatternThresholds = DEFAULT_THRESHOLDS,
+) -> PatternReplay:
+    """
+    Pattern results for every entry of one timeline, in order.
+    """
+    return replay_columns(*history_columns(history), thresholds=thresholds)
+
+
+def replay_users(
+    histories: Mapping[Hashable, Sequence[BehavioralMemory]],
+    thresholds: PatternThresholds = DEFAULT_THRESHOLDS,
+) -> Dict[Hashable, PatternReplay]:
+    """
+    Replays many users' timelines in one vectorized pass.
+    Each returned PatternReplay is a view into the shared result arrays.
+    """
+    user_ids = list(histories)
+    lengths = [len(histories[u]) for u in user_ids]
+    entries = [m for u in user_ids for m in histories[u]]
+
+    replay = replay_columns(*history_columns(entries), lengths=lengths, thresholds=thresholds)
+
+    out: Dict[Hashable, PatternReplay] = {}
+    offset = 0
+    for user_id, length in zip(user_ids, lengths):
+        out[user_id] = replay.slice(offset, offset + length)
+        offset += length
+    return out
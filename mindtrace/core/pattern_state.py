@@ -0,0 +1,156 @@
+from typing import Iterable, List, Optional, Tuple
+
+from mindtrace.core.memory_schemas import BehavioralMemory
+from mindtrace.core.patterns import (
+    ABSOLUTIST_MIN_COUNT,
+    ABSOLUTIST_WINDOW,
+    RUMINATION_MIN_COUNT,
+    RUMINATION_REPETITION,
+    RUMINATION_SENTIMENT,
+    RUMINATION_WINDOW,
+    SPIRAL_MIN_COUNT,
+    SPIRAL_REPETITION,
+    SPIRAL_WINDOW,
+    TREND_WINDOW,
+    PatternResult,
+    _trend,
+    build_pattern_result,
+)
+
+# The longest look-back any detector needs.
+BUFFER_SIZE = max(SPIRAL_WINDOW, 2 * TREND_WINDOW, RUMINATION_WINDOW, ABSOLUTIST_WINDOW)
+
+# (repetition_score, sentiment_score, absolutist_language)
+Entry = Tuple[float, float, bool]
+
+
+def _entry(memory: BehavioralMemory) -> Entry:
+    return (memory.repetition_score, memory.sentiment_score, memory.absolutist_language)
+
+
+def _spiral(e: Entry) -> int:
+    return e[0] >= SPIRAL_REPETITION
+
+
+def _repetitive(e: Entry) -> int:
+    return e[0] >= RUMINATION_REPETITION
+
+
+def _negative(e: Entry) -> int:
+    return e[1] <= RUMINATION_SENTIMENT
+
+
+def _absolutist(e: Entry) -> int:
+    return bool(e[2])
+
+
+# (window, flag) pairs with a running counter each, in counter order.
+_COUNTERS = (
+    (SPIRAL_WINDOW, _spiral),
+    (RUMINATION_WINDOW, _repetitive),
+    (RUMINATION_WINDOW, _negative),
+    (ABSOLUTIST_WINDOW, _absolutist),
+)
+
+
+class PatternState:
+    """
+    Per-user sliding-window state for `evaluate_patterns`.
+
+    Keeps the last BUFFER_SIZE entries in a ring buffer plus a running
+    count per detector window, so each new BehavioralMemory is scored
+    and folded in O(1) without the caller passing full history.
+
+    `observe(m)` returns exactly `evaluate_patterns(history, m)` for the
+    history observed so far, then appends `m`. Trend averages are summed
+    fresh from the buffer in history order, so they match bit for bit.
+    """
+
+    def __init__(self):
+        self._ring: List[Optional[Entry]] = [None] * BUFFER_SIZE
+        self._head = 0  # next write position
+        self.size = 0  # entries held, <= BUFFER_SIZE
+        self.count = 0  # entries observed in total
+        self._counts = [0] * len(_COUNTERS)
+
+    def _at(self, k: int) -> Entry:
+        """
+        k-th most recent entry (1-based); requires k <= size.
+        """
+        return self._ring[(self._head - k) % BUFFER_SIZE]
+
+    # -------- Updates --------
+
+    def push(self, memory: BehavioralMemory) -> None:
+        self._push(_entry(memory))
+
+    def _push(self, entry: Entry) -> None:
+        for i, (window, flag) in enumerate(_COUNTERS):
+            if self.size >= window:
+                self._counts[i] -= flag(self._at(window))
+            self._counts[i] += flag(entry)
+
+        self._ring[self._head] = entry
+        self._head = (self._head + 1) % BUFFER_SIZE
+        self.size = min(self.size + 1, BUFFER_SIZE)
+        self.count += 1
+
+    def evaluate(self, current: BehavioralMemory) -> PatternResult:
+        """
+        Patterns for `current` against the observed history, without
+        adding it.
+        """
+        cur = _entry(current)
+        spiral_count, repetitive, negative, absolutist_count = self._counts
+
+        spiral = spiral_count + _spiral(cur) >= SPIRAL_MIN_COUNT
+
+        trend = None
+        if self.size >= 2 * TREND_WINDOW:
+            earlier = 0
+            for k in range(2 * TREND_WINDOW, TREND_WINDOW, -1):
+                earlier += self._at(k)[1]
+            recent = 0
+            for k in range(TREND_WINDOW, 0, -1):
+                recent += self._at(k)[1]
+            trend = _trend(earlier / TREND_WINDOW, recent / TREND_WINDOW)
+
+        rumination = (
+            repetitive + _repetitive(cur) >= RUMINATION_MIN_COUNT
+            and negative + _negative(cur) >= RUMINATION_MIN_COUNT
+        )
+        absolutist = bool(cur[2]) and absolutist_count >= ABSOLUTIST_MIN_COUNT
+
+        return build_pattern_result(spiral, trend, rumination, absolutist)
+
+    def observe(self, current: BehavioralMemory) -> PatternResult:
+        result = self.evaluate(current)
+        self.push(current)
+        return result
+
+    # -------- Persistence --------
+
+    @classmethod
+    def from_history(cls, history: Iterable[BehavioralMemory]) -> "PatternState":
+        state = cls()
+        for memory in history:
+            state.push(memory)
+        return state
+
+    def to_dict(self) -> dict:
+        """
+        Compact form: the buffered entries (oldest first) and the total
+        count. Counters are rebuilt on load.
+        """
+        return {
+            "count": self.count,
+            "entries": [list(self._at(k)) for k in range(self.size, 0, -1)],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PatternState":
+        state = cls()
+        for rep, sent, absolutist in data["entries"]:
+            state._push((rep, sent, bool(absolutist)))
+        state.count = data["count"]
+        return state
@@ -6,6 +6,26 @@ from typing import List, Optional
 from mindtrace.core.memory_schemas import BehavioralMemory
 
 
+# =================================================
+# THRESHOLDS
+# =================================================
+
+SPIRAL_WINDOW = 6             # past entries considered, plus the current one
+SPIRAL_REPETITION = 0.8
+SPIRAL_MIN_COUNT = 3
+
+TREND_WINDOW = 3              # earlier vs recent block size
+TREND_DELTA = 0.1
+
+RUMINATION_WINDOW = 4
+RUMINATION_REPETITION = 0.7
+RUMINATION_SENTIMENT = -0.3
+RUMINATION_MIN_COUNT = 3
+
+ABSOLUTIST_WINDOW = 5
+ABSOLUTIST_MIN_COUNT = 2
+
+
 # =================================================
 # OUTPUT CONTRACT
 # =================================================
@@ -35,7 +55,7 @@ def last_n(memories: List[BehavioralMemory], n: int) -> List[BehavioralMemory]:
 def detect_spiral(
     history: List[BehavioralMemory],
     current: BehavioralMemory,
-    window: int = 6,
+    window: int = SPIRAL_WINDOW,
 ) -> bool:
     """
     Spiral = sustained high repetition over multiple sessions.
@@ -43,9 +63,9 @@ def detect_spiral(
     recent = last_n(history, window)
     recent_scores = [m.repetition_score for m in recent] + [current.repetition_score]
 
-    high_repetition = [s for s in recent_scores if s >= 0.8]
+    high_repetition = [s for s in recent_scores if s >= SPIRAL_REPETITION]
 
-    return len(high_repetition) >= 3
+    return len(high_repetition) >= SPIRAL_MIN_COUNT
 
 
 def detect_emotional_trend(
@@ -54,18 +74,22 @@ def detect_emotional_trend(
     """
     Trend based on sentiment score movement.
     """
-    if len(history) < 6:
+    if len(history) < 2 * TREND_WINDOW:
         return None
 
-    earlier = history[-6:-3]
-    recent = history[-3:]
+    earlier = history[-2 * TREND_WINDOW:-TREND_WINDOW]
+    recent = history[-TREND_WINDOW:]
+
+    earlier_avg = sum(m.sentiment_score for m in earlier) / TREND_WINDOW
+    recent_avg = sum(m.sentiment_score for m in recent) / TREND_WINDOW
 
-    earlier_avg = sum(m.sentiment_score for m in earlier) / 3
-    recent_avg = sum(m.sentiment_score for m in recent) / 3
+    return _trend(earlier_avg, recent_avg)
 
-    if recent_avg < earlier_avg - 0.1:
+
+def _trend(earlier_avg: float, recent_avg: float) -> str:
+    if recent_avg < earlier_avg - TREND_DELTA:
         return "declining"
-    elif recent_avg > earlier_avg + 0.1:
+    elif recent_avg > earlier_avg + TREND_DELTA:
         return "improving"
     else:
         return "stable"
@@ -78,12 +102,12 @@ def detect_rumination(
     """
     Rumination = repetition + neutral-to-negative sentiment loop.
     """
-    recent = last_n(history, 4) + [current]
+    recent = last_n(history, RUMINATION_WINDOW) + [current]
 
-    repetitive = sum(1 for m in recent if m.repetition_score >= 0.7)
-    negative = sum(1 for m in recent if m.sentiment_score <= -0.3)
+    repetitive = sum(1 for m in recent if m.repetition_score >= RUMINATION_REPETITION)
+    negative = sum(1 for m in recent if m.sentiment_score <= RUMINATION_SENTIMENT)
 
-    return repetitive >= 3 and negative >= 3
+    return repetitive >= RUMINATION_MIN_COUNT and negative >= RUMINATION_MIN_COUNT
 
 
 def detect_absolutist_escalation(
@@ -93,10 +117,10 @@ def detect_absolutist_escalation(
     """
     Tracks increase in absolutist language usage.
     """
-    recent = last_n(history, 5)
+    recent = last_n(history, ABSOLUTIST_WINDOW)
     past_count = sum(1 for m in recent if m.absolutist_language)
 
-    return current.absolutist_language and past_count >= 2
+    return current.absolutist_language and past_count >= ABSOLUTIST_MIN_COUNT
 
 
 def assess_risk(
@@ -125,6 +149,19 @@ def evaluate_patterns(
     trend = detect_emotional_trend(session_history)
     rumination = detect_rumination(session_history, current_session)
     absolutist = detect_absolutist_escalation(session_history, current_session)
+    return build_pattern_result(spiral, trend, rumination, absolutist)
+
+
+def build_pattern_result(
+    spiral: bool,
+    trend: Optional[str],
+    rumination: bool,
+    absolutist: bool,
+) -> PatternResult:
+    """
+    Assembles detector outputs into a PatternResult (risk and
+    dominant signals included).
+    """
     risk = assess_risk(spiral, trend, absolutist)
 
     dominant = []
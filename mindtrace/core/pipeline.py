@@ -1,9 +1,10 @@
 # core/pipeline.py
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union
 
 from mindtrace.core.types import Session
 from mindtrace.core.observation import Observation
+from mindtrace.nlp.embeddings import EmbeddingMatrix, as_embedding_matrix
 
 from mindtrace.analytics.aggregator import aggregate_patterns, build_render_payload
 from mindtrace.core.llm_client import render_response
@@ -11,21 +12,35 @@ from mindtrace.core.llm_client import render_response
 
 def run_mindtrace_pipeline(
     sessions: List[Session],
-    embeddings: Dict[str, list],
+    embeddings: Union[EmbeddingMatrix, Dict[str, list]],
+    chain_state=None,
 ) -> Optional[str]:
     """
     End-to-end MindTrace pipeline.
 
+    `embeddings` is an EmbeddingMatrix; the legacy dict form is
+    converted once on entry.
+
+    With a `chain_state` (analytics.chain_state.ChainStateStore) kept
+    per user across runs, only sessions added, retagged or removed
+    since the last run are processed, and the state is saved.
+
     Returns:
         - Rendered reflective response (str), or
         - None if no valid pattern is found
     """
 
+    embeddings = as_embedding_matrix(embeddings)
+
     # 1️⃣ Aggregate patterns (pure analysis)
-    observations: List[Observation] = aggregate_patterns(
-        sessions=sessions,
-        embeddings=embeddings,
-    )
+    if chain_state is not None:
+        observations: List[Observation] = chain_state.sync(sessions, embeddings)
+        chain_state.save()
+    else:
+        observations = aggregate_patterns(
+            sessions=sessions,
+            embeddings=embeddings,
+        )
 
     if not observations:
         return None
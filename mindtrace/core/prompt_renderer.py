@@ -1,7 +1,7 @@
 # mindtrace/core/prompt_renderer.py
 
 from pathlib import Path
-from typing import Dict
+from typing import Mapping
 
 from mindtrace.core.response_planner import ResponsePlan
 
@@ -18,11 +18,11 @@ TEMPLATE_MAP = {
 
 def render_prompt(
     plan: ResponsePlan,
-    session_snapshot: Dict,
+    session_snapshot: Mapping,
 ) -> str:
     """
     Renders a final prompt string based on the response plan
-    and session context snapshot.
+    and session context snapshot (a SessionSnapshot or its dict form).
     """
     if plan.mode not in TEMPLATE_MAP:
         raise ValueError(f"Unknown response mode: {plan.mode}")
@@ -44,7 +44,7 @@ def render_prompt(
 
     return rendered.strip()
 
-def _format_session_context(snapshot: Dict) -> str:
+def _format_session_context(snapshot: Mapping) -> str:
     """
     Formats session context into a human-readable block
     for prompt injection.
@@ -0,0 +1,204 @@
+import gc
+import hashlib
+import os
+import re
+import threading
+from typing import Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import numpy as np
+
+from mindtrace.nlp.embeddings import EmbeddingEncoder
+from mindtrace.storage.vector_store import VectorStoreBackend, create_vector_store
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+TEST_MODEL_NAME = "mindtrace-hash-test"
+
+# Overrides the default model, e.g. MINDTRACE_EMBEDDING_MODEL=mindtrace-hash-test
+# to run fully offline.
+MODEL_ENV_VAR = "MINDTRACE_EMBEDDING_MODEL"
+
+
+class HashingTestModel:
+    """
+    Tiny deterministic stand-in for a sentence embedding model.
+    Hashed bag of words, L2-normalized; needs no weights or network.
+    Texts sharing words get similar vectors, which is enough for tests.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self.model_name = TEST_MODEL_NAME
+
+    def _vector(self, text: str) -> np.ndarray:
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for token in re.findall(r"\b\w+\b", text.lower()):
+            h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "little")
+            vec[h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def encode(self, texts):
+        if isinstance(texts, str):
+            return self._vector(texts)
+        return np.stack([self._vector(t) for t in texts]) if texts else np.zeros((0, self.dim), np.float32)
+
+
+def _model_name(model_name: Optional[str]) -> str:
+    return model_name or os.environ.get(MODEL_ENV_VAR) or DEFAULT_MODEL_NAME
+
+
+def _sentence_transformer(name: str):
+    # Imported lazily: loading torch is itself expensive.
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(name)
+
+
+class ModelRegistry:
+    """
+    Process-wide, lazily populated cache of embedding encoders and
+    vector store clients.
+
+    Each entry is built once, on first use, under a per-key lock, so
+    concurrent first calls share one load. Encoders survive fork, so
+    workers forked after `warm_up` share the weights copy-on-write.
+    Store clients hold sockets, threads and SQLite handles and are
+    dropped in forked children, which reopen their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._encoders: Dict[str, EmbeddingEncoder] = {}
+        self._stores: Dict[Hashable, VectorStoreBackend] = {}
+        # Model name -> why it failed to load, see try_encoder.
+        self._unavailable: Dict[str, str] = {}
+        self._factories: Dict[str, Callable[[], object]] = {
+            TEST_MODEL_NAME: HashingTestModel,
+        }
+
+    def _get_or_create(self, cache: Dict, key: Hashable, build: Callable[[], object]):
+        value = cache.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault((id(cache), key), threading.Lock())
+        with key_lock:
+            value = cache.get(key)
+            if value is None:
+                value = build()
+                cache[key] = value
+        return value
+
+    # -------- Encoders --------
+
+    def register_model(self, name: str, factory: Callable[[], object]) -> None:
+        """
+        Makes `name` resolve to `factory()` instead of a SentenceTransformer.
+        Replaces an already loaded encoder of that name.
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._encoders.pop(name, None)
+            self._unavailable.pop(name, None)
+
+    def encoder(self, model_name: Optional[str] = None) -> EmbeddingEncoder:
+        name = _model_name(model_name)
+
+        def build():
+            factory = self._factories.get(name)
+            model = factory() if factory is not None else _sentence_transformer(name)
+            return EmbeddingEncoder(model, model_name=name)
+
+        return self._get_or_create(self._encoders, name, build)
+
+    def try_encoder(self, model_name: Optional[str] = None) -> Optional[EmbeddingEncoder]:
+        """
+        Like `encoder`, but None when the model cannot be loaded (e.g.
+        sentence-transformers missing, or weights unavailable offline).
+        The failure is remembered, so hot paths do not retry the load on
+        every call; `register_model` and `clear` forget it.
+        """
+        name = _model_name(model_name)
+        if name in self._unavailable:
+            return None
+        try:
+            return self.encoder(name)
+        except (ImportError, OSError) as exc:
+            self._unavailable[name] = f"{type(exc).__name__}: {exc}"
+            return None
+
+    # -------- Vector stores --------
+
+    def vector_store(self, backend: str = "chroma", **kwargs) -> VectorStoreBackend:
+        key = (backend, tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+        return self._get_or_create(
+            self._stores, key, lambda: create_vector_store(backend, **kwargs)
+        )
+
+    # -------- Lifecycle --------
+
+    def warm_up(
+        self,
+        model_names: Iterable[Optional[str]] = (None,),
+        stores: Iterable[Tuple[str, Dict]] = (("chroma", {}),),
+        freeze: bool = True,
+    ) -> None:
+        """
+        Loads models and opens stores ahead of traffic, e.g. at server
+        startup before workers fork.
+
+        With `freeze`, everything allocated so far is moved to the GC's
+        permanent generation, so collections in forked workers stop
+        touching (and copying) the pages holding the loaded models.
+        """
+        for name in model_names:
+            self.encoder(name)
+        for backend, kwargs in stores:
+            self.vector_store(backend, **kwargs)
+        if freeze:
+            gc.collect()
+            gc.freeze()
+
+    def _after_fork_in_child(self) -> None:
+        # Locks may have been held by another thread at fork time.
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._stores = {}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._encoders.clear()
+            self._stores.clear()
+            self._unavailable.clear()
+
+
+_registry = ModelRegistry()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=lambda: _registry._after_fork_in_child())
+
+
+def get_registry() -> ModelRegistry:
+    return _registry
+
+
+def get_encoder(model_name: Optional[str] = None) -> EmbeddingEncoder:
+    return _registry.encoder(model_name)
+
+
+def try_get_encoder(model_name: Optional[str] = None) -> Optional[EmbeddingEncoder]:
+    return _registry.try_encoder(model_name)
+
+
+def get_vector_store(backend: str = "chroma", **kwargs) -> VectorStoreBackend:
+    return _registry.vector_store(backend, **kwargs)
+
+
+def warm_up(
+    model_names: Iterable[Optional[str]] = (None,),
+    stores: Iterable[Tuple[str, Dict]] = (("chroma", {}),),
+    freeze: bool = True,
+) -> None:
+    _registry.warm_up(model_names, stores, freeze)
@@ -0,0 +1,99 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import numpy as np
+
+# Recent entries each new entry is compared against.
+DEFAULT_HISTORY = 20
+
+# Users whose history is kept; the least recently scored are dropped.
+# A ring is history x dim float32, ~30 KB at 20 x 384.
+DEFAULT_MAX_USERS = 4096
+
+REPETITION_MODES = ("max", "mean")
+
+
+class _Ring:
+    __slots__ = ("vectors", "count", "pos")
+
+    def __init__(self, size: int, dim: int):
+        self.vectors = np.zeros((size, dim), dtype=np.float32)
+        self.count = 0
+        self.pos = 0
+
+
+class RepetitionTracker:
+    """
+    Per-user ring buffers of the last `history` normalized entry
+    embeddings, held in memory.
+
+    Scoring an entry is one (history x d) matrix-vector product: no
+    vector-store query and no history reload. At most `max_users`
+    rings are kept (LRU), so memory stays bounded in a long-running
+    server; an evicted user starts over with no history.
+    """
+
+    def __init__(
+        self,
+        history: int = DEFAULT_HISTORY,
+        mode: str = "max",
+        max_users: int = DEFAULT_MAX_USERS,
+    ):
+        if mode not in REPETITION_MODES:
+            raise ValueError(f"Unsupported repetition mode: {mode}")
+        self.history = history
+        self.mode = mode
+        self.max_users = max_users
+        self._rings: "OrderedDict[Hashable, _Ring]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def score(self, user_id: Hashable, embedding, update: bool = True) -> float:
+        """
+        Cosine similarity of `embedding` to the user's recent entries
+        (max or mean, per `mode`), clamped to [0, 1]; 0.0 without history.
+        The entry is then added to the history unless `update` is False.
+        """
+        vec = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(vec))
+        unit = vec / norm if norm else vec
+
+        with self._lock:
+            ring = self._rings.get(user_id)
+            if ring is None or ring.vectors.shape[1] != unit.shape[0]:
+                ring = self._rings[user_id] = _Ring(self.history, unit.shape[0])
+                while len(self._rings) > self.max_users:
+                    self._rings.popitem(last=False)
+            self._rings.move_to_end(user_id)
+
+            score = 0.0
+            if ring.count:
+                sims = ring.vectors[:ring.count] @ unit
+                score = float(sims.max() if self.mode == "max" else sims.mean())
+
+            if update:
+                ring.vectors[ring.pos] = unit
+                ring.pos = (ring.pos + 1) % self.history
+                ring.count = min(ring.count + 1, self.history)
+
+        return min(max(score, 0.0), 1.0)
+
+    def reset(self, user_id: Optional[Hashable] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._rings.clear()
+            else:
+                self._rings.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+
+_tracker = RepetitionTracker()
+
+
+def get_repetition_tracker() -> RepetitionTracker:
+    """
+    Process-wide tracker, so history outlives individual ingestors.
+    """
+    return _tracker
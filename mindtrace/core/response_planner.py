@@ -13,14 +13,15 @@ class ResponsePlan:
     include_support_note: bool
 
 from mindtrace.core.boundaries import should_escalate
-from mindtrace.core.session_context import SessionContext
+from mindtrace.core.session_context import SessionContext, SessionSnapshot
 from mindtrace.core.response_planner import ResponsePlan  
 
-def plan_response(ctx: SessionContext) -> ResponsePlan:
+def plan_response(ctx: SessionContext | SessionSnapshot) -> ResponsePlan:
     """
     Determines the allowed response mode based on session context.
+    Pass the snapshot itself when it is also needed for the prompt.
     """
-    snapshot = ctx.build()
+    snapshot = ctx if isinstance(ctx, SessionSnapshot) else ctx.snapshot()
 
     active_patterns = snapshot["active_patterns"]
     risk_flags = snapshot["risk_flags"]
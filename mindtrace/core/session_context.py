@@ -1,5 +1,7 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
 from datetime import datetime, UTC
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 from mindtrace.core.boundaries import SYSTEM_IDENTITY
 from mindtrace.core.memory_schemas import (
@@ -11,6 +13,51 @@ from mindtrace.core.patterns import evaluate_patterns
 from mindtrace.core.pattern_persistence import persist_cognitive_patterns
 
 
+@dataclass(frozen=True)
+class SessionSnapshot(Mapping):
+    """
+    Immutable session snapshot, built once per SessionContext.
+
+    Reads like the `build()` dict (`snapshot["risk_flags"]`), so it can
+    be handed to `plan_response` and `render_prompt` as is.
+    """
+    system_identity: str
+    generated_at: str
+    recent_activity: str
+    behavioral_trends: str
+    active_patterns: str
+    risk_flags: Tuple[str, ...]
+
+    def __getitem__(self, key: str):
+        if key not in _SNAPSHOT_KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(_SNAPSHOT_KEYS)
+
+    def __len__(self) -> int:
+        return len(_SNAPSHOT_KEYS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {key: getattr(self, key) for key in _SNAPSHOT_KEYS}
+        data["risk_flags"] = list(self.risk_flags)
+        return data
+
+
+_SNAPSHOT_KEYS = tuple(f.name for f in fields(SessionSnapshot))
+
+
+@dataclass
+class _BehaviorStats:
+    count: int = 0
+    sentiment_sum: float = 0.0
+    repetition_hits: int = 0      # repetition_score > 0.7
+    strong_repetition: int = 0    # repetition_score > 0.8
+    strongly_negative: int = 0    # sentiment_score < -0.6
+    late_night: int = 0
+
+
 class SessionContext:
     """
     SessionContext represents MindTrace's internal working memory.
@@ -29,6 +76,8 @@ class SessionContext:
         self.recent_behavior = recent_behavior
         self.active_patterns = active_patterns
         self.generated_at = datetime.now(UTC)
+        self._snapshot = None
+        self._snapshot_key = None
 
     # -------------------------------------------------
     # Factory Constructor (NEW)
@@ -42,20 +91,39 @@ class SessionContext:
         behavioral_history: List[BehavioralMemory],
         current_behavioral: BehavioralMemory,
         existing_patterns: List[CognitivePattern],
+        pattern_store=None,
+        pattern_state=None,
     ):
         """
         Creates a SessionContext after processing a new session.
+        With a `pattern_store` (storage.pattern_store), patterns are
+        upserted there and `existing_patterns` is not consulted.
+
+        With a `pattern_state` (core.pattern_state.PatternState) kept
+        per user across sessions, patterns are scored in O(1) from it
+        instead of from `behavioral_history`, and the state then
+        observes `current_behavioral`. A state that has observed
+        nothing yet is first seeded from `behavioral_history`.
         """
-        pattern_result = evaluate_patterns(
-            session_history=behavioral_history,
-            current_session=current_behavioral,
-        )
+        if pattern_state is not None:
+            if not pattern_state.count:
+                for memory in behavioral_history:
+                    pattern_state.push(memory)
+            pattern_result = pattern_state.observe(current_behavioral)
+        else:
+            pattern_result = evaluate_patterns(
+                session_history=behavioral_history,
+                current_session=current_behavioral,
+            )
 
-        updated_patterns = persist_cognitive_patterns(
-            user_id=user_id,
-            pattern_result=pattern_result,
-            existing_patterns=existing_patterns,
-        )
+        if pattern_store is not None:
+            updated_patterns = pattern_store.record(user_id, pattern_result)
+        else:
+            updated_patterns = persist_cognitive_patterns(
+                user_id=user_id,
+                pattern_result=pattern_result,
+                existing_patterns=existing_patterns,
+            )
 
         return cls(
             recent_episodes=recent_episodes,
@@ -67,25 +135,65 @@ class SessionContext:
     # Public Interface
     # -------------------------------------------------
 
+    def snapshot(self) -> SessionSnapshot:
+        """
+        The session snapshot, computed once and reused until the input
+        lists are replaced or change length. Call `invalidate()` after
+        editing entries in place.
+        """
+        key = self._inputs_key()
+        if self._snapshot is None or key != self._snapshot_key:
+            stats = self._behavior_stats()
+            self._snapshot = SessionSnapshot(
+                system_identity=SYSTEM_IDENTITY,
+                generated_at=self.generated_at.isoformat(),
+                recent_activity=self._recent_activity_summary(),
+                behavioral_trends=self._behavior_summary(stats),
+                active_patterns=self._pattern_summary(),
+                risk_flags=tuple(self._risk_flags(stats)),
+            )
+            self._snapshot_key = key
+        return self._snapshot
+
     def build(self) -> Dict[str, Any]:
         """
         Builds a structured session snapshot.
         This object will later be injected into prompts
         or reasoning layers.
         """
-        return {
-            "system_identity": SYSTEM_IDENTITY,
-            "generated_at": self.generated_at.isoformat(),
-            "recent_activity": self._recent_activity_summary(),
-            "behavioral_trends": self._behavior_summary(),
-            "active_patterns": self._pattern_summary(),
-            "risk_flags": self._risk_flags(),
-        }
+        return self.snapshot().to_dict()
+
+    def invalidate(self) -> None:
+        self._snapshot = None
 
     # -------------------------------------------------
     # Internal Summaries
     # -------------------------------------------------
 
+    def _inputs_key(self) -> tuple:
+        return tuple(
+            (id(items), len(items))
+            for items in (self.recent_episodes, self.recent_behavior, self.active_patterns)
+        )
+
+    def _behavior_stats(self) -> _BehaviorStats:
+        """
+        Every behavior aggregate the summaries need, in one pass.
+        """
+        stats = _BehaviorStats()
+        for b in self.recent_behavior:
+            stats.count += 1
+            stats.sentiment_sum += b.sentiment_score
+            if b.repetition_score > 0.7:
+                stats.repetition_hits += 1
+                if b.repetition_score > 0.8:
+                    stats.strong_repetition += 1
+            if b.sentiment_score < -0.6:
+                stats.strongly_negative += 1
+            if b.time_bucket == "late_night":
+                stats.late_night += 1
+        return stats
+
     def _recent_activity_summary(self) -> str:
         if not self.recent_episodes:
             return "No recent user reflections available."
@@ -95,13 +203,11 @@ class SessionContext:
             "User is actively expressing thoughts."
         )
 
-    def _behavior_summary(self) -> str:
-        if not self.recent_behavior:
+    def _behavior_summary(self, stats: _BehaviorStats) -> str:
+        if not stats.count:
             return "Insufficient behavioral data to infer trends."
 
-        avg_sentiment = sum(
-            b.sentiment_score for b in self.recent_behavior
-        ) / len(self.recent_behavior)
+        avg_sentiment = stats.sentiment_sum / stats.count
 
         if avg_sentiment < -0.3:
             trend = "predominantly negative"
@@ -110,13 +216,9 @@ class SessionContext:
         else:
             trend = "emotionally mixed or stable"
 
-        repetition_hits = sum(
-            1 for b in self.recent_behavior if b.repetition_score > 0.7
-        )
-
         repetition_note = (
             "Repetitive thought patterns detected."
-            if repetition_hits >= 2
+            if stats.repetition_hits >= 2
             else "No strong repetition detected."
         )
 
@@ -132,31 +234,20 @@ class SessionContext:
             + ", ".join(pattern_types)
         )
 
-    def _risk_flags(self) -> List[str]:
+    def _risk_flags(self, stats: _BehaviorStats) -> List[str]:
         """
         Risk flags are NOT diagnoses.
         They simply inform downstream logic to be more cautious.
         """
         flags = []
 
-        negative_entries = [
-            b for b in self.recent_behavior if b.sentiment_score < -0.6
-        ]
-        if len(negative_entries) >= 3:
+        if stats.strongly_negative >= 3:
             flags.append("persistent_negative_emotion")
 
-        repetitive_entries = [
-            b for b in self.recent_behavior if b.repetition_score > 0.8
-        ]
-        if len(repetitive_entries) >= 2:
+        if stats.strong_repetition >= 2:
             flags.append("repetitive_cognition")
 
-        late_night_entries = [
-            b for b in self.recent_behavior if b.time_bucket == "late_night"
-        ]
-        if len(late_night_entries) >= 2:
+        if stats.late_night >= 2:
             flags.append("late_night_vulnerability")
 
         return flags
-    
-    
\ No newline at end of file
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 @dataclass
 class Session:
@@ -9,3 +9,4 @@ class Session:
     ended_at: datetime
     text: str
     confirmed_tags: List[str]
+    user_id: Optional[str] = None
@@ -1,11 +1,220 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
 import numpy as np
 
+DEFAULT_BATCH_SIZE = 64
+
 class EmbeddingEncoder:
-    def __init__(self, model):
+    def __init__(self, model, cache=None, model_name: Optional[str] = None):
         self.model = model  # sentence-transformers / OpenAI / local
+        # Optional EmbeddingCache (storage.embedding_cache); entries are
+        # keyed by model name, so one must be known when caching.
+        self.cache = cache
+        self.model_name = model_name or getattr(model, "model_name", None)
+        if cache is not None and not self.model_name:
+            raise ValueError("model_name is required when an embedding cache is used")
 
     def encode(self, text: str) -> np.ndarray:
+        if self.cache is not None:
+            return self.encode_many([text])[0]
         return np.array(self.model.encode(text))
 
+    def encode_many(
+        self,
+        texts: Sequence[str],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        workers: int = 1,
+    ) -> np.ndarray:
+        """
+        Encodes `texts` into one contiguous float32 matrix, row i for texts[i].
+
+        Texts are sorted by length before batching so each batch pads to
+        similar lengths; rows are written back in input order. With
+        `workers > 1` batches run on a thread pool, which helps models
+        that release the GIL during inference (e.g. torch on CPU).
+
+        With a cache, only texts it misses are sent to the model, and
+        their vectors are written back in one batch.
+        """
+        texts = list(texts)
+        if self.cache is None:
+            return self._encode_batches(texts, batch_size, workers)
+
+        cached = self.cache.get_many(self.model_name, texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+        fresh = {}
+        if missing:
+            matrix = self._encode_batches(missing, batch_size, workers)
+            self.cache.put_many(self.model_name, missing, matrix)
+            fresh = dict(zip(missing, matrix))
+
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([
+            v if v is not None else fresh[t] for t, v in zip(texts, cached)
+        ]).astype(np.float32, copy=False)
+
+    def _encode_batches(
+        self,
+        texts: List[str],
+        batch_size: int,
+        workers: int,
+    ) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        batches = [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+        def run(batch):
+            vectors = np.asarray(
+                self.model.encode([texts[i] for i in batch]), dtype=np.float32
+            )
+            return batch, vectors.reshape(len(batch), -1)
+
+        if workers > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(run, batches))
+        else:
+            results = [run(b) for b in batches]
+
+        dim = results[0][1].shape[1]
+        out = np.empty((len(texts), dim), dtype=np.float32)
+        for batch, vectors in results:
+            out[batch] = vectors
+        return out
+
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    # Upcast so float16 / int8 codes (see nlp.quantization) neither
+    # overflow nor lose precision in the dot product.
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
     return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+def normalize_rows(matrix) -> np.ndarray:
+    """
+    Unit-length float64 rows; all-zero rows stay zero.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+# Unit rows are summed in 2^-40 fixed point. Integer sums are exact and
+# order-independent, so a chain's sum can be updated one session at a
+# time (or have one removed) and still equal the batch sum bit for bit.
+_FIXED_POINT = float(2 ** 40)
+
+def fixed_point_rows(unit) -> np.ndarray:
+    return np.rint(np.asarray(unit, dtype=np.float64) * _FIXED_POINT).astype(np.int64)
+
+def coherence_from_sum(total: np.ndarray, n: int, nonzero: int) -> float:
+    """
+    Average cosine similarity over all pairs of n unit rows, given their
+    fixed-point sum and how many of them are non-zero.
+
+    sum_{i != j} u_i.u_j = ||sum u||^2 - sum ||u_i||^2, over n(n-1)
+    ordered pairs, which equals the mean over unordered pairs.
+    """
+    if n < 2:
+        return 0.0
+    t = np.asarray(total, dtype=np.float64) / _FIXED_POINT
+    return float((t @ t - nonzero) / (n * (n - 1)))
+
+def mean_pairwise_cosine(unit: np.ndarray) -> float:
+    """
+    Average pairwise cosine similarity of unit rows, in O(n*d).
+    """
+    if len(unit) < 2:
+        return 0.0
+    return coherence_from_sum(
+        fixed_point_rows(unit).sum(axis=0),
+        len(unit),
+        int(np.count_nonzero(np.any(unit, axis=1))),
+    )
+
+class EmbeddingMatrix(Mapping):
+    """
+    Session embeddings as one contiguous float32 matrix plus an
+    id -> row index, instead of one array (or list) per session.
+
+    Reads like the `Dict[str, vector]` it replaces (rows come back as
+    views, not copies), and `as_embedding_matrix` converts that dict
+    form once at the boundary.
+    """
+
+    # Identity semantics; Mapping's item-wise __eq__ would compare arrays.
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+    def __init__(self, matrix, ids: Sequence[str]):
+        # No copy when `matrix` is already a contiguous float32 array.
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.ids = list(ids)
+        if len(self.ids) != len(self.matrix):
+            raise ValueError("ids and matrix rows must be the same length")
+        self.index: Dict[str, int] = {sid: i for i, sid in enumerate(self.ids)}
+
+    @classmethod
+    def from_dict(cls, embeddings: Mapping[str, Sequence[float]]) -> "EmbeddingMatrix":
+        """
+        Packs a dict of vectors into one matrix (a single allocation).
+        """
+        ids = list(embeddings)
+        if not ids:
+            return cls(np.zeros((0, 0), dtype=np.float32), ids)
+        first = np.asarray(embeddings[ids[0]])
+        matrix = np.empty((len(ids), first.shape[-1]), dtype=np.float32)
+        for i, sid in enumerate(ids):
+            matrix[i] = embeddings[sid]
+        return cls(matrix, ids)
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1] if self.matrix.ndim == 2 else 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __contains__(self, session_id) -> bool:
+        return session_id in self.index
+
+    def __getitem__(self, session_id: str) -> np.ndarray:
+        return self.matrix[self.index[session_id]]
+
+    def take(self, session_ids: Sequence[str]) -> np.ndarray:
+        """
+        Rows for `session_ids`, in that order (one gather, no per-row copies).
+        """
+        return self.matrix[[self.index[sid] for sid in session_ids]]
+
+    def slice(self, start: int, stop: int) -> "EmbeddingMatrix":
+        """
+        Zero-copy view over rows [start, stop).
+        """
+        return EmbeddingMatrix(self.matrix[start:stop], self.ids[start:stop])
+
+    def subset(self, session_ids: Sequence[str]) -> "EmbeddingMatrix":
+        """
+        Matrix restricted to `session_ids`: a zero-copy view when they are
+        consecutive rows in order, otherwise one gathered copy.
+        """
+        rows = [self.index[sid] for sid in session_ids]
+        if rows and rows == list(range(rows[0], rows[0] + len(rows))):
+            return self.slice(rows[0], rows[0] + len(rows))
+        return EmbeddingMatrix(self.matrix[rows], session_ids)
+
+def as_embedding_matrix(
+    embeddings: Union[EmbeddingMatrix, Mapping[str, Sequence[float]]],
+) -> EmbeddingMatrix:
+    """
+    Compatibility shim for callers still passing `Dict[str, vector]`.
+    """
+    if isinstance(embeddings, EmbeddingMatrix):
+        return embeddings
+    return EmbeddingMatrix.from_dict(embeddings)
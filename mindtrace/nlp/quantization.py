@@ -0,0 +1,306 @@
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from mindtrace.nlp.embeddings import mean_pairwise_cosine, normalize_rows
+
+# Storage precisions an EmbeddingCodec can quantize to.
+CODEC_DTYPES = ("float32", "float16", "int8")
+
+_INT8_MAX = 127.0
+
+
+def _as_matrix(vectors) -> np.ndarray:
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    return matrix
+
+
+def _fingerprint(state: Dict[str, np.ndarray]) -> str:
+    """
+    Short digest of a reducer's state (names, dtypes, shapes, bytes).
+    """
+    h = hashlib.blake2b(digest_size=8)
+    for name in sorted(state):
+        array = np.ascontiguousarray(state[name])
+        h.update(f"{name}:{array.dtype.str}:{array.shape};".encode("utf-8"))
+        h.update(array.tobytes())
+    return h.hexdigest()
+
+
+class PCAReducer:
+    """
+    Linear projection onto the top principal components of a sample.
+    Fitted once per deployment on representative embeddings.
+    """
+
+    kind = "pca"
+
+    def __init__(self, components: np.ndarray, mean: np.ndarray):
+        self.components = np.asarray(components, dtype=np.float32)  # (k, d)
+        self.mean = np.asarray(mean, dtype=np.float32)  # (d,)
+
+    @classmethod
+    def fit(cls, sample, n_components: int, center: bool = True) -> "PCAReducer":
+        sample = _as_matrix(sample)
+        if n_components > min(sample.shape):
+            raise ValueError(
+                f"n_components={n_components} exceeds sample shape {sample.shape}"
+            )
+        mean = sample.mean(axis=0) if center else np.zeros(sample.shape[1], np.float32)
+        _, _, vt = np.linalg.svd(sample - mean, full_matrices=False)
+        return cls(vt[:n_components], mean)
+
+    @property
+    def in_dim(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def out_dim(self) -> int:
+        return self.components.shape[0]
+
+    def transform(self, vectors) -> np.ndarray:
+        return (_as_matrix(vectors) - self.mean) @ self.components.T
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"components": self.components, "mean": self.mean}
+
+    def fingerprint(self) -> str:
+        return _fingerprint(self.state())
+
+
+class RandomProjection:
+    """
+    Data-independent Gaussian projection (Johnson-Lindenstrauss).
+    Needs no fitting; the seed fully determines the matrix.
+    """
+
+    kind = "random"
+
+    def __init__(self, in_dim: int, out_dim: int, seed: int = 0):
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.components = (
+            rng.standard_normal((out_dim, in_dim)) / np.sqrt(out_dim)
+        ).astype(np.float32)
+
+    @property
+    def in_dim(self) -> int:
+        return self.components.shape[1]
+
+    @property
+    def out_dim(self) -> int:
+        return self.components.shape[0]
+
+    def transform(self, vectors) -> np.ndarray:
+        return _as_matrix(vectors) @ self.components.T
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"shape": np.array(self.components.shape), "seed": np.array(self.seed)}
+
+    def fingerprint(self) -> str:
+        # The matrix itself, not just the seed, so a change in how the
+        # seed is expanded is caught too.
+        return _fingerprint({"components": self.components})
+
+
+class EmbeddingCodec:
+    """
+    Compact embedding representation: optional dimension reduction,
+    then scalar quantization.
+
+    - float32: full precision (the default, a no-op codec)
+    - float16: half precision, 2x smaller
+    - int8: symmetric per-vector scale (max |x| / 127), 4x smaller
+
+    Cosine similarity is invariant to the per-vector scale, so int8
+    codes can be compared directly without dequantizing.
+    """
+
+    def __init__(self, dtype: str = "float32", reducer=None):
+        if dtype not in CODEC_DTYPES:
+            raise ValueError(f"Unsupported codec dtype: {dtype}")
+        self.dtype = dtype
+        self.reducer = reducer
+
+    @property
+    def is_identity(self) -> bool:
+        return self.dtype == "float32" and self.reducer is None
+
+    def output_dim(self, dim: int) -> int:
+        return self.reducer.out_dim if self.reducer is not None else dim
+
+    def bytes_per_vector(self, dim: int) -> int:
+        out = self.output_dim(dim)
+        if self.dtype == "int8":
+            return out + 4  # codes + float32 scale
+        return out * np.dtype(self.dtype).itemsize
+
+    def describe(self) -> Dict:
+        """
+        What vectors encoded by this codec are compatible with. Reduced
+        codecs include a fingerprint of the fitted reducer, so a refit
+        PCA or another projection seed never matches.
+        """
+        info = {
+            "dtype": self.dtype,
+            "reducer": self.reducer.kind if self.reducer is not None else None,
+            "dim": self.reducer.out_dim if self.reducer is not None else None,
+        }
+        if self.reducer is not None:
+            info["fingerprint"] = self.reducer.fingerprint()
+        return info
+
+    # -------- Encode / decode --------
+
+    def reduce(self, vectors) -> np.ndarray:
+        """
+        Applies the reducer only; float32 (n, out_dim).
+        """
+        matrix = _as_matrix(vectors)
+        if self.reducer is not None:
+            matrix = self.reducer.transform(matrix).astype(np.float32, copy=False)
+        return matrix
+
+    def quantize(self, matrix: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Quantizes already-reduced vectors.
+        Returns (codes, scales); scales is None unless dtype is int8.
+        """
+        matrix = _as_matrix(matrix)
+        if self.dtype != "int8":
+            return matrix.astype(self.dtype), None
+
+        scales = np.abs(matrix).max(axis=1) / _INT8_MAX
+        scales[scales == 0] = 1.0
+        codes = np.rint(matrix / scales[:, None]).clip(-_INT8_MAX, _INT8_MAX)
+        return codes.astype(np.int8), scales.astype(np.float32)
+
+    def encode(self, vectors) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        return self.quantize(self.reduce(vectors))
+
+    def decode(self, codes: np.ndarray, scales: Optional[np.ndarray] = None) -> np.ndarray:
+        matrix = np.asarray(codes).astype(np.float32)
+        if scales is not None:
+            matrix *= np.asarray(scales, dtype=np.float32).reshape(-1, 1)
+        return matrix
+
+    def roundtrip(self, vectors) -> np.ndarray:
+        """
+        What a stored vector looks like after encoding and decoding.
+        """
+        return self.decode(*self.encode(vectors))
+
+    def pack(self, vector) -> bytes:
+        """
+        Serializes one vector (int8 is prefixed with its float32 scale).
+        """
+        codes, scales = self.encode(vector)
+        if scales is None:
+            return codes[0].tobytes()
+        return scales[:1].tobytes() + codes[0].tobytes()
+
+    def unpack(self, data: bytes) -> np.ndarray:
+        """
+        Inverse of `pack`; returns a float32 vector.
+        """
+        if self.dtype != "int8":
+            return np.frombuffer(data, dtype=self.dtype).astype(np.float32)
+        scale = np.frombuffer(data[:4], dtype=np.float32)[0]
+        return np.frombuffer(data[4:], dtype=np.int8).astype(np.float32) * scale
+
+    # -------- Persistence --------
+
+    def save(self, path: Path) -> None:
+        arrays = {f"reducer_{k}": v for k, v in (self.reducer.state() if self.reducer else {}).items()}
+        np.savez(
+            Path(path),
+            dtype=np.array(self.dtype),
+            reducer=np.array(self.reducer.kind if self.reducer else ""),
+            **arrays,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "EmbeddingCodec":
+        with np.load(Path(path)) as data:
+            kind = str(data["reducer"])
+            reducer = None
+            if kind == PCAReducer.kind:
+                reducer = PCAReducer(data["reducer_components"], data["reducer_mean"])
+            elif kind == RandomProjection.kind:
+                out_dim, in_dim = (int(x) for x in data["reducer_shape"])
+                reducer = RandomProjection(in_dim, out_dim, int(data["reducer_seed"]))
+            return cls(dtype=str(data["dtype"]), reducer=reducer)
+
+
+def evaluate_codec(
+    codec: EmbeddingCodec,
+    embeddings,
+    queries=None,
+    k: int = 10,
+    seed: int = 0,
+    max_pairs: int = 100_000,
+    max_queries: int = 1_000,
+) -> Dict[str, float]:
+    """
+    Compares a codec against full precision on a sample corpus.
+
+    - recall_at_k: overlap of exact cosine top-k (queries vs corpus)
+    - coherence_error: |average pairwise cosine| difference over the
+      whole corpus, i.e. the error `aggregate_patterns` would see
+    - mean/max_similarity_error: pairwise cosine error on sampled pairs
+    - compression: full-precision bytes / codec bytes per vector
+
+    Without `queries`, up to `max_queries` sampled corpus rows are
+    used and each row's own match is excluded, so the similarity
+    matrices stay max_queries x n rather than n x n.
+    """
+    rng = np.random.default_rng(seed)
+    corpus = _as_matrix(embeddings).astype(np.float64)
+    n = len(corpus)
+    full = normalize_rows(corpus)
+    coded = normalize_rows(codec.roundtrip(corpus))
+
+    pairs = min(max_pairs, n * (n - 1) // 2)
+    i = rng.integers(0, n, pairs)
+    j = rng.integers(0, n, pairs)
+    errors = np.abs(
+        np.einsum("ij,ij->i", full[i], full[j]) - np.einsum("ij,ij->i", coded[i], coded[j])
+    )
+
+    self_query = queries is None
+    if self_query:
+        rows = np.sort(rng.choice(n, size=min(max_queries, n), replace=False))
+        q_full, q_coded = full[rows], coded[rows]
+    else:
+        q_full = normalize_rows(_as_matrix(queries))
+        q_coded = normalize_rows(codec.roundtrip(queries))
+
+    k = min(k, n - (1 if self_query else 0))
+    recall = 1.0
+    if k > 0:
+        s_full = q_full @ full.T
+        s_coded = q_coded @ coded.T
+        if self_query:
+            own = np.arange(len(rows))
+            s_full[own, rows] = -np.inf
+            s_coded[own, rows] = -np.inf
+        top_full = np.argpartition(-s_full, k - 1, axis=1)[:, :k]
+        top_coded = np.argpartition(-s_coded, k - 1, axis=1)[:, :k]
+        recall = float(np.mean([
+            len(set(a) & set(b)) / k for a, b in zip(top_full, top_coded)
+        ]))
+
+    dim = corpus.shape[1]
+    return {
+        "recall_at_k": recall,
+        "k": k,
+        "coherence_error": abs(mean_pairwise_cosine(full) - mean_pairwise_cosine(coded)),
+        "mean_similarity_error": float(errors.mean()) if pairs else 0.0,
+        "max_similarity_error": float(errors.max()) if pairs else 0.0,
+        "bytes_per_vector": codec.bytes_per_vector(dim),
+        "compression": dim * 4 / codec.bytes_per_vector(dim),
+    }
@@ -0,0 +1,120 @@
+import hashlib
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from typing import Dict, FrozenSet
+
+TOKEN_RE = re.compile(r"\b\w+\b")
+
+NEGATIONS: FrozenSet[str] = frozenset({"not", "never", "nothing", "no"})
+# "can't" never survives TOKEN_RE; kept so feature values stay unchanged.
+CERTAINTY: FrozenSet[str] = frozenset({"always", "never", "every", "nothing", "can't"})
+FIRST_PERSON: FrozenSet[str] = frozenset({"i", "me", "my"})
+
+# Ingestion lexicons. Order matters only for float accumulation.
+NEGATIVE_WORDS = ("bad", "stuck", "tired", "hate", "nothing")
+POSITIVE_WORDS = ("good", "better", "calm", "happy", "progress")
+ABSOLUTIST_TERMS: FrozenSet[str] = frozenset({"always", "never", "nothing", "everything"})
+
+SENTIMENT_STEP = 0.2
+
+# Analyses kept in the memo, keyed by text hash (texts are not retained).
+MEMO_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class TextAnalysis:
+    """
+    Every lexical signal MindTrace derives from one text, computed from
+    a single tokenization.
+    """
+    token_count: int
+    unique_count: int
+    max_count: int
+    negation_count: int
+    certainty_count: int
+    first_person_count: int
+    question_marks: int
+    periods: int
+    negative_words: FrozenSet[str]
+    positive_words: FrozenSet[str]
+    absolutist: bool
+
+    def features(self) -> Dict[str, float]:
+        """
+        The `extract_features` dict; empty for texts without tokens.
+        """
+        n = self.token_count
+        if not n:
+            return {}
+        return {
+            "token_count": n,
+            "unique_ratio": self.unique_count / n,
+            "repetition_score": self.max_count / n,
+            "negation_freq": self.negation_count / n,
+            "certainty_freq": self.certainty_count / n,
+            "question_ratio": self.question_marks / max(1, self.periods),
+            "first_person_density": self.first_person_count / n,
+        }
+
+    @property
+    def sentiment_score(self) -> float:
+        """
+        Lexicon sentiment: -0.2 per negative word present, +0.2 per
+        positive word present, clamped to [-1, 1].
+        """
+        score = 0.0
+        for w in NEGATIVE_WORDS:
+            if w in self.negative_words:
+                score -= SENTIMENT_STEP
+        for w in POSITIVE_WORDS:
+            if w in self.positive_words:
+                score += SENTIMENT_STEP
+        return max(min(score, 1.0), -1.0)
+
+
+_NEGATIVE = frozenset(NEGATIVE_WORDS)
+_POSITIVE = frozenset(POSITIVE_WORDS)
+
+
+def _analyze(text: str) -> TextAnalysis:
+    counts = Counter(TOKEN_RE.findall(text.lower()))
+    vocab = counts.keys()
+    return TextAnalysis(
+        token_count=sum(counts.values()),
+        unique_count=len(counts),
+        max_count=max(counts.values(), default=0),
+        negation_count=sum(counts[w] for w in NEGATIONS),
+        certainty_count=sum(counts[w] for w in CERTAINTY),
+        first_person_count=sum(counts[w] for w in FIRST_PERSON),
+        question_marks=text.count("?"),
+        periods=text.count("."),
+        negative_words=frozenset(vocab & _NEGATIVE),
+        positive_words=frozenset(vocab & _POSITIVE),
+        absolutist=not ABSOLUTIST_TERMS.isdisjoint(vocab),
+    )
+
+
+_memo: "OrderedDict[bytes, TextAnalysis]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def analyze_text(text: str) -> TextAnalysis:
+    """
+    Memoized analysis of `text`, shared by feature extraction, chain
+    drift and ingestion.
+    """
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    with _memo_lock:
+        analysis = _memo.get(key)
+        if analysis is not None:
+            _memo.move_to_end(key)
+            return analysis
+
+    analysis = _analyze(text)
+    with _memo_lock:
+        _memo[key] = analysis
+        if len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return analysis
@@ -0,0 +1,223 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from mindtrace.nlp.quantization import EmbeddingCodec
+from mindtrace.storage.session_store import DATA_DIR
+
+EMBEDDINGS_DB = DATA_DIR / "embeddings.db"
+
+# Default size bound for stored vector bytes (~500k MiniLM vectors as int8).
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Eviction trims down to this fraction of max_bytes, so it runs in bursts.
+_EVICT_TARGET = 0.9
+
+_MAX_PARAMS = 900
+
+_BUSY_TIMEOUT_S = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model       TEXT    NOT NULL,
+    codec       TEXT    NOT NULL,
+    text_hash   BLOB    NOT NULL,
+    vector      BLOB    NOT NULL,
+    dim         INTEGER NOT NULL,
+    last_access INTEGER NOT NULL,
+    PRIMARY KEY (model, codec, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_embeddings_last_access
+    ON embeddings (last_access);
+"""
+
+
+def text_key(text: str) -> bytes:
+    """
+    Content address of a text: NFC-normalized, surrounding whitespace
+    stripped, hashed to 16 bytes.
+    """
+    normalized = unicodedata.normalize("NFC", text).strip()
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """
+    Disk-backed, content-addressed embedding cache.
+
+    Entries are keyed by (model name, text hash) and stored packed by
+    an `EmbeddingCodec` (float32 unless a compact dtype is given).
+    Stored bytes are bounded by `max_bytes`; the least recently used
+    entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        path: Path = EMBEDDINGS_DB,
+        codec: Optional[EmbeddingCodec] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        codec = codec or EmbeddingCodec()
+        if codec.reducer is not None:
+            # Reduction belongs to the vector store; cached vectors must
+            # stay in the model's own space.
+            raise ValueError("EmbeddingCache codecs must not reduce dimensions")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=_BUSY_TIMEOUT_S, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stored_bytes = self._count_bytes()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _count_bytes(self) -> int:
+        row = self._conn.execute("SELECT SUM(LENGTH(vector)) FROM embeddings").fetchone()
+        return int(row[0] or 0)
+
+    # -------- Read --------
+
+    def get_many(self, model_name: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """
+        Cached float32 vectors for `texts`, None where missing.
+        Hits are marked as recently used.
+        """
+        keys = [text_key(t) for t in texts]
+        unique = list(dict.fromkeys(keys))
+        found: Dict[bytes, np.ndarray] = {}
+
+        with self._lock:
+            for i in range(0, len(unique), _MAX_PARAMS):
+                chunk = unique[i:i + _MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                for key, blob in self._conn.execute(
+                    "SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND codec = ? AND text_hash IN ({placeholders})",
+                    [model_name, self.codec.dtype, *chunk],
+                ):
+                    found[bytes(key)] = self.codec.unpack(bytes(blob))
+
+            if found:
+                now = time.time_ns()
+                with self._conn:
+                    self._conn.executemany(
+                        "UPDATE embeddings SET last_access = ? "
+                        "WHERE model = ? AND codec = ? AND text_hash = ?",
+                        [(now, model_name, self.codec.dtype, k) for k in found],
+                    )
+
+            results = [found.get(k) for k in keys]
+            hits = sum(1 for r in results if r is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+
+        return results
+
+    def get(self, model_name: str, text: str) -> Optional[np.ndarray]:
+        return self.get_many(model_name, [text])[0]
+
+    # -------- Write --------
+
+    def put_many(self, model_name: str, texts: Sequence[str], vectors) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) != len(vectors):
+            raise ValueError("texts and vectors must be the same length")
+
+        now = time.time_ns()
+        rows = {
+            text_key(t): (self.codec.pack(v), int(v.shape[-1]))
+            for t, v in zip(texts, vectors)
+        }
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (model_name, self.codec.dtype, key, blob, dim, now)
+                        for key, (blob, dim) in rows.items()
+                    ],
+                )
+            self._stored_bytes += sum(len(blob) for blob, _ in rows.values())
+            if self._stored_bytes > self.max_bytes:
+                self._evict()
+
+    def put(self, model_name: str, text: str, vector) -> None:
+        self.put_many(model_name, [text], [vector])
+
+    def _evict(self) -> None:
+        """
+        Drops least recently used entries down to the eviction target.
+        The running byte count is an estimate (replacements and other
+        processes skew it), so it is recounted first.
+        """
+        self._stored_bytes = self._count_bytes()
+        excess = self._stored_bytes - int(self.max_bytes * _EVICT_TARGET)
+        if self._stored_bytes <= self.max_bytes or excess <= 0:
+            return
+
+        victims = []
+        freed = 0
+        cur = self._conn.execute(
+            "SELECT model, codec, text_hash, LENGTH(vector) FROM embeddings "
+            "ORDER BY last_access"
+        )
+        for model, codec, key, size in cur:
+            victims.append((model, codec, key))
+            freed += size
+            if freed >= excess:
+                break
+        cur.close()
+
+        with self._conn:
+            self._conn.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND codec = ? AND text_hash = ?",
+                victims,
+            )
+        self.evictions += len(victims)
+        self._stored_bytes -= freed
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM embeddings")
+            self._stored_bytes = 0
+
+    # -------- Stats --------
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Hit rate since open, plus storage: `bytes_saved` is what the
+        stored entries would take as float32 minus what they take.
+        """
+        with self._lock:
+            entries, stored, dims = self._conn.execute(
+                "SELECT COUNT(*), SUM(LENGTH(vector)), SUM(dim) FROM embeddings"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "stored_bytes": int(stored or 0),
+                "bytes_saved": int((dims or 0) * 4 - (stored or 0)),
+            }
@@ -0,0 +1,557 @@
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from mindtrace.nlp.quantization import EmbeddingCodec
+from mindtrace.storage.locking import FileLock
+from mindtrace.storage.session_cache import file_version
+from mindtrace.storage.session_store import user_path_name
+from mindtrace.storage.vector_store import SimilarSession, VectorStoreBackend
+
+# Full compaction once this fraction of rows is tombstoned.
+MAX_TOMBSTONE_RATIO = 0.25
+
+# The newest segments are merged while their combined size is at least
+# 1/MERGE_FACTOR of the segment before them. Segment sizes then shrink
+# geometrically, so there are O(log N) segments and each row is
+# rewritten O(log N) times.
+MERGE_FACTOR = 2
+
+# Rows dequantized at a time when scoring a compact segment.
+_SCORE_BLOCK = 65536
+
+
+def _lock_path(path: Path) -> Path:
+    # Beside the index directory, so deleting the directory never
+    # removes a lock file another process is waiting on.
+    return path.with_name(path.name + ".lock")
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+_OPS = {
+    "$eq": lambda a, b: a == b,
+    "$ne": lambda a, b: a != b,
+    "$gt": lambda a, b: a is not None and a > b,
+    "$gte": lambda a, b: a is not None and a >= b,
+    "$lt": lambda a, b: a is not None and a < b,
+    "$lte": lambda a, b: a is not None and a <= b,
+    "$in": lambda a, b: a in b,
+    "$nin": lambda a, b: a not in b,
+}
+
+
+def matches_where(metadata: Optional[Dict], where: Dict) -> bool:
+    """
+    Evaluates a Chroma-style `where` filter against one metadata dict.
+    Supports equality, $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin, $and and $or.
+    """
+    metadata = metadata or {}
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, c) for c in cond):
+                return False
+        elif isinstance(cond, dict):
+            value = metadata.get(key)
+            for op, operand in cond.items():
+                if op not in _OPS:
+                    raise ValueError(f"Unsupported where operator: {op}")
+                if not _OPS[op](value, operand):
+                    return False
+        elif metadata.get(key) != cond:
+            return False
+    return True
+
+
+class FlatIndex:
+    """
+    Exact in-process index for one user's vectors.
+
+    Layout under `path`:
+      manifest.json   segment list, dimension, tombstoned rows
+      seg-<n>.npy     normalized vectors in the codec's dtype, mmapped
+      seg-<n>.scales.npy  per-row scales (int8 codecs only)
+      seg-<n>.json    ids, metadatas and documents for that segment
+
+    Upserts write a new segment and tombstone superseded rows; small
+    trailing segments are merged size-tiered (see MERGE_FACTOR). Search
+    is a matrix-vector product per segment plus argpartition top-k.
+    `compact` rewrites live rows into a single segment.
+
+    Several processes may open the same index. Writes hold an exclusive
+    lock on `<path>.lock` and first reload if another process changed
+    the manifest; reads reload (under the shared lock) when it changed.
+    """
+
+    def __init__(self, path: Path, codec: Optional[EmbeddingCodec] = None):
+        self.path = Path(path)
+        self.codec = codec or EmbeddingCodec()
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(_lock_path(self.path))
+        self._reset()
+        if file_version(self.path / "manifest.json") is not None:
+            with self._file_lock.shared():
+                self._load()
+
+    def _reset(self) -> None:
+        self._segments: List[int] = []
+        self._vectors: List[np.ndarray] = []
+        self._scales: List[Optional[np.ndarray]] = []
+        self._ids: List[str] = []
+        self._metadatas: List[Optional[Dict]] = []
+        self._documents: List[Optional[str]] = []
+        self._deleted: set = set()
+        self._rows: Dict[str, int] = {}
+        self.dim: Optional[int] = None
+        self._version = None
+
+    # -------- Persistence --------
+
+    def _load(self) -> None:
+        manifest_path = self.path / "manifest.json"
+        self._version = file_version(manifest_path)
+        if self._version is None:
+            return
+
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        stored = manifest.get("codec", EmbeddingCodec().describe())
+        if stored != self.codec.describe():
+            raise ValueError(
+                f"Index at {self.path} was written with codec {stored}, "
+                f"not {self.codec.describe()}"
+            )
+        self.dim = manifest.get("dim")
+        self._deleted = set(manifest.get("deleted", []))
+
+        for seg in manifest["segments"]:
+            self._open_segment(seg)
+            side = json.loads((self.path / f"seg-{seg}.json").read_text(encoding="utf-8"))
+            self._ids.extend(side["ids"])
+            self._metadatas.extend(side["metadatas"])
+            self._documents.extend(side["documents"])
+
+        for row, sid in enumerate(self._ids):
+            if row not in self._deleted:
+                self._rows[sid] = row
+
+    def _open_segment(self, seg: int) -> None:
+        self._segments.append(seg)
+        self._vectors.append(np.load(self.path / f"seg-{seg}.npy", mmap_mode="r"))
+        scales_path = self.path / f"seg-{seg}.scales.npy"
+        self._scales.append(np.load(scales_path) if scales_path.exists() else None)
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "codec": self.codec.describe(),
+            "dim": self.dim,
+            "segments": self._segments,
+            "deleted": sorted(self._deleted),
+        }
+        tmp = self.path / "manifest.json.tmp"
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, self.path / "manifest.json")
+        self._version = file_version(self.path / "manifest.json")
+
+    def _stale(self) -> bool:
+        return file_version(self.path / "manifest.json") != self._version
+
+    def _refresh(self) -> None:
+        """
+        Reloads if another process changed the index. The caller holds
+        `_lock` and, for writes, the exclusive file lock.
+        """
+        if self._stale():
+            self._reset()
+            self._load()
+
+    @contextmanager
+    def _writing(self):
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._file_lock.exclusive():
+                self._refresh()
+                yield
+
+    @contextmanager
+    def _reading(self):
+        with self._lock:
+            if self._stale():
+                with self._file_lock.shared():
+                    self._refresh()
+            yield
+
+    def _write_segment(
+        self,
+        codes: np.ndarray,
+        scales: Optional[np.ndarray],
+        ids: List[str],
+        metadatas: List[Optional[Dict]],
+        documents: List[Optional[str]],
+    ) -> int:
+        seg = (self._segments[-1] + 1) if self._segments else 0
+        np.save(self.path / f"seg-{seg}.npy", codes)
+        if scales is not None:
+            np.save(self.path / f"seg-{seg}.scales.npy", scales)
+        (self.path / f"seg-{seg}.json").write_text(
+            json.dumps({"ids": ids, "metadatas": metadatas, "documents": documents}),
+            encoding="utf-8",
+        )
+        return seg
+
+    # -------- Write --------
+
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings,
+        documents: List[Optional[str]],
+        metadatas: List[Optional[Dict]],
+        reduced: bool = False,
+    ) -> None:
+        if not ids:
+            return
+
+        vectors = _normalize(embeddings if reduced else self.codec.reduce(embeddings))
+        with self._writing():
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} != index dimension {self.dim}"
+                )
+
+            # Last write wins for ids repeated inside one batch.
+            last = {sid: i for i, sid in enumerate(ids)}
+            keep = sorted(last.values())
+            ids = [ids[i] for i in keep]
+            vectors = vectors[keep]
+            documents = [documents[i] for i in keep]
+            metadatas = [metadatas[i] for i in keep]
+
+            self.path.mkdir(parents=True, exist_ok=True)
+            codes, scales = self.codec.quantize(vectors)
+
+            for sid in ids:
+                old = self._rows.get(sid)
+                if old is not None:
+                    self._deleted.add(old)
+
+            # The new rows and the small segments they tier with go out
+            # as one segment.
+            start = len(self._segments)
+            size = len(ids)
+            while start > 0 and size * MERGE_FACTOR >= len(self._vectors[start - 1]):
+                start -= 1
+                size += len(self._vectors[start])
+            self._merge(start, (codes, scales, ids, metadatas, documents))
+            self._maybe_compact()
+
+    def delete(self, ids: List[str]) -> None:
+        with self._writing():
+            changed = False
+            for sid in ids:
+                row = self._rows.pop(sid, None)
+                if row is not None:
+                    self._deleted.add(row)
+                    changed = True
+            if changed:
+                self._write_manifest()
+                self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        total = len(self._ids)
+        if total and len(self._deleted) / total > MAX_TOMBSTONE_RATIO:
+            # Not compact(): the file lock is already held, and flock
+            # does not nest across descriptors.
+            self._merge(0)
+
+    def compact(self) -> None:
+        """
+        Rewrites live rows into one segment and drops tombstones.
+        """
+        with self._writing():
+            self._merge(0)
+
+    def _merge(self, start: int, extra: Optional[tuple] = None) -> None:
+        """
+        Rewrites segments[start:] as one segment without their
+        tombstoned rows, followed by `extra` (codes, scales, ids,
+        metadatas, documents) if given. Rows in earlier segments keep
+        their numbers.
+        """
+        base = sum(len(v) for v in self._vectors[:start])
+        live = [row for row in range(base, len(self._ids)) if row not in self._deleted]
+        old_segments = self._segments[start:]
+
+        ids, metadatas, documents = [], [], []
+        code_parts, scale_parts = [], []
+        if live:
+            # Codes are copied as-is, so merging never requantizes.
+            local = [row - base for row in live]
+            code_parts.append(np.concatenate(self._vectors[start:])[local])
+            if self._scales[start] is not None:
+                scale_parts.append(np.concatenate(self._scales[start:])[local])
+            ids = [self._ids[r] for r in live]
+            metadatas = [self._metadatas[r] for r in live]
+            documents = [self._documents[r] for r in live]
+        if extra is not None:
+            codes, scales, new_ids, new_metadatas, new_documents = extra
+            code_parts.append(codes)
+            if scales is not None:
+                scale_parts.append(scales)
+            ids += new_ids
+            metadatas += new_metadatas
+            documents += new_documents
+
+        seg = None
+        if ids:
+            codes = np.concatenate(code_parts)
+            scales = np.concatenate(scale_parts) if scale_parts else None
+            # Written before the lists are cut, so it gets a fresh number.
+            seg = self._write_segment(codes, scales, ids, metadatas, documents)
+
+        del self._segments[start:], self._vectors[start:], self._scales[start:]
+        if seg is not None:
+            self._open_segment(seg)
+
+        self._ids = self._ids[:base] + ids
+        self._metadatas = self._metadatas[:base] + metadatas
+        self._documents = self._documents[:base] + documents
+        self._deleted = {row for row in self._deleted if row < base}
+        for offset, sid in enumerate(ids):
+            self._rows[sid] = base + offset
+        self._write_manifest()
+
+        for old in old_segments:
+            for suffix in (".npy", ".scales.npy", ".json"):
+                (self.path / f"seg-{old}{suffix}").unlink(missing_ok=True)
+
+    # -------- Read --------
+
+    def _matrix(self) -> np.ndarray:
+        """
+        All rows, decoded to float32.
+        """
+        if not self._vectors:
+            return np.zeros((0, self.dim or 0), dtype=np.float32)
+        if self.codec.dtype == "float32" and len(self._vectors) == 1:
+            return self._vectors[0]
+        return np.concatenate([
+            self.codec.decode(codes, scales)
+            for codes, scales in zip(self._vectors, self._scales)
+        ])
+
+    def _scores(self, codes: np.ndarray, scales: Optional[np.ndarray], q: np.ndarray) -> np.ndarray:
+        """
+        Segment rows @ queries. Compact dtypes are upcast block by block,
+        so the transient float32 copy stays bounded.
+        """
+        if codes.dtype == np.float32:
+            return codes @ q.T
+        out = np.empty((len(codes), len(q)), dtype=np.float32)
+        for i in range(0, len(codes), _SCORE_BLOCK):
+            out[i:i + _SCORE_BLOCK] = codes[i:i + _SCORE_BLOCK].astype(np.float32) @ q.T
+        if scales is not None:
+            out *= scales[:, None]
+        return out
+
+    def __len__(self) -> int:
+        with self._reading():
+            return len(self._rows)
+
+    def search(
+        self,
+        queries,
+        top_k: int,
+        where: Optional[Dict] = None,
+        include_metadata: bool = True,
+        include_documents: bool = False,
+    ) -> List[List[SimilarSession]]:
+        """
+        Exact cosine search. Returns, per query, hits ranked by
+        ascending cosine distance (1 - similarity).
+
+        Hits are resolved under the index lock, since a concurrent
+        upsert or delete may compact and renumber rows.
+        """
+        if len(queries) == 0:
+            return []
+
+        q = _normalize(self.codec.reduce(queries))
+        with self._reading():
+            total = len(self._ids)
+            if total == 0 or top_k <= 0:
+                return [[] for _ in range(len(q))]
+
+            scores = np.concatenate([
+                self._scores(codes, scales, q)
+                for codes, scales in zip(self._vectors, self._scales)
+            ])  # (N, m)
+
+            valid = np.ones(total, dtype=bool)
+            if self._deleted:
+                valid[list(self._deleted)] = False
+            if where:
+                for row in np.flatnonzero(valid):
+                    if not matches_where(self._metadatas[row], where):
+                        valid[row] = False
+
+            candidates = np.flatnonzero(valid)
+            if len(candidates) == 0:
+                return [[] for _ in range(len(q))]
+
+            scores = scores[candidates]
+            k = min(top_k, len(candidates))
+            results = []
+            for col in range(scores.shape[1]):
+                column = scores[:, col]
+                top = np.argpartition(-column, k - 1)[:k] if k < len(column) else np.arange(len(column))
+                top = top[np.argsort(-column[top], kind="stable")]
+                results.append([
+                    self._hit(int(candidates[i]), float(1.0 - column[i]), include_metadata, include_documents)
+                    for i in top
+                ])
+            return results
+
+    def _hit(self, row: int, distance: float, include_metadata: bool, include_documents: bool) -> SimilarSession:
+        return SimilarSession(
+            session_id=self._ids[row],
+            distance=distance,
+            metadata=self._metadatas[row] if include_metadata else None,
+            document=self._documents[row] if include_documents else None,
+        )
+
+    def records(self) -> tuple:
+        """
+        Live rows in row order as (ids, float32 matrix, documents,
+        metadatas), taken under the lock.
+        """
+        with self._reading():
+            rows = sorted(self._rows.values())
+            matrix = self._matrix()[rows]
+            return (
+                [self._ids[r] for r in rows],
+                matrix,
+                [self._documents[r] for r in rows],
+                [self._metadatas[r] for r in rows],
+            )
+
+
+class FlatVectorStore(VectorStoreBackend):
+    """
+    Pure-NumPy vector store: one exact FlatIndex per user.
+    Suited to per-user corpora of up to ~100k vectors; no chromadb
+    import or client startup. Distances are cosine distances.
+
+    With an `EmbeddingCodec`, vectors are reduced and stored quantized
+    (float16 / int8), cutting index memory 2-4x before any reduction.
+    """
+
+    def __init__(
+        self,
+        persist_dir: str = "data/flat_index",
+        codec: Optional[EmbeddingCodec] = None,
+    ):
+        self.persist_dir = Path(persist_dir)
+        self.codec = codec
+        self._indexes: Dict[str, FlatIndex] = {}
+        self._lock = threading.Lock()
+
+    def _index(self, user_id: str) -> FlatIndex:
+        index = self._indexes.get(user_id)
+        if index is not None:
+            return index
+
+        name = user_path_name(user_id)
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = FlatIndex(self.persist_dir / name, self.codec)
+                self._indexes[user_id] = index
+        return index
+
+    # -------- Write --------
+
+    def upsert_sessions(
+        self,
+        user_id: str,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[Dict],
+        reduced: bool = False,
+    ):
+        if not (len(ids) == len(embeddings) == len(texts) == len(metadatas)):
+            raise ValueError("ids, embeddings, texts and metadatas must be the same length")
+        self._index(user_id).upsert(
+            list(ids), embeddings, list(texts), list(metadatas), reduced=reduced
+        )
+
+    # -------- Read --------
+
+    def query_similar_sessions_batch(
+        self,
+        user_id: str,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        where: Optional[Dict] = None,
+        include_metadata: bool = True,
+        include_documents: bool = False,
+    ) -> List[List[SimilarSession]]:
+        return self._index(user_id).search(
+            query_embeddings, top_k, where, include_metadata, include_documents
+        )
+
+    # -------- Export --------
+
+    def list_user_ids(self) -> List[str]:
+        if not self.persist_dir.exists():
+            return []
+        return sorted(
+            p.name for p in self.persist_dir.iterdir()
+            if (p / "manifest.json").exists()
+        )
+
+    def iter_user_records(self, user_id: str, batch_size: Optional[int] = None):
+        ids, matrix, documents, metadatas = self._index(user_id).records()
+        step = batch_size or max(1, len(ids))
+
+        for i in range(0, len(ids), step):
+            yield (
+                ids[i:i + step],
+                matrix[i:i + step].tolist(),
+                documents[i:i + step],
+                metadatas[i:i + step],
+            )
+
+    # -------- Delete --------
+
+    def delete_session(self, user_id: str, session_id: str):
+        self._index(user_id).delete([session_id])
+
+    def delete_user(self, user_id: str):
+        path = self.persist_dir / user_path_name(user_id)
+        with self._lock:
+            self._indexes.pop(user_id, None)
+        if self.persist_dir.exists():
+            with FileLock(_lock_path(path)).exclusive():
+                shutil.rmtree(path, ignore_errors=True)
+
+    def compact(self, user_id: str) -> None:
+        self._index(user_id).compact()
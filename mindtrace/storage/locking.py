@@ -0,0 +1,140 @@
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, List, Optional
+
+from mindtrace.storage.session_cache import file_version
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+
+class FileLock:
+    """
+    Advisory inter-process lock on a sidecar file (flock).
+
+    Every acquisition opens its own descriptor, so threads of one
+    process exclude each other exactly like separate processes do.
+    Without fcntl (non-POSIX) this degrades to a process-local lock.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.RLock()
+
+    @contextmanager
+    def _acquire(self, mode: int) -> Iterator[None]:
+        if fcntl is None:
+            with self._local:
+                yield
+            return
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    def exclusive(self):
+        return self._acquire(fcntl.LOCK_EX if fcntl else 0)
+
+    def shared(self):
+        return self._acquire(fcntl.LOCK_SH if fcntl else 0)
+
+
+class _Entry:
+    __slots__ = ("record", "payload", "done", "error")
+
+    def __init__(self, record: Any, payload: bytes):
+        self.record = record
+        self.payload = payload
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class GroupCommitLog:
+    """
+    Write-ahead queue in front of an append-only line log.
+
+    Callers block until their record is durable. Whoever finds no
+    commit in flight becomes the leader: it takes every queued record,
+    writes them under the exclusive file lock and issues one fsync.
+    Records that arrive meanwhile queue up for the next leader, so
+    throughput grows with concurrency instead of paying one fsync each.
+
+    `on_commit(records, before, after)` runs inside the lock with the
+    log's file version before and after the batch, letting callers fold
+    the batch into in-memory state without rereading the file.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lock: FileLock,
+        on_commit: Optional[Callable[[List[Any], Any, Any], None]] = None,
+    ):
+        self.path = Path(path)
+        self.lock = lock
+        self.on_commit = on_commit
+        self._cond = threading.Condition()
+        self._queue: List[_Entry] = []
+        self._leader_active = False
+        self.commits = 0
+        self.records = 0
+
+    def append(self, record: Any, payload: bytes) -> None:
+        entry = _Entry(record, payload)
+
+        with self._cond:
+            self._queue.append(entry)
+            while not entry.done:
+                if self._leader_active:
+                    self._cond.wait()
+                    continue
+
+                self._leader_active = True
+                batch, self._queue = self._queue, []
+                self._cond.release()
+                error: Optional[BaseException] = None
+                try:
+                    self._commit(batch)
+                except BaseException as e:
+                    error = e
+                finally:
+                    self._cond.acquire()
+                    self._leader_active = False
+                    for pending in batch:
+                        pending.done = True
+                        pending.error = error
+                    self._cond.notify_all()
+
+        if entry.error is not None:
+            raise entry.error
+
+    def _commit(self, batch: List[_Entry]) -> None:
+        data = b"".join(e.payload for e in batch)
+
+        with self.lock.exclusive():
+            before = file_version(self.path)
+            with open(self.path, "a+b") as f:
+                # Terminate a torn tail so the batch starts on its own line.
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            after = file_version(self.path)
+
+            self.commits += 1
+            self.records += len(batch)
+            if self.on_commit is not None:
+                self.on_commit([e.record for e in batch], before, after)
@@ -0,0 +1,345 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from mindtrace.core.memory_schemas import CognitivePattern
+from mindtrace.core.pattern_persistence import detected_pattern_types, upsert_pattern
+from mindtrace.core.patterns import PatternResult
+from mindtrace.storage.locking import FileLock
+from mindtrace.storage.session_store import DATA_DIR, user_path_name
+
+logger = logging.getLogger(__name__)
+
+PATTERN_STORE_DIR = DATA_DIR / "cognitive_patterns"
+PATTERN_STORE_VERSION = 1
+
+# Seconds between background flushes of dirty users.
+FLUSH_INTERVAL = 1.0
+
+# What a corrupt or foreign user file raises when parsed (JSON and
+# pydantic validation errors are ValueErrors).
+_BAD_FILE_ERRORS = (ValueError, KeyError, TypeError)
+
+
+def _utc(value: datetime) -> datetime:
+    # Records written before timestamps were timezone-aware are naive UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=UTC)
+    return value.astimezone(UTC)
+
+
+def _merge_patterns(
+    base: Dict[str, CognitivePattern],
+    incoming: Iterable[CognitivePattern],
+) -> Dict[str, CognitivePattern]:
+    """
+    Union by pattern_type. Where both sides have a type, the more
+    recently detected record wins, keeping the earliest first_detected
+    and the pattern_id from `base`.
+    """
+    merged = dict(base)
+    for pattern in incoming:
+        current = merged.get(pattern.pattern_type)
+        if current is None:
+            merged[pattern.pattern_type] = pattern
+            continue
+        newer = pattern if _utc(pattern.last_detected) >= _utc(current.last_detected) else current
+        merged[pattern.pattern_type] = newer.model_copy(update={
+            "pattern_id": current.pattern_id,
+            "first_detected": min(_utc(current.first_detected), _utc(pattern.first_detected)),
+            "last_detected": _utc(newer.last_detected),
+        })
+    return merged
+
+
+class CognitivePatternStore:
+    """
+    Per-user CognitivePattern memory, indexed by pattern_type.
+
+    Users are loaded from `<path>/<user_id>.json` on first access.
+    Updates are O(1) dict operations that only mark the user dirty; a
+    background thread writes dirty users every `flush_interval` seconds,
+    so the ingestion path never waits on disk. `flush()` writes
+    synchronously and `close()` stops the flusher after a final flush
+    (also run at interpreter exit).
+
+    Several processes (e.g. server workers) may share one directory:
+    flushes hold an exclusive file lock and merge with what is on disk
+    (see `_merge_patterns`) before replacing a file atomically, then
+    fold the merged records back in. A worker therefore sees other
+    workers' patterns for a user after its next flush of that user.
+
+    A user file that cannot be parsed is logged and treated as empty;
+    the next flush of that user moves it aside as
+    `<user_id>.json.corrupt-<time>` before writing.
+    """
+
+    def __init__(
+        self,
+        path: Path = PATTERN_STORE_DIR,
+        flush_interval: Optional[float] = FLUSH_INTERVAL,
+    ):
+        self.path = Path(path)
+        # None disables the background flusher; call flush() yourself.
+        self.flush_interval = flush_interval
+        self._file_lock = FileLock(self.path / ".lock")
+        self._atexit_registered = False
+        self._reset_state()
+        self.flushes = 0
+        self.writes = 0
+        _stores.add(self)
+
+    def _reset_state(self) -> None:
+        self._users: Dict[str, Dict[str, CognitivePattern]] = {}
+        self._dirty: set = set()
+        # Users whose next flush replaces the file instead of merging.
+        self._replace: set = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _after_fork_in_child(self) -> None:
+        # Locks may have been held at fork time (the flusher holds
+        # _flush_lock while writing), and the parent flushes whatever
+        # it had pending, so the child starts empty and reloads lazily.
+        self._file_lock = FileLock(self.path / ".lock")
+        self._reset_state()
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{user_path_name(key)}.json"
+
+    # -------- Lazy load --------
+
+    def _read(self, key: str) -> Dict[str, CognitivePattern]:
+        try:
+            data = json.loads(self._file(key).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        index: Dict[str, CognitivePattern] = {}
+        for raw in data["patterns"]:
+            pattern = CognitivePattern.model_validate(raw)
+            index.setdefault(pattern.pattern_type, pattern)
+        return index
+
+    def _index(self, key: str) -> Dict[str, CognitivePattern]:
+        """
+        The user's pattern index; the caller must hold `_lock`.
+        """
+        index = self._users.get(key)
+        if index is None:
+            self._file(key)  # rejects ids that are not safe file names
+            # Read outside the lock so one cold user does not stall others.
+            self._lock.release()
+            try:
+                loaded = self._read(key)
+            except _BAD_FILE_ERRORS:
+                logger.exception("Unreadable cognitive pattern file for user %r", key)
+                loaded = {}
+            finally:
+                self._lock.acquire()
+            index = self._users.setdefault(key, loaded)
+        return index
+
+    # -------- Reads --------
+
+    def patterns(self, user_id) -> List[CognitivePattern]:
+        with self._lock:
+            return list(self._index(str(user_id)).values())
+
+    def get(self, user_id, pattern_type: str) -> Optional[CognitivePattern]:
+        with self._lock:
+            return self._index(str(user_id)).get(pattern_type)
+
+    # -------- Writes --------
+
+    def upsert(
+        self,
+        user_id,
+        pattern_type: str,
+        recurrence_level: str,
+        now: Optional[datetime] = None,
+    ) -> CognitivePattern:
+        key = str(user_id)
+        with self._lock:
+            pattern, _ = upsert_pattern(
+                self._index(key), user_id, pattern_type, recurrence_level,
+                now or datetime.now(UTC),
+            )
+            self._dirty.add(key)
+        self._ensure_flusher()
+        return pattern
+
+    def record(self, user_id, pattern_result: PatternResult) -> List[CognitivePattern]:
+        """
+        Store counterpart of `persist_cognitive_patterns`: upserts the
+        detected patterns and returns the user's active patterns.
+        """
+        key = str(user_id)
+        types = detected_pattern_types(pattern_result)
+        now = datetime.now(UTC)
+        with self._lock:
+            index = self._index(key)
+            for pattern_type in types:
+                upsert_pattern(index, user_id, pattern_type, pattern_result.risk_level, now)
+            if types:
+                self._dirty.add(key)
+            patterns = list(index.values())
+        if types:
+            self._ensure_flusher()
+        return patterns
+
+    def delete_user(self, user_id) -> None:
+        key = str(user_id)
+        with self._lock:
+            self._users[key] = {}
+            self._dirty.add(key)
+            self._replace.add(key)
+        self._ensure_flusher()
+
+    # -------- Write-behind --------
+
+    def flush(self) -> int:
+        """
+        Writes every dirty user now. Returns the number of files written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                replacing, self._replace = self._replace & dirty, self._replace - dirty
+                # Copied under the lock so concurrent upserts cannot tear
+                # a record; disk I/O happens outside it.
+                pending = {
+                    key: [p.model_copy() for p in self._users[key].values()]
+                    for key in dirty
+                }
+
+            written: Dict[str, Dict[str, CognitivePattern]] = {}
+            try:
+                if pending:
+                    self.path.mkdir(parents=True, exist_ok=True)
+                    with self._file_lock.exclusive():
+                        for key, patterns in pending.items():
+                            try:
+                                base = {} if key in replacing else self._read_for_merge(key)
+                                merged = _merge_patterns(base, patterns)
+                                self._write(key, list(merged.values()))
+                            except Exception:
+                                # Stays dirty and is retried on the next flush.
+                                logger.exception("Flushing cognitive patterns for user %r failed", key)
+                                continue
+                            written[key] = merged
+            finally:
+                failed = dirty - written.keys()
+                if failed:
+                    with self._lock:
+                        self._dirty |= failed
+                        self._replace |= replacing & failed
+
+            with self._lock:
+                for key, merged in written.items():
+                    self._users[key] = _merge_patterns(merged, self._users[key].values())
+
+            self.flushes += 1
+            self.writes += len(written)
+            return len(written)
+
+    def _read_for_merge(self, key: str) -> Dict[str, CognitivePattern]:
+        """
+        `_read` for a flush, which holds the exclusive file lock: a file
+        that cannot be parsed is moved aside and counts as empty.
+        """
+        try:
+            return self._read(key)
+        except _BAD_FILE_ERRORS:
+            target = self._file(key)
+            aside = target.with_name(f"{target.name}.corrupt-{time.time_ns()}")
+            logger.exception("Unreadable cognitive pattern file %s, moved to %s", target, aside)
+            os.replace(target, aside)
+            return {}
+
+    def _write(self, key: str, patterns: List[CognitivePattern]) -> None:
+        target = self._file(key)
+        if not patterns:
+            target.unlink(missing_ok=True)
+            return
+        tmp = target.with_suffix(".json.tmp")
+        tmp.write_text(
+            json.dumps({
+                "version": PATTERN_STORE_VERSION,
+                "patterns": [p.model_dump(mode="json") for p in patterns],
+            }),
+            encoding="utf-8",
+        )
+        os.replace(tmp, target)
+
+    def _ensure_flusher(self) -> None:
+        if self.flush_interval is None:
+            return
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._flush_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if not self._atexit_registered:
+                # Inherited by forked children, so registered once.
+                atexit.register(self.close)
+                self._atexit_registered = True
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="mindtrace-pattern-flush", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            if self._dirty:
+                try:
+                    self.flush()
+                except Exception:
+                    # Users stay dirty; retried on the next tick.
+                    logger.exception("Background cognitive pattern flush failed")
+
+    def close(self) -> None:
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+
+
+_stores: "weakref.WeakSet[CognitivePatternStore]" = weakref.WeakSet()
+
+
+def _after_fork_in_child() -> None:
+    for store in list(_stores):
+        store._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+_store: Optional[CognitivePatternStore] = None
+_store_lock = threading.Lock()
+
+
+def get_pattern_store() -> CognitivePatternStore:
+    """
+    Process-wide pattern store, so in-memory state and the flusher are
+    shared by every caller.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CognitivePatternStore()
+    return _store
@@ -0,0 +1,370 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import zlib
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from typing import Collection, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from mindtrace.core.types import Session
+from mindtrace.storage.locking import FileLock
+from mindtrace.storage.session_store import DATA_DIR, iter_sessions
+
+ARCHIVE_DIR = DATA_DIR / "archive"
+ARCHIVE_VERSION = 1
+
+# Columnar layout (one file per column, all NumPy arrays mmapped on open):
+#   session_ids.npy   <U   (N,)
+#   user_codes.npy    int32 (N,)    index into users.json, -1 = no user
+#   times.npy         int64 (N, 2)  started/ended, microseconds since epoch
+#   tz.npy            int32 (N, 2)  UTC offset seconds, _NAIVE = naive
+#   tag_offsets.npy   int64 (N+1,)  CSR row pointers into tag_ids
+#   tag_ids.npy       int32 (T,)    index into tags.json
+#   text_offsets.npy  int64 (N+1,)  byte ranges into texts.bin
+#   texts.bin         zlib-compressed texts, one stream per session
+# Rows are ordered by started_at.
+#
+# Each archive written is a generation under <path>/:
+#   CURRENT    {"generation": n}, replaced atomically
+#   gen-<n>/   the columns above
+# Archives written before generations hold the columns in <path> itself.
+_GEN_RE = re.compile(r"^gen-(\d+)$")
+_ARCHIVE_FILES = (
+    "manifest.json", "tags.json", "users.json", "session_ids.npy", "user_codes.npy",
+    "times.npy", "tz.npy", "tag_offsets.npy", "tag_ids.npy", "text_offsets.npy", "texts.bin",
+)
+_OPEN_RETRIES = 5
+
+_EPOCH = datetime(1970, 1, 1)
+_MICRO = timedelta(microseconds=1)
+_NAIVE = np.iinfo(np.int32).min
+
+
+def _encode_dt(dt: datetime) -> Tuple[int, int]:
+    offset = dt.utcoffset()
+    if offset is None:
+        return (dt - _EPOCH) // _MICRO, _NAIVE
+    utc_wall = dt.replace(tzinfo=None) - offset
+    return (utc_wall - _EPOCH) // _MICRO, int(offset.total_seconds())
+
+
+def _decode_dt(micros: int, offset: int) -> datetime:
+    wall = _EPOCH + timedelta(microseconds=int(micros))
+    if offset == _NAIVE:
+        return wall
+    delta = timedelta(seconds=int(offset))
+    return (wall + delta).replace(tzinfo=timezone(delta))
+
+
+def _read_current(path: Path) -> Optional[dict]:
+    try:
+        return json.loads((path / "CURRENT").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+class ArchivedSession(Session):
+    """
+    Session backed by an archive row.
+    Metadata is materialized eagerly; `text` is decompressed
+    on first access only.
+
+    Keeps Session's constructor signature (the archive row is
+    keyword-only), so `dataclasses.replace` and copies work as on
+    any Session.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        started_at: datetime,
+        ended_at: datetime,
+        text: Optional[str] = None,
+        confirmed_tags: Optional[List[str]] = None,
+        user_id: Optional[str] = None,
+        *,
+        archive: Optional["SessionArchive"] = None,
+        row: int = -1,
+    ):
+        if text is None and archive is None:
+            raise TypeError("ArchivedSession needs either text or an archive row")
+        self.session_id = session_id
+        self.started_at = started_at
+        self.ended_at = ended_at
+        self.confirmed_tags = confirmed_tags if confirmed_tags is not None else []
+        self.user_id = user_id
+        self._archive = archive
+        self._row = row
+        self._text: Optional[str] = text
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self._archive.text(self._row)
+        return self._text
+
+    @text.setter
+    def text(self, value: str) -> None:
+        self._text = value
+
+
+class SessionArchive:
+    """
+    Read-only, memory-mapped columnar archive of cold session history.
+    """
+
+    def __init__(self, path: Path = ARCHIVE_DIR):
+        self.path = Path(path)
+        self.generation: Optional[int] = None
+
+        current = _read_current(self.path)
+        for _ in range(_OPEN_RETRIES):
+            self.generation = current["generation"] if current else None
+            self._dir = self.path if current is None else self.path / f"gen-{self.generation}"
+            try:
+                self._open()
+                return
+            except FileNotFoundError:
+                # A writer replaced (and pruned) what CURRENT pointed at
+                # while opening; retry with the new one.
+                latest = _read_current(self.path)
+                if latest == current:
+                    raise
+                current = latest
+        raise RuntimeError(f"Archive under {self.path} kept changing while opening")
+
+    def _open(self) -> None:
+        manifest = json.loads((self._dir / "manifest.json").read_text(encoding="utf-8"))
+        if manifest.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported archive version: {manifest.get('version')}")
+
+        self.tags: List[str] = json.loads((self._dir / "tags.json").read_text(encoding="utf-8"))
+        self.users: List[str] = json.loads((self._dir / "users.json").read_text(encoding="utf-8"))
+        self._tag_index = {t: i for i, t in enumerate(self.tags)}
+        self._user_index = {u: i for i, u in enumerate(self.users)}
+
+        self.session_ids = self._column("session_ids.npy")
+        self.user_codes = self._column("user_codes.npy")
+        self.times = self._column("times.npy")
+        self.tz = self._column("tz.npy")
+        self.tag_offsets = self._column("tag_offsets.npy")
+        self.tag_ids = self._column("tag_ids.npy")
+        self.text_offsets = self._column("text_offsets.npy")
+
+        texts_path = self._dir / "texts.bin"
+        self._texts = (
+            np.memmap(texts_path, dtype=np.uint8, mode="r")
+            if texts_path.stat().st_size
+            else np.zeros(0, dtype=np.uint8)
+        )
+
+    def _column(self, name: str) -> np.ndarray:
+        return np.load(self._dir / name, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.session_ids)
+
+    def text(self, row: int) -> str:
+        start, end = int(self.text_offsets[row]), int(self.text_offsets[row + 1])
+        return zlib.decompress(self._texts[start:end].tobytes()).decode("utf-8")
+
+    def session(self, row: int) -> ArchivedSession:
+        t0, t1 = int(self.tag_offsets[row]), int(self.tag_offsets[row + 1])
+        user_code = int(self.user_codes[row])
+        return ArchivedSession(
+            archive=self,
+            row=row,
+            session_id=str(self.session_ids[row]),
+            started_at=_decode_dt(self.times[row, 0], self.tz[row, 0]),
+            ended_at=_decode_dt(self.times[row, 1], self.tz[row, 1]),
+            confirmed_tags=[self.tags[i] for i in self.tag_ids[t0:t1]],
+            user_id=self.users[user_code] if user_code >= 0 else None,
+        )
+
+    def _select_rows(
+        self,
+        tag: Optional[str],
+        start: Optional[datetime],
+        end: Optional[datetime],
+        session_ids: Optional[Collection[str]],
+        user_id: Optional[str],
+    ) -> np.ndarray:
+        """
+        Vectorized row selection over the metadata columns.
+        """
+        started = self.times[:, 0]
+        lo = 0 if start is None else int(np.searchsorted(started, _encode_dt(start)[0], side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(started, _encode_dt(end)[0], side="left"))
+        mask = np.zeros(len(self), dtype=bool)
+        mask[lo:hi] = True
+
+        if tag is not None:
+            tag_id = self._tag_index.get(tag)
+            tagged = np.zeros(len(self), dtype=bool)
+            if tag_id is not None:
+                hits = np.flatnonzero(np.asarray(self.tag_ids) == tag_id)
+                tagged[np.searchsorted(self.tag_offsets, hits, side="right") - 1] = True
+            mask &= tagged
+
+        if user_id is not None:
+            code = self._user_index.get(user_id, -2)
+            mask &= np.asarray(self.user_codes) == code
+
+        if session_ids is not None:
+            mask &= np.isin(self.session_ids, list(session_ids))
+
+        return np.flatnonzero(mask)
+
+    def iter_sessions(
+        self,
+        tag: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        session_ids: Optional[Collection[str]] = None,
+        user_id: Optional[str] = None,
+    ) -> Iterator[ArchivedSession]:
+        """
+        Chronological sessions matching the filters, with [start, end)
+        on started_at. Texts stay compressed until accessed.
+        """
+        for row in self._select_rows(tag, start, end, session_ids, user_id):
+            yield self.session(int(row))
+
+    def load_sessions(self, **filters) -> List[ArchivedSession]:
+        return list(self.iter_sessions(**filters))
+
+
+def write_session_archive(
+    sessions: Iterable[Session],
+    path: Path = ARCHIVE_DIR,
+) -> int:
+    """
+    Builds an archive from `sessions` and publishes it as the next
+    generation under `path`.
+
+    Texts are compressed and streamed to disk as they arrive, so only
+    metadata is held in memory while writing.
+    Returns the number of archived sessions.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=path, prefix=".gen-"))
+
+    try:
+        session_ids: List[str] = []
+        user_codes: List[int] = []
+        times: List[Tuple[int, int]] = []
+        tz: List[Tuple[int, int]] = []
+        tag_rows: List[List[int]] = []
+        text_spans: List[Tuple[int, int]] = []
+        tags: dict = {}
+        users: dict = {}
+
+        with open(tmp_dir / "texts.bin", "wb") as blob:
+            offset = 0
+            for s in sessions:
+                started, started_tz = _encode_dt(s.started_at)
+                ended, ended_tz = _encode_dt(s.ended_at)
+                payload = zlib.compress(s.text.encode("utf-8"))
+                blob.write(payload)
+
+                session_ids.append(s.session_id)
+                user_codes.append(
+                    -1 if s.user_id is None else users.setdefault(s.user_id, len(users))
+                )
+                times.append((started, ended))
+                tz.append((started_tz, ended_tz))
+                tag_rows.append([tags.setdefault(t, len(tags)) for t in s.confirmed_tags])
+                text_spans.append((offset, offset + len(payload)))
+                offset += len(payload)
+
+        n = len(session_ids)
+        times_arr = np.array(times, dtype=np.int64).reshape(n, 2)
+        order = np.argsort(times_arr[:, 0], kind="stable")
+
+        # texts.bin keeps write order; offsets are permuted with the rows.
+        spans = np.array(text_spans, dtype=np.int64).reshape(n, 2)[order]
+        text_offsets = np.zeros(n + 1, dtype=np.int64)
+        text_offsets[1:] = np.cumsum(spans[:, 1] - spans[:, 0])
+        if n and not np.array_equal(spans[:, 0], text_offsets[:-1]):
+            _reorder_blob(tmp_dir / "texts.bin", spans)
+
+        tag_lists = [tag_rows[i] for i in order]
+        tag_offsets = np.zeros(n + 1, dtype=np.int64)
+        tag_offsets[1:] = np.cumsum([len(t) for t in tag_lists])
+        tag_ids = np.array([t for row in tag_lists for t in row], dtype=np.int32)
+
+        np.save(tmp_dir / "session_ids.npy", np.array(session_ids, dtype=str)[order])
+        np.save(tmp_dir / "user_codes.npy", np.array(user_codes, dtype=np.int32)[order])
+        np.save(tmp_dir / "times.npy", times_arr[order])
+        np.save(tmp_dir / "tz.npy", np.array(tz, dtype=np.int32).reshape(n, 2)[order])
+        np.save(tmp_dir / "tag_offsets.npy", tag_offsets)
+        np.save(tmp_dir / "tag_ids.npy", tag_ids)
+        np.save(tmp_dir / "text_offsets.npy", text_offsets)
+
+        (tmp_dir / "tags.json").write_text(json.dumps(list(tags)), encoding="utf-8")
+        (tmp_dir / "users.json").write_text(json.dumps(list(users)), encoding="utf-8")
+        (tmp_dir / "manifest.json").write_text(
+            json.dumps({"version": ARCHIVE_VERSION, "count": n}), encoding="utf-8"
+        )
+
+        _publish(tmp_dir, path)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    return n
+
+
+def _reorder_blob(blob_path: Path, spans: np.ndarray) -> None:
+    """
+    Rewrites texts.bin so compressed texts follow row order.
+    """
+    src = np.memmap(blob_path, dtype=np.uint8, mode="r")
+    reordered = blob_path.with_suffix(".sorted")
+    with open(reordered, "wb") as out:
+        for start, end in spans:
+            out.write(src[start:end].tobytes())
+    del src
+    os.replace(reordered, blob_path)
+
+
+def _publish(new_dir: Path, path: Path) -> int:
+    """
+    Renames a finished archive into place as the next generation, then
+    points CURRENT at it. Both steps are single renames, so a crash
+    leaves either the previous or the new archive current.
+
+    The previous generation is kept for readers that read CURRENT just
+    before the switch; older ones (and a pre-generation archive's
+    files) are removed.
+    """
+    with FileLock(path / "LOCK").exclusive():
+        current = _read_current(path)
+        generations = [int(m.group(1)) for m in map(_GEN_RE.match, os.listdir(path)) if m]
+        # Also skips generations a crashed writer renamed in but never published.
+        generation = max(generations, default=-1) + 1
+        os.replace(new_dir, path / f"gen-{generation}")
+
+        (path / "CURRENT.tmp").write_text(json.dumps({"generation": generation}), encoding="utf-8")
+        os.replace(path / "CURRENT.tmp", path / "CURRENT")
+
+        keep = {generation, current["generation"] if current else None}
+        for g in generations:
+            if g not in keep:
+                shutil.rmtree(path / f"gen-{g}", ignore_errors=True)
+        if current is None:
+            for name in _ARCHIVE_FILES:
+                (path / name).unlink(missing_ok=True)
+    return generation
+
+
+def archive_sessions(path: Path = ARCHIVE_DIR, **filters) -> int:
+    """
+    Archives the current store (optionally filtered, see `iter_sessions`).
+    """
+    return write_session_archive(iter_sessions(**filters), path)
@@ -0,0 +1,136 @@
+import os
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+from mindtrace.core.types import Session
+
+
+def file_version(path: Path) -> Optional[Tuple[int, int, int]]:
+    """
+    Cheap change detector for a file: (mtime_ns, size, inode).
+    None when the file does not exist.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def detach(session: Session) -> Session:
+    """
+    Plain copy of `session` that shares no mutable state (its tag
+    list) with the original.
+    """
+    return Session(
+        session_id=session.session_id,
+        started_at=session.started_at,
+        ended_at=session.ended_at,
+        text=session.text,
+        confirmed_tags=list(session.confirmed_tags),
+        user_id=session.user_id,
+    )
+
+
+class SessionCache:
+    """
+    Process-level cache of parsed sessions plus an id -> Session index.
+
+    Entries are valid for exactly one store version token; any other
+    token is a miss. Local writes can be folded in place when the
+    cache was current right before the write.
+
+    Cached Session objects are internal to the backend, which hands
+    out `detach`ed copies; tag updates swap in a new object instead of
+    mutating, and puts cache a copy of the written session.
+    Lists handed out are copies, so later writes never change them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._token: Optional[Hashable] = None
+        self._sessions: List[Session] = []
+        self._positions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: Hashable) -> Optional[List[Session]]:
+        """
+        Returns a shallow copy of the cached list, or None on a miss.
+        """
+        with self._lock:
+            if self._token is not None and self._token == token:
+                self.hits += 1
+                return list(self._sessions)
+            self.misses += 1
+            return None
+
+    def fill(self, token: Hashable, sessions: List[Session]) -> None:
+        with self._lock:
+            self._token = token
+            self._sessions = sessions
+            self._positions = {s.session_id: i for i, s in enumerate(sessions)}
+
+    def lookup(self, token: Hashable, session_ids: Sequence[str]) -> Optional[List[Session]]:
+        """
+        Resolves ids through the index, or None on a miss.
+        """
+        with self._lock:
+            if self._token is None or self._token != token:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return [
+                self._sessions[self._positions[sid]]
+                for sid in session_ids
+                if sid in self._positions
+            ]
+
+    def apply(
+        self,
+        prev_token: Hashable,
+        token: Hashable,
+        writes: List[Union[Session, Dict[str, List[str]]]],
+    ) -> None:
+        """
+        Folds committed writes into the cache, in order.
+        A Session is a put; a dict is a {session_id: tags} batch.
+        If the cache was not current at `prev_token` it is dropped instead.
+        """
+        with self._lock:
+            if self._token is None or self._token != prev_token:
+                self._token = None
+                return
+            for write in writes:
+                if isinstance(write, Session):
+                    write = detach(write)
+                    pos = self._positions.get(write.session_id)
+                    if pos is None:
+                        self._positions[write.session_id] = len(self._sessions)
+                        self._sessions.append(write)
+                    else:
+                        self._sessions[pos] = write
+                    continue
+                for session_id, tags in write.items():
+                    pos = self._positions.get(session_id)
+                    if pos is not None:
+                        self._sessions[pos] = replace(
+                            self._sessions[pos], confirmed_tags=list(tags)
+                        )
+            self._token = token
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._token = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "cached_sessions": len(self._sessions) if self._token is not None else 0,
+            }
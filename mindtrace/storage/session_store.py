@@ -1,108 +1,698 @@
 import json
+import os
+import tempfile
 from pathlib import Path
 from datetime import datetime
-from typing import List
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from mindtrace.core.types import Session
+from mindtrace.storage.session_cache import SessionCache, detach, file_version
+from mindtrace.storage.locking import FileLock, GroupCommitLog
 
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(exist_ok=True)
 
+# Compacted snapshot (JSON array) + append-only log (one JSON record per line).
+# The logical store is the snapshot with the log replayed on top of it.
 SESSIONS_FILE = DATA_DIR / "sessions.json"
+SESSIONS_LOG = DATA_DIR / "sessions.log"
 
+OP_PUT = "put"
+OP_TAGS = "tags"
 
-def load_sessions() -> List[Session]:
+
+def user_path_name(user_id) -> str:
     """
-    Load all persisted sessions from disk.
+    `user_id` as a file or directory name directly under a store root.
+    Ids that are empty, dot names or contain path separators are
+    rejected, so no id can address the root or escape it.
+    """
+    name = str(user_id)
+    if (
+        not name
+        or name in (".", "..")
+        or "/" in name
+        or "\\" in name
+        or "\0" in name
+        or (os.altsep and os.altsep in name)
+    ):
+        raise ValueError(f"Invalid user_id for a storage path: {user_id!r}")
+    return name
+
+
+def _session_to_dict(s: Session) -> dict:
+    return {
+        "session_id": s.session_id,
+        "user_id": s.user_id,
+        "started_at": s.started_at.isoformat(),
+        "ended_at": s.ended_at.isoformat(),
+        "text": s.text,
+        "confirmed_tags": s.confirmed_tags,
+    }
+
+
+def _session_from_dict(s: dict) -> Session:
+    return Session(
+        session_id=s["session_id"],
+        started_at=datetime.fromisoformat(s["started_at"]),
+        ended_at=datetime.fromisoformat(s["ended_at"]),
+        text=s["text"],
+        confirmed_tags=s.get("confirmed_tags", []),
+        user_id=s.get("user_id"),
+    )
+
+
+def _in_window(
+    s: Session,
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> bool:
+    if start is not None and s.started_at < start:
+        return False
+    if end is not None and s.started_at >= end:
+        return False
+    return True
+
+
+def _matches(
+    s: Session,
+    tag: Optional[str],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    session_ids: Optional[Collection[str]],
+    user_id: Optional[str],
+) -> bool:
+    if session_ids is not None and s.session_id not in session_ids:
+        return False
+    if user_id is not None and s.user_id != user_id:
+        return False
+    if tag is not None and tag not in s.confirmed_tags:
+        return False
+    return _in_window(s, start, end)
+
+
+def _raw_prefilter(
+    raw: dict,
+    tag: Optional[str],
+    session_ids: Optional[Collection[str]],
+    user_id: Optional[str],
+) -> bool:
+    """
+    Cheap checks on an unparsed record, so rejected records never
+    pay for datetime parsing.
+    """
+    if session_ids is not None and raw["session_id"] not in session_ids:
+        return False
+    if user_id is not None and raw.get("user_id") != user_id:
+        return False
+    if tag is not None and tag not in raw.get("confirmed_tags", []):
+        return False
+    return True
+
+
+def _iter_json_array(f, chunk_size: int = 64 * 1024) -> Iterator[dict]:
+    """
+    Incrementally decodes a top-level JSON array of objects,
+    holding at most one chunk plus one element in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    opened = False
+
+    while True:
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = f.read(chunk_size)
+            buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+
+        if pos >= len(buf):
+            return
+
+        if not opened:
+            if buf[pos] != "[":
+                raise ValueError("Sessions snapshot is not a JSON array")
+            opened = True
+            pos += 1
+            continue
+
+        if buf[pos] == "]":
+            return
+
+        try:
+            obj, pos = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+            continue
+
+        yield obj
+
+
+def _open_existing(path: Path, mode: str, **kwargs):
+    try:
+        return open(path, mode, **kwargs)
+    except FileNotFoundError:
+        return None
+
+
+def _iter_log(f, end: Optional[int] = None) -> Iterator[dict]:
+    """
+    Decodes a binary log file from its start, up to byte offset `end`
+    when given. Lines that do not parse are the remains of an
+    interrupted append and are skipped.
+    """
+    f.seek(0)
+    while end is None or f.tell() < end:
+        line = f.readline()
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+def _index_log(f) -> Tuple[Dict[str, int], Dict[str, Tuple[int, List[str]]], int]:
+    """
+    One pass over an open log: the index of each session's last put,
+    its last tag delta, and the byte offset the pass stopped at.
     """
-    if not SESSIONS_FILE.exists():
-        return []
+    last_put: Dict[str, int] = {}
+    last_tags: Dict[str, Tuple[int, List[str]]] = {}
+    if f is None:
+        return last_put, last_tags, 0
 
-    with open(SESSIONS_FILE, "r", encoding="utf-8") as f:
-        content = f.read().strip()
-        if not content:
+    for idx, record in enumerate(_iter_log(f)):
+        op = record.get("op")
+        if op == OP_PUT:
+            last_put[record["session_id"]] = idx
+        elif op == OP_TAGS:
+            updates = record.get("updates") or {
+                record["session_id"]: record["confirmed_tags"]
+            }
+            for sid, tags in updates.items():
+                last_tags[sid] = (idx, tags)
+    return last_put, last_tags, f.tell()
+
+
+# -------------------------------------------------
+# Backend contract
+# -------------------------------------------------
+
+class SessionBackend:
+    """
+    Storage contract behind the module-level session API.
+
+    Query methods fall back to a scan over `load_all`;
+    indexed backends override them.
+    Time windows are [start, end) on `started_at`.
+    """
+
+    def load_all(self, user_id: Optional[str] = None) -> List[Session]:
+        raise NotImplementedError
+
+    def append(self, session: Session) -> None:
+        raise NotImplementedError
+
+    def append_many(self, sessions: Iterable[Session]) -> None:
+        for s in sessions:
+            self.append(s)
+
+    def update_tags(self, session_id: str, tags: List[str]) -> None:
+        self.update_tags_many({session_id: tags})
+
+    def update_tags_many(self, updates: Dict[str, List[str]]) -> int:
+        """
+        Applies {session_id: tags} in one write.
+        Unknown session_ids are ignored; returns the number applied.
+        """
+        raise NotImplementedError
+
+    def compact(self) -> int:
+        return len(self.load_all())
+
+    def cache_stats(self) -> dict:
+        return {}
+
+    def get_by_ids(
+        self,
+        session_ids: Sequence[str],
+        user_id: Optional[str] = None,
+    ) -> List[Session]:
+        wanted = set(session_ids)
+        found = {
+            s.session_id: s
+            for s in self.load_all(user_id)
+            if s.session_id in wanted
+        }
+        return [found[sid] for sid in session_ids if sid in found]
+
+    def sessions_for_tag(
+        self,
+        tag: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Session]:
+        matches = [
+            s for s in self.load_all(user_id)
+            if tag in s.confirmed_tags and _in_window(s, start, end)
+        ]
+        matches.sort(key=lambda s: s.started_at)
+        return matches
+
+    def latest(self, n: int, user_id: Optional[str] = None) -> List[Session]:
+        sessions = sorted(
+            self.load_all(user_id),
+            key=lambda s: s.started_at,
+            reverse=True,
+        )
+        return sessions[:n]
+
+    def iter_sessions(
+        self,
+        tag: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        session_ids: Optional[Collection[str]] = None,
+        user_id: Optional[str] = None,
+    ) -> Iterator[Session]:
+        if session_ids is not None:
+            session_ids = set(session_ids)
+        for s in self.load_all(user_id):
+            if _matches(s, tag, start, end, session_ids, None):
+                yield s
+
+
+# -------------------------------------------------
+# Default backend: JSON snapshot + append-only log
+# -------------------------------------------------
+
+class JsonLogSessionBackend(SessionBackend):
+    """
+    Log-structured JSON store.
+    Writes append one record to the log; `compact` folds the log
+    into the snapshot.
+
+    Parsed sessions are cached per process and revalidated against the
+    snapshot/log file versions plus a local write generation, so repeat
+    reads skip parsing entirely.
+
+    Safe across processes:
+    - appends go through a group-commit queue under an exclusive
+      `.lock` on the log, one fsync per batch;
+    - readers hold a shared lock on the snapshot, which compaction
+      takes exclusively, so a reader never pairs a new snapshot with
+      a stale log (or the reverse). Appends do not block readers;
+      a torn tail line is skipped on replay.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: Path = SESSIONS_FILE,
+        log_path: Path = SESSIONS_LOG,
+    ):
+        self.snapshot_path = Path(snapshot_path)
+        self.log_path = Path(log_path)
+        self._cache = SessionCache()
+        self._generation = 0
+        self._write_lock = FileLock(self.log_path.with_name(self.log_path.name + ".lock"))
+        self._read_lock = FileLock(
+            self.snapshot_path.with_name(self.snapshot_path.name + ".lock")
+        )
+        self._log = GroupCommitLog(self.log_path, self._write_lock, self._on_commit)
+
+    def _version(self) -> tuple:
+        return (
+            file_version(self.snapshot_path),
+            file_version(self.log_path),
+            self._generation,
+        )
+
+    def _load_fresh(self, token: tuple) -> List[Session]:
+        with self._read_lock.shared():
+            state = self._replay()
+        sessions = [_session_from_dict(s) for s in state.values()]
+        self._cache.fill(token, list(sessions))
+        return sessions
+
+    def _cached_sessions(self) -> List[Session]:
+        token = self._version()
+        sessions = self._cache.get(token)
+        if sessions is None:
+            sessions = self._load_fresh(token)
+        return sessions
+
+    def _read_snapshot(self) -> List[dict]:
+        if not self.snapshot_path.exists():
             return []
-        raw_sessions = json.loads(content)
 
+        with open(self.snapshot_path, "r", encoding="utf-8") as f:
+            content = f.read().strip()
+            if not content:
+                return []
+            return json.loads(content)
 
-    sessions: List[Session] = []
+    def _read_log(self) -> Iterable[dict]:
+        """
+        Yields log records in write order.
+        Lines that do not parse are the remains of an interrupted
+        append and are skipped.
+        """
+        log = _open_existing(self.log_path, "rb")
+        if log is None:
+            return
 
-    for s in raw_sessions:
-        sessions.append(
-            Session(
-                session_id=s["session_id"],
-                started_at=datetime.fromisoformat(s["started_at"]),
-                ended_at=datetime.fromisoformat(s["ended_at"]),
-                text=s["text"],
-                confirmed_tags=s.get("confirmed_tags", []),
+        with log:
+            yield from _iter_log(log)
+
+    def _replay(self) -> Dict[str, dict]:
+        """
+        Folds the log over the snapshot.
+        Replay is idempotent: a `put` for a known session_id replaces it
+        in place, so a log that survived a compaction is still safe.
+        """
+        state: Dict[str, dict] = {
+            s["session_id"]: s for s in self._read_snapshot()
+        }
+
+        for record in self._read_log():
+            op = record.pop("op", None)
+            if op == OP_PUT:
+                state[record["session_id"]] = record
+            elif op == OP_TAGS:
+                updates = record.get("updates") or {
+                    record["session_id"]: record["confirmed_tags"]
+                }
+                for session_id, tags in updates.items():
+                    existing = state.get(session_id)
+                    if existing is not None:
+                        existing["confirmed_tags"] = tags
+
+        return state
+
+    def _append_log(self, write, record: dict) -> None:
+        """
+        Appends one record as a single line and waits until it is durable.
+        A line is all-or-nothing on replay, so a record is atomic.
+        `write` is what the cache folds in once the record commits.
+        """
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        self._log.append(write, line.encode("utf-8"))
+
+    def _on_commit(self, writes: list, before, after) -> None:
+        snapshot = file_version(self.snapshot_path)
+        prev = (snapshot, before, self._generation)
+        self._generation += 1
+        try:
+            self._cache.apply(prev, (snapshot, after, self._generation), writes)
+        except Exception:
+            # The batch is already durable; failing to fold it into the
+            # cache must not fail its writers. The next read reloads.
+            self._cache.invalidate()
+
+    def load_all(self, user_id: Optional[str] = None) -> List[Session]:
+        # Copies, so callers may mutate what they get without touching
+        # the cache.
+        return [
+            detach(s) for s in self._cached_sessions()
+            if user_id is None or s.user_id == user_id
+        ]
+
+    def iter_sessions(
+        self,
+        tag: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        session_ids: Optional[Collection[str]] = None,
+        user_id: Optional[str] = None,
+    ) -> Iterator[Session]:
+        """
+        Serves from the cache when it is current; otherwise streams the
+        snapshot and log without materializing the store.
+
+        The streaming path first indexes the log (ids and tag deltas only),
+        then decodes the snapshot one record at a time, then yields
+        the logged puts. A session re-saved after the last compaction is
+        yielded at its log position rather than its original slot.
+        """
+        if session_ids is not None:
+            session_ids = set(session_ids)
+
+        cached = self._cache.get(self._version())
+        if cached is not None:
+            for s in cached:
+                if _matches(s, tag, start, end, session_ids, user_id):
+                    yield detach(s)
+            return
+
+        # The shared lock only covers opening both files and indexing the
+        # log. Compaction replaces the snapshot and unlinks the log, which
+        # leaves open descriptors readable, so the iterator yields without
+        # the lock and an abandoned iterator never holds up compact().
+        with self._read_lock.shared():
+            snapshot = _open_existing(self.snapshot_path, "r", encoding="utf-8")
+            log = _open_existing(self.log_path, "rb")
+            try:
+                index = _index_log(log)
+            except BaseException:
+                for f in (snapshot, log):
+                    if f is not None:
+                        f.close()
+                raise
+
+        try:
+            yield from self._stream(
+                snapshot, log, index, tag, start, end, session_ids, user_id
             )
-        )
+        finally:
+            for f in (snapshot, log):
+                if f is not None:
+                    f.close()
+
+    def _stream(
+        self,
+        snapshot,
+        log,
+        index: Tuple[Dict[str, int], Dict[str, Tuple[int, List[str]]], int],
+        tag: Optional[str],
+        start: Optional[datetime],
+        end: Optional[datetime],
+        session_ids: Optional[Collection[str]],
+        user_id: Optional[str],
+    ) -> Iterator[Session]:
+        last_put, last_tags, log_end = index
+
+        def emit(raw: dict, after: int) -> Optional[Session]:
+            delta = last_tags.get(raw["session_id"])
+            if delta is not None and delta[0] > after:
+                raw["confirmed_tags"] = delta[1]
+            if not _raw_prefilter(raw, tag, session_ids, user_id):
+                return None
+            s = _session_from_dict(raw)
+            return s if _in_window(s, start, end) else None
+
+        if snapshot is not None:
+            for raw in _iter_json_array(snapshot):
+                if raw["session_id"] in last_put:
+                    continue
+                s = emit(raw, -1)
+                if s is not None:
+                    yield s
+
+        if log is None:
+            return
+
+        # Records appended after indexing are past log_end and not served.
+        for idx, record in enumerate(_iter_log(log, log_end)):
+            if record.pop("op", None) != OP_PUT:
+                continue
+            if last_put.get(record["session_id"]) != idx:
+                continue
+            s = emit(record, idx)
+            if s is not None:
+                yield s
+
+    def get_by_ids(
+        self,
+        session_ids: Sequence[str],
+        user_id: Optional[str] = None,
+    ) -> List[Session]:
+        token = self._version()
+        found = self._cache.lookup(token, session_ids)
+        if found is None:
+            by_id = {s.session_id: s for s in self._load_fresh(token)}
+            found = [by_id[sid] for sid in session_ids if sid in by_id]
+        return [detach(s) for s in found if user_id is None or s.user_id == user_id]
+
+    def append(self, session: Session) -> None:
+        self._append_log(session, {"op": OP_PUT, **_session_to_dict(session)})
+
+    def update_tags_many(self, updates: Dict[str, List[str]]) -> int:
+        """
+        Writes the whole batch as one delta record.
+        Only ids present in the store are logged.
+        """
+        known = {s.session_id for s in self.get_by_ids(list(updates))}
+        batch = {sid: list(tags) for sid, tags in updates.items() if sid in known}
+        if not batch:
+            return 0
+
+        self._append_log(batch, {"op": OP_TAGS, "updates": batch})
+        return len(batch)
+
+    def cache_stats(self) -> dict:
+        return self._cache.stats()
+
+    def compact(self) -> int:
+        """
+        Folds the log into a fresh snapshot and truncates the log.
+        The snapshot is written to a temp file and renamed into place.
+        Holds the writer lock (no appends) and the snapshot lock
+        exclusively (no readers) for the duration.
+        """
+        with self._write_lock.exclusive(), self._read_lock.exclusive():
+            serializable = list(self._replay().values())
+
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.snapshot_path.parent, prefix=".sessions.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(serializable, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.snapshot_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+            if self.log_path.exists():
+                self.log_path.unlink()
+
+            self._generation += 1
+            self._cache.invalidate()
+
+        return len(serializable)
+
+
+_backend: SessionBackend = JsonLogSessionBackend()
+
+
+def set_session_backend(backend: SessionBackend) -> None:
+    """
+    Swaps the storage backend used by the module-level API.
+    """
+    global _backend
+    _backend = backend
+
+
+def get_session_backend() -> SessionBackend:
+    return _backend
 
-    return sessions
+
+# -------------------------------------------------
+# Public API
+# -------------------------------------------------
+
+def load_sessions(user_id: Optional[str] = None) -> List[Session]:
+    """
+    Load all persisted sessions from disk.
+    """
+    return _backend.load_all(user_id)
 
 
 def save_session(session: Session) -> None:
     """
     Persist a single session to disk.
-    Sessions are append-only.
+    Sessions are append-only: one log record per write.
     """
+    _backend.append(session)
 
-    sessions = load_sessions()
-    sessions.append(session)
 
-    serializable = [
-        {
-            "session_id": s.session_id,
-            "started_at": s.started_at.isoformat(),
-            "ended_at": s.ended_at.isoformat(),
-            "text": s.text,
-            "confirmed_tags": s.confirmed_tags,
-        }
-        for s in sessions
-    ]
+def bulk_update_session_tags(mapping: Dict[str, List[str]]) -> int:
+    """
+    Replaces confirmed tags for many sessions in one atomic write.
+    Unknown session_ids are ignored.
+
+    Returns the number of sessions updated.
+    """
+    return _backend.update_tags_many(mapping)
 
-    with open(SESSIONS_FILE, "w", encoding="utf-8") as f:
-        json.dump(serializable, f, indent=2)
 
 def update_session_tags(session_id: str, tags: list[str]) -> None:
-    sessions = load_sessions()
+    bulk_update_session_tags({session_id: tags})
 
-    for s in sessions:
-        if s.session_id == session_id:
-            s.confirmed_tags = tags
-            break
 
-    serializable = [
-        {
-            "session_id": s.session_id,
-            "started_at": s.started_at.isoformat(),
-            "ended_at": s.ended_at.isoformat(),
-            "text": s.text,
-            "confirmed_tags": s.confirmed_tags,
-        }
-        for s in sessions
-    ]
+def update_session_tags_store(session_id: str, tags: list[str]) -> None:
+    bulk_update_session_tags({session_id: tags})
 
-    with open(SESSIONS_FILE, "w", encoding="utf-8") as f:
-        json.dump(serializable, f, indent=2)
 
-def update_session_tags_store(session_id: str, tags: list[str]) -> None:
-    sessions = load_sessions()
+def compact_sessions() -> int:
+    """
+    Compacts the backend's storage.
+    Returns the number of sessions retained.
+    """
+    return _backend.compact()
 
-    for s in sessions:
-        if s.session_id == session_id:
-            s.confirmed_tags = tags
-            break
 
-    serializable = [
-        {
-            "session_id": s.session_id,
-            "started_at": s.started_at.isoformat(),
-            "ended_at": s.ended_at.isoformat(),
-            "text": s.text,
-            "confirmed_tags": s.confirmed_tags,
-        }
-        for s in sessions
-    ]
+def iter_sessions(
+    tag: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    session_ids: Optional[Collection[str]] = None,
+    user_id: Optional[str] = None,
+) -> Iterator[Session]:
+    """
+    Lazily yields persisted sessions, optionally filtered by tag,
+    [start, end) window on started_at, session_id set and user.
+    Scans run in constant memory on backends that support streaming.
+    """
+    return _backend.iter_sessions(tag, start, end, session_ids, user_id)
+
 
-    with open(SESSIONS_FILE, "w", encoding="utf-8") as f:
-        json.dump(serializable, f, indent=2)
+def session_cache_stats() -> dict:
+    """
+    Hit/miss counters of the active backend's session cache
+    (empty for backends that do not cache).
+    """
+    return _backend.cache_stats()
+
+
+def get_sessions_by_ids(
+    session_ids: Sequence[str],
+    user_id: Optional[str] = None,
+) -> List[Session]:
+    """
+    Resolves session_ids in the order given; unknown ids are dropped.
+    """
+    return _backend.get_by_ids(session_ids, user_id)
+
+
+def sessions_for_tag(
+    tag: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    user_id: Optional[str] = None,
+) -> List[Session]:
+    """
+    Chronological sessions carrying `tag` with start <= started_at < end.
+    """
+    return _backend.sessions_for_tag(tag, start, end, user_id)
+
+
+def latest_sessions(n: int, user_id: Optional[str] = None) -> List[Session]:
+    """
+    The `n` most recent sessions, newest first.
+    """
+    return _backend.latest(n, user_id)
@@ -0,0 +1,156 @@
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from mindtrace.nlp.embeddings import EmbeddingMatrix
+from mindtrace.storage.session_cache import file_version
+from mindtrace.storage.session_store import DATA_DIR
+
+# Point this at a tmpfs (e.g. /dev/shm/mindtrace) to keep published
+# matrices off disk; any local filesystem shares pages the same way.
+SHARED_EMBEDDINGS_DIR = DATA_DIR / "shared_embeddings"
+
+# Generations kept after a publish. Workers that already mapped an
+# older one keep it alive on their own (unlinking never unmaps).
+KEEP_GENERATIONS = 2
+
+_ATTACH_RETRIES = 5
+
+# Layout under <dir>/<name>/:
+#   CURRENT           {"generation": n, "rows": N, "dim": d}, replaced atomically
+#   gen-<n>.npy       float32 (N, d) matrix, mapped read-only by workers
+#   gen-<n>.ids.json  row -> session_id
+_GEN_RE = re.compile(r"^gen-(\d+)\.npy$")
+
+
+def _name_dir(name: str, path: Path) -> Path:
+    return Path(path) / str(name)
+
+
+def _read_current(directory: Path) -> Optional[dict]:
+    try:
+        return json.loads((directory / "CURRENT").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def publish_embeddings(
+    name: str,
+    embeddings: EmbeddingMatrix,
+    path: Path = SHARED_EMBEDDINGS_DIR,
+    keep: int = KEEP_GENERATIONS,
+) -> int:
+    """
+    Writes `embeddings` as a new generation of `name` and makes it
+    current. Returns the generation number.
+
+    Meant for one loader process; workers call `attach_embeddings` or
+    hold a `SharedEmbeddings` handle.
+    """
+    directory = _name_dir(name, path)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    current = _read_current(directory)
+    generation = (current["generation"] + 1) if current else 0
+
+    base = directory / f"gen-{generation}"
+    tmp = directory / f".gen-{generation}.{os.getpid()}"
+    with open(f"{tmp}.npy", "wb") as f:
+        np.save(f, np.ascontiguousarray(embeddings.matrix, dtype=np.float32))
+    Path(f"{tmp}.ids.json").write_text(json.dumps(embeddings.ids), encoding="utf-8")
+    os.replace(f"{tmp}.ids.json", f"{base}.ids.json")
+    os.replace(f"{tmp}.npy", f"{base}.npy")
+
+    manifest = {
+        "generation": generation,
+        "rows": len(embeddings),
+        "dim": int(embeddings.matrix.shape[1]) if embeddings.matrix.ndim == 2 else 0,
+    }
+    (directory / "CURRENT.tmp").write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(directory / "CURRENT.tmp", directory / "CURRENT")
+
+    for entry in directory.iterdir():
+        match = _GEN_RE.match(entry.name)
+        if match and int(match.group(1)) <= generation - keep:
+            entry.unlink(missing_ok=True)
+            (directory / f"gen-{match.group(1)}.ids.json").unlink(missing_ok=True)
+
+    return generation
+
+
+def attach_embeddings(
+    name: str,
+    path: Path = SHARED_EMBEDDINGS_DIR,
+) -> Tuple[int, EmbeddingMatrix]:
+    """
+    Maps the current generation of `name` read-only.
+    Returns (generation, matrix); the matrix shares the page cache with
+    every other process that attached the same generation.
+    """
+    directory = _name_dir(name, path)
+    for _ in range(_ATTACH_RETRIES):
+        current = _read_current(directory)
+        if current is None:
+            raise FileNotFoundError(f"No embeddings published under {directory}")
+        generation = current["generation"]
+        try:
+            matrix = np.load(directory / f"gen-{generation}.npy", mmap_mode="r")
+            ids = json.loads(
+                (directory / f"gen-{generation}.ids.json").read_text(encoding="utf-8")
+            )
+        except FileNotFoundError:
+            # Pruned between reading CURRENT and opening; a newer one is current.
+            continue
+        return generation, EmbeddingMatrix(matrix, ids)
+    raise RuntimeError(f"Embeddings under {directory} kept changing while attaching")
+
+
+class SharedEmbeddings:
+    """
+    Worker-side handle on a published matrix.
+
+    `get()` costs one stat while nothing changed, and remaps when a new
+    generation is published. Matrices handed out earlier stay valid.
+    """
+
+    def __init__(self, name: str, path: Path = SHARED_EMBEDDINGS_DIR):
+        self.name = name
+        self.path = Path(path)
+        self._current_path = _name_dir(name, path) / "CURRENT"
+        self._lock = threading.Lock()
+        self._version = None
+        self.generation: Optional[int] = None
+        self._matrix: Optional[EmbeddingMatrix] = None
+
+    def get(self) -> EmbeddingMatrix:
+        version = file_version(self._current_path)
+        if self._matrix is not None and version == self._version:
+            return self._matrix
+
+        with self._lock:
+            version = file_version(self._current_path)
+            if self._matrix is None or version != self._version:
+                self.generation, self._matrix = attach_embeddings(self.name, self.path)
+                self._version = version
+            return self._matrix
+
+
+_handles: Dict[Tuple[str, str], SharedEmbeddings] = {}
+_handles_lock = threading.Lock()
+
+
+def shared_embeddings(name: str, path: Path = SHARED_EMBEDDINGS_DIR) -> EmbeddingMatrix:
+    """
+    Current published matrix for `name`, through a per-process handle.
+    """
+    key = (str(name), str(path))
+    handle = _handles.get(key)
+    if handle is None:
+        with _handles_lock:
+            handle = _handles.setdefault(key, SharedEmbeddings(name, path))
+    return handle.get()
@@ -0,0 +1,296 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Collection, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from mindtrace.core.types import Session
+from mindtrace.storage.session_store import DATA_DIR, SessionBackend
+
+SESSIONS_DB = DATA_DIR / "sessions.db"
+
+# SQLite caps host parameters per statement (999 on older builds).
+_MAX_PARAMS = 900
+
+_BUSY_TIMEOUT_S = 30.0
+
+# `started_at` is stored as ISO-8601 text, which sorts chronologically
+# as long as timestamps share one timezone convention.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    seq            INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id     TEXT NOT NULL UNIQUE,
+    user_id        TEXT,
+    started_at     TEXT NOT NULL,
+    ended_at       TEXT NOT NULL,
+    text           TEXT NOT NULL,
+    confirmed_tags TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_started
+    ON sessions (user_id, started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_started
+    ON sessions (started_at);
+
+CREATE TABLE IF NOT EXISTS session_tags (
+    session_id TEXT NOT NULL,
+    user_id    TEXT,
+    tag        TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    PRIMARY KEY (session_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_tags_user_tag_started
+    ON session_tags (user_id, tag, started_at);
+CREATE INDEX IF NOT EXISTS idx_tags_tag_started
+    ON session_tags (tag, started_at);
+"""
+
+_COLUMNS = "session_id, user_id, started_at, ended_at, text, confirmed_tags"
+
+
+def _row_to_session(row) -> Session:
+    session_id, user_id, started_at, ended_at, text, tags = row
+    return Session(
+        session_id=session_id,
+        started_at=datetime.fromisoformat(started_at),
+        ended_at=datetime.fromisoformat(ended_at),
+        text=text,
+        confirmed_tags=json.loads(tags),
+        user_id=user_id,
+    )
+
+
+class SqliteSessionBackend(SessionBackend):
+    """
+    Indexed SQLite session store.
+
+    Sessions are keyed by session_id and indexed by (user_id, started_at);
+    tags live in a side table indexed by (user_id, tag, started_at), so
+    point lookups and tag-chain fetches touch only matching rows.
+    """
+
+    def __init__(self, path: Path = SESSIONS_DB):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn = self._connect(check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        """
+        WAL lets readers run alongside a writer from another process;
+        the busy timeout makes concurrent writers queue instead of failing.
+        """
+        conn = sqlite3.connect(str(self.path), timeout=_BUSY_TIMEOUT_S, **kwargs)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -------- Write --------
+
+    def _upsert(self, cur, s: Session) -> None:
+        started_at = s.started_at.isoformat()
+        cur.execute(
+            f"""
+            INSERT INTO sessions ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                user_id = excluded.user_id,
+                started_at = excluded.started_at,
+                ended_at = excluded.ended_at,
+                text = excluded.text,
+                confirmed_tags = excluded.confirmed_tags
+            """,
+            (
+                s.session_id,
+                s.user_id,
+                started_at,
+                s.ended_at.isoformat(),
+                s.text,
+                json.dumps(s.confirmed_tags),
+            ),
+        )
+        cur.execute("DELETE FROM session_tags WHERE session_id = ?", (s.session_id,))
+        cur.executemany(
+            "INSERT OR IGNORE INTO session_tags VALUES (?, ?, ?, ?)",
+            [(s.session_id, s.user_id, tag, started_at) for tag in s.confirmed_tags],
+        )
+
+    def append(self, session: Session) -> None:
+        self.append_many([session])
+
+    def append_many(self, sessions: Iterable[Session]) -> None:
+        with self._lock, self._conn:
+            cur = self._conn.cursor()
+            for s in sessions:
+                self._upsert(cur, s)
+
+    def update_tags_many(self, updates: Dict[str, List[str]]) -> int:
+        """
+        Applies the batch in a single transaction.
+        """
+        ids = list(updates)
+        with self._lock, self._conn:
+            known = {}
+            for i in range(0, len(ids), _MAX_PARAMS):
+                chunk = ids[i:i + _MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                for session_id, user_id, started_at in self._conn.execute(
+                    "SELECT session_id, user_id, started_at FROM sessions "
+                    f"WHERE session_id IN ({placeholders})",
+                    chunk,
+                ):
+                    known[session_id] = (user_id, started_at)
+
+            self._conn.executemany(
+                "UPDATE sessions SET confirmed_tags = ? WHERE session_id = ?",
+                [(json.dumps(list(updates[sid])), sid) for sid in known],
+            )
+            self._conn.executemany(
+                "DELETE FROM session_tags WHERE session_id = ?",
+                [(sid,) for sid in known],
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO session_tags VALUES (?, ?, ?, ?)",
+                [
+                    (sid, user_id, tag, started_at)
+                    for sid, (user_id, started_at) in known.items()
+                    for tag in updates[sid]
+                ],
+            )
+        return len(known)
+
+    def compact(self) -> int:
+        with self._lock:
+            self._conn.execute("VACUUM")
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    # -------- Read --------
+
+    def _query(self, sql: str, params: Sequence) -> List[Session]:
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_row_to_session(r) for r in rows]
+
+    def load_all(self, user_id: Optional[str] = None) -> List[Session]:
+        if user_id is None:
+            return self._query(f"SELECT {_COLUMNS} FROM sessions ORDER BY seq", ())
+        return self._query(
+            f"SELECT {_COLUMNS} FROM sessions WHERE user_id = ? ORDER BY seq",
+            (user_id,),
+        )
+
+    def get_by_ids(
+        self,
+        session_ids: Sequence[str],
+        user_id: Optional[str] = None,
+    ) -> List[Session]:
+        ids = list(dict.fromkeys(session_ids))
+        found = {}
+
+        for i in range(0, len(ids), _MAX_PARAMS):
+            chunk = ids[i:i + _MAX_PARAMS]
+            placeholders = ",".join("?" * len(chunk))
+            sql = f"SELECT {_COLUMNS} FROM sessions WHERE session_id IN ({placeholders})"
+            params: list = list(chunk)
+            if user_id is not None:
+                sql += " AND user_id = ?"
+                params.append(user_id)
+            for s in self._query(sql, params):
+                found[s.session_id] = s
+
+        return [found[sid] for sid in session_ids if sid in found]
+
+    def sessions_for_tag(
+        self,
+        tag: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        user_id: Optional[str] = None,
+    ) -> List[Session]:
+        clauses = ["t.tag = ?"]
+        params: list = [tag]
+        if user_id is not None:
+            clauses.append("t.user_id = ?")
+            params.append(user_id)
+        if start is not None:
+            clauses.append("t.started_at >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("t.started_at < ?")
+            params.append(end.isoformat())
+
+        columns = ", ".join(f"s.{c.strip()}" for c in _COLUMNS.split(","))
+        return self._query(
+            f"""
+            SELECT {columns}
+            FROM session_tags t JOIN sessions s ON s.session_id = t.session_id
+            WHERE {" AND ".join(clauses)}
+            ORDER BY t.started_at, s.seq
+            """,
+            params,
+        )
+
+    def latest(self, n: int, user_id: Optional[str] = None) -> List[Session]:
+        if user_id is None:
+            return self._query(
+                f"SELECT {_COLUMNS} FROM sessions ORDER BY started_at DESC LIMIT ?",
+                (n,),
+            )
+        return self._query(
+            f"""
+            SELECT {_COLUMNS} FROM sessions
+            WHERE user_id = ? ORDER BY started_at DESC LIMIT ?
+            """,
+            (user_id, n),
+        )
+
+    def iter_sessions(
+        self,
+        tag: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        session_ids: Optional[Collection[str]] = None,
+        user_id: Optional[str] = None,
+    ) -> Iterator[Session]:
+        """
+        Streams matching rows from a dedicated read connection,
+        so the shared connection is not held during iteration.
+        """
+        table = "sessions s"
+        clauses: List[str] = []
+        params: list = []
+        if tag is not None:
+            table += " JOIN session_tags t ON t.session_id = s.session_id"
+            clauses.append("t.tag = ?")
+            params.append(tag)
+        if user_id is not None:
+            clauses.append("s.user_id = ?")
+            params.append(user_id)
+        if start is not None:
+            clauses.append("s.started_at >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("s.started_at < ?")
+            params.append(end.isoformat())
+
+        wanted = set(session_ids) if session_ids is not None else None
+        if wanted is not None and len(wanted) <= _MAX_PARAMS:
+            clauses.append(f"s.session_id IN ({','.join('?' * len(wanted))})")
+            params.extend(wanted)
+
+        columns = ", ".join(f"s.{c.strip()}" for c in _COLUMNS.split(","))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = self._connect()
+        try:
+            for row in conn.execute(
+                f"SELECT {columns} FROM {table} {where} ORDER BY s.seq", params
+            ):
+                if wanted is not None and row[0] not in wanted:
+                    continue
+                yield _row_to_session(row)
+        finally:
+            conn.close()
@@ -1,30 +1,84 @@
-from typing import List, Dict, Optional
-import chromadb
-from chromadb.config import Settings
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime
 
+from mindtrace.core.types import Session
 
-class MindTraceVectorStore:
+# Used when the client cannot report its own limit.
+DEFAULT_MAX_BATCH_SIZE = 5000
+
+# Shared-collection layout: one collection, partitioned by user metadata.
+SHARED_COLLECTION_NAME = "mindtrace_sessions"
+USER_METADATA_KEY = "mindtrace_user_id"
+_ID_SEPARATOR = "::"
+
+# Every backend ranks by cosine distance; Chroma defaults to L2.
+DISTANCE_SPACE = "cosine"
+
+
+@dataclass
+class SimilarSession:
     """
-    Chroma-backed vector store for MindTrace.
-    Responsible ONLY for storage and retrieval of session embeddings.
+    One search hit. `distance` is the cosine distance (1 - cosine
+    similarity, 0 to 2) on every backend. `metadata` and `document`
+    are only filled when requested.
     """
+    session_id: str
+    distance: float
+    metadata: Optional[Dict] = None
+    document: Optional[str] = None
 
-    def __init__(self, persist_dir: str = "data/chroma"):
-        self.client = chromadb.Client(
-            Settings(
-                persist_directory=persist_dir,
-                is_persistent=True, 
-                anonymized_telemetry=False,
-            )
-        )
 
-    def _collection_name(self, user_id: str) -> str:
-        return f"mindtrace_user_{user_id}"
+def session_metadata(session: Session) -> Dict:
+    """
+    Scalar-only metadata stored next to a session's embedding.
+    Carries enough to rebuild the Session from a hit (with its document)
+    and to push time-range filters down via `started_at_ts`.
+    """
+    metadata = {
+        "started_at": session.started_at.isoformat(),
+        "ended_at": session.ended_at.isoformat(),
+        "started_at_ts": session.started_at.timestamp(),
+        "confirmed_tags": json.dumps(session.confirmed_tags),
+    }
+    if session.user_id is not None:
+        metadata["user_id"] = session.user_id
+    return metadata
 
-    def get_or_create_collection(self, user_id: str):
-        return self.client.get_or_create_collection(
-            name=self._collection_name(user_id)
-        )
+
+def session_from_hit(hit: SimilarSession) -> Optional[Session]:
+    """
+    Rebuilds a Session from a hit carrying `session_metadata` and its
+    document; None if either is missing.
+    """
+    meta = hit.metadata or {}
+    if hit.document is None or "started_at" not in meta or "ended_at" not in meta:
+        return None
+
+    return Session(
+        session_id=hit.session_id,
+        started_at=datetime.fromisoformat(meta["started_at"]),
+        ended_at=datetime.fromisoformat(meta["ended_at"]),
+        text=hit.document,
+        confirmed_tags=json.loads(meta.get("confirmed_tags", "[]")),
+        user_id=meta.get("user_id"),
+    )
+
+
+class VectorStoreBackend:
+    """
+    Contract shared by vector store backends.
+    Backends implement the batch operations; single-item calls
+    are thin wrappers over them.
+
+    `codec` is the backend's EmbeddingCodec, if any. Stored vectors,
+    and those `iter_user_records` exports, are in the codec's reduced
+    space when it has a reducer.
+    """
+
+    codec = None
 
     # -------- Write --------
 
@@ -36,16 +90,29 @@ class MindTraceVectorStore:
         text: str,
         metadata: Dict,
     ):
-        collection = self.get_or_create_collection(user_id)
-
-        collection.upsert(
+        self.upsert_sessions(
+            user_id=user_id,
             ids=[session_id],
             embeddings=[embedding],
-            documents=[text],
+            texts=[text],
             metadatas=[metadata],
         )
 
-        
+    def upsert_sessions(
+        self,
+        user_id: str,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[Dict],
+        reduced: bool = False,
+    ):
+        """
+        With `reduced`, `embeddings` are already in the codec's reduced
+        space (e.g. exported from a store with the same reducer) and
+        are not reduced again.
+        """
+        raise NotImplementedError
 
     # -------- Read --------
 
@@ -60,21 +127,385 @@ class MindTraceVectorStore:
         Returns session_ids of semantically similar sessions.
         Does NOT return insights or interpretations.
         """
-        collection = self.get_or_create_collection(user_id)
-
-        results = collection.query(
+        hits = self.query_similar_sessions_batch(
+            user_id=user_id,
             query_embeddings=[query_embedding],
-            n_results=top_k,
+            top_k=top_k,
             where=where,
+            include_metadata=False,
+        )
+        return [h.session_id for h in hits[0]]
+
+    def query_similar_sessions_batch(
+        self,
+        user_id: str,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        where: Optional[Dict] = None,
+        include_metadata: bool = True,
+        include_documents: bool = False,
+    ) -> List[List[SimilarSession]]:
+        raise NotImplementedError
+
+    # -------- Export --------
+
+    def list_user_ids(self) -> List[str]:
+        raise NotImplementedError
+
+    def iter_user_records(
+        self,
+        user_id: str,
+        batch_size: Optional[int] = None,
+    ) -> Iterator[Tuple[List[str], List[List[float]], List[Optional[str]], List[Optional[Dict]]]]:
+        """
+        Yields (ids, embeddings, documents, metadatas) pages of one
+        user's stored records. Embeddings are decoded to float32 but
+        stay in the codec's reduced space.
+        """
+        raise NotImplementedError
+
+    # -------- Delete --------
+
+    def delete_session(self, user_id: str, session_id: str):
+        raise NotImplementedError
+
+    def delete_user(self, user_id: str):
+        raise NotImplementedError
+
+
+class MindTraceVectorStore(VectorStoreBackend):
+    """
+    Chroma-backed vector store for MindTrace.
+    Responsible ONLY for storage and retrieval of session embeddings.
+
+    Layouts:
+    - per-user (default): one `mindtrace_user_{user_id}` collection each;
+    - shared (`shared_collection=True`): a single collection partitioned
+      by a `mindtrace_user_id` metadata filter, which keeps client
+      startup and memory flat as the user count grows. Record ids are
+      namespaced per user; callers see plain session_ids either way.
+
+    An optional `EmbeddingCodec` reduces dimensions before vectors reach
+    Chroma. Chroma stores float32 only, so the codec's quantization
+    applies to the flat backend and the embedding cache, not here.
+    """
+
+    def __init__(
+        self,
+        persist_dir: str = "data/chroma",
+        shared_collection: bool = False,
+        codec=None,
+    ):
+        # Imported lazily so other backends never pay for chromadb.
+        import chromadb
+        from chromadb.config import Settings
+
+        self.client = chromadb.Client(
+            Settings(
+                persist_directory=persist_dir,
+                is_persistent=True,
+                anonymized_telemetry=False,
+            )
         )
+        self.shared_collection = shared_collection
+        self.codec = codec
+        # Per-user collection handles, so each call skips a client round-trip.
+        self._collections: Dict[str, object] = {}
+        self._collections_lock = threading.Lock()
+        self._max_batch_size: Optional[int] = None
+
+    def _collection_name(self, user_id: str) -> str:
+        if self.shared_collection:
+            return SHARED_COLLECTION_NAME
+        return f"mindtrace_user_{user_id}"
+
+    def get_or_create_collection(self, user_id: str):
+        if self.shared_collection and _ID_SEPARATOR in user_id:
+            # Record ids are "<user_id>::<session_id>"; a separator in the
+            # user id would make them ambiguous across users.
+            raise ValueError(
+                f"user_id {user_id!r} must not contain {_ID_SEPARATOR!r} "
+                "in a shared collection"
+            )
+        key = SHARED_COLLECTION_NAME if self.shared_collection else user_id
+        collection = self._collections.get(key)
+        if collection is not None:
+            return collection
+
+        with self._collections_lock:
+            collection = self._collections.get(key)
+            if collection is None:
+                collection = self.client.get_or_create_collection(
+                    name=self._collection_name(user_id),
+                    metadata={"hnsw:space": DISTANCE_SPACE},
+                )
+                self._collections[key] = collection
+        return collection
+
+    @property
+    def max_batch_size(self) -> int:
+        if self._max_batch_size is None:
+            getter = getattr(self.client, "get_max_batch_size", None)
+            size = getter() if getter else getattr(self.client, "max_batch_size", None)
+            self._max_batch_size = int(size or DEFAULT_MAX_BATCH_SIZE)
+        return self._max_batch_size
+
+    # -------- Shared-layout helpers --------
+
+    def _record_id(self, user_id: str, session_id: str) -> str:
+        if self.shared_collection:
+            return f"{user_id}{_ID_SEPARATOR}{session_id}"
+        return session_id
+
+    def _session_id(self, user_id: str, record_id: str) -> str:
+        if self.shared_collection:
+            return record_id[len(user_id) + len(_ID_SEPARATOR):]
+        return record_id
+
+    def _scoped_where(self, user_id: str, where: Optional[Dict]) -> Optional[Dict]:
+        if not self.shared_collection:
+            return where
+        scope = {USER_METADATA_KEY: user_id}
+        return {"$and": [scope, where]} if where else scope
+
+    def _public_metadata(self, metadata: Optional[Dict]) -> Optional[Dict]:
+        if metadata is None or not self.shared_collection:
+            return metadata
+        return {k: v for k, v in metadata.items() if k != USER_METADATA_KEY}
+
+    # -------- Write --------
+
+    def upsert_sessions(
+        self,
+        user_id: str,
+        ids: List[str],
+        embeddings: List[List[float]],
+        texts: List[str],
+        metadatas: List[Dict],
+        reduced: bool = False,
+    ):
+        """
+        Batched upsert, chunked to the backend's max batch size.
+        """
+        if not (len(ids) == len(embeddings) == len(texts) == len(metadatas)):
+            raise ValueError("ids, embeddings, texts and metadatas must be the same length")
+
+        collection = self.get_or_create_collection(user_id)
+        step = self.max_batch_size
+
+        if self.codec is not None and not reduced:
+            embeddings = self.codec.reduce(embeddings).tolist()
+
+        if self.shared_collection:
+            ids = [self._record_id(user_id, sid) for sid in ids]
+            metadatas = [{**(m or {}), USER_METADATA_KEY: user_id} for m in metadatas]
+
+        for i in range(0, len(ids), step):
+            collection.upsert(
+                ids=ids[i:i + step],
+                embeddings=embeddings[i:i + step],
+                documents=texts[i:i + step],
+                metadatas=metadatas[i:i + step],
+            )
+
+    # -------- Read --------
+
+    def query_similar_sessions_batch(
+        self,
+        user_id: str,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        where: Optional[Dict] = None,
+        include_metadata: bool = True,
+        include_documents: bool = False,
+    ) -> List[List[SimilarSession]]:
+        """
+        Searches many query embeddings in one call.
+        Returns one ranked hit list per query row, with distances and,
+        optionally, stored metadata and documents.
+        `where` is pushed down to the backend.
+        """
+        collection = self.get_or_create_collection(user_id)
+        space = (collection.metadata or {}).get("hnsw:space", "l2")
+        if space != DISTANCE_SPACE:
+            # Created before collections were cosine; its distances
+            # are not comparable with the other backends'.
+            raise ValueError(
+                f"Collection {collection.name} ranks by {space} distance, not "
+                f"{DISTANCE_SPACE}; copy it into a new store with migrate_vector_layout"
+            )
+        where = self._scoped_where(user_id, where)
+
+        include = ["distances"]
+        if include_metadata:
+            include.append("metadatas")
+        if include_documents:
+            include.append("documents")
+
+        if self.codec is not None:
+            query_embeddings = self.codec.reduce(query_embeddings)
+        if hasattr(query_embeddings, "tolist"):
+            query_embeddings = query_embeddings.tolist()
+
+        rows: List[List[SimilarSession]] = []
+        step = self.max_batch_size
+
+        for i in range(0, len(query_embeddings), step):
+            results = collection.query(
+                query_embeddings=query_embeddings[i:i + step],
+                n_results=top_k,
+                where=where,
+                include=include,
+            )
+            ids = results.get("ids") or []
+            distances = results.get("distances") or [[]] * len(ids)
+            metadatas = results.get("metadatas") or [None] * len(ids)
+            documents = results.get("documents") or [None] * len(ids)
+
+            for r, row_ids in enumerate(ids):
+                row_meta = metadatas[r] or [None] * len(row_ids)
+                row_docs = documents[r] or [None] * len(row_ids)
+                rows.append([
+                    SimilarSession(
+                        session_id=self._session_id(user_id, rid),
+                        distance=float(distances[r][j]),
+                        metadata=self._public_metadata(row_meta[j]),
+                        document=row_docs[j],
+                    )
+                    for j, rid in enumerate(row_ids)
+                ])
 
-        return results.get("ids", [[]])[0]
+        return rows
+
+    # -------- Export --------
+
+    def list_user_ids(self) -> List[str]:
+        if self.shared_collection:
+            collection = self.get_or_create_collection("")
+            users = set()
+            offset, step = 0, self.max_batch_size
+            while True:
+                page = collection.get(include=["metadatas"], limit=step, offset=offset)
+                metadatas = page.get("metadatas") or []
+                users.update(m[USER_METADATA_KEY] for m in metadatas if m)
+                if len(metadatas) < step:
+                    return sorted(users)
+                offset += step
+
+        prefix = "mindtrace_user_"
+        names = [getattr(c, "name", c) for c in self.client.list_collections()]
+        return sorted(n[len(prefix):] for n in names if n.startswith(prefix))
+
+    def iter_user_records(self, user_id: str, batch_size: Optional[int] = None):
+        collection = self.get_or_create_collection(user_id)
+        where = self._scoped_where(user_id, None)
+        step = batch_size or self.max_batch_size
+        offset = 0
+
+        while True:
+            page = collection.get(
+                where=where,
+                include=["embeddings", "documents", "metadatas"],
+                limit=step,
+                offset=offset,
+            )
+            ids = page.get("ids") or []
+            if not ids:
+                return
+            embeddings = page.get("embeddings")
+            yield (
+                [self._session_id(user_id, rid) for rid in ids],
+                [list(map(float, e)) for e in embeddings],
+                list(page.get("documents") or [None] * len(ids)),
+                [self._public_metadata(m) for m in (page.get("metadatas") or [None] * len(ids))],
+            )
+            if len(ids) < step:
+                return
+            offset += step
 
     # -------- Delete --------
 
     def delete_session(self, user_id: str, session_id: str):
         collection = self.get_or_create_collection(user_id)
-        collection.delete(ids=[session_id])
+        collection.delete(ids=[self._record_id(user_id, session_id)])
 
     def delete_user(self, user_id: str):
+        if self.shared_collection:
+            self.get_or_create_collection(user_id).delete(
+                where={USER_METADATA_KEY: user_id}
+            )
+            return
+        with self._collections_lock:
+            self._collections.pop(user_id, None)
         self.client.delete_collection(self._collection_name(user_id))
+
+
+def create_vector_store(backend: str = "chroma", **kwargs) -> VectorStoreBackend:
+    """
+    Builds a vector store by backend name: "chroma" or "flat".
+    """
+    if backend == "chroma":
+        return MindTraceVectorStore(**kwargs)
+    if backend == "flat":
+        from mindtrace.storage.flat_index import FlatVectorStore
+
+        return FlatVectorStore(**kwargs)
+    raise ValueError(f"Unknown vector store backend: {backend}")
+
+
+def _reduced_space(store: VectorStoreBackend) -> Optional[Dict]:
+    """
+    Identity of the space a store's vectors are reduced into; None when
+    it stores them unreduced.
+    """
+    codec = store.codec
+    if codec is None or codec.reducer is None:
+        return None
+    info = codec.describe()
+    return {key: info[key] for key in ("reducer", "dim", "fingerprint")}
+
+
+def migrate_vector_layout(
+    source: VectorStoreBackend,
+    target: VectorStoreBackend,
+    user_ids: Optional[Iterable[str]] = None,
+    batch_size: int = 1000,
+    delete_source: bool = False,
+) -> int:
+    """
+    Copies users' records from one store to another, e.g. between the
+    per-user and shared Chroma layouts, or into the flat backend.
+
+    Exported vectors are already reduced when the source has a
+    reducer, so the target must reduce into the same space; they are
+    then stored without reducing again. Vectors cannot be un-reduced,
+    so migrating out of a reduced space into any other raises
+    ValueError.
+
+    Returns the number of records copied.
+    """
+    source_space = _reduced_space(source)
+    if source_space is not None and source_space != _reduced_space(target):
+        raise ValueError(
+            f"Source vectors are reduced ({source_space}); the target codec "
+            f"must use the same reducer, not {_reduced_space(target)}"
+        )
+    reduced = source_space is not None
+
+    copied = 0
+    for user_id in (source.list_user_ids() if user_ids is None else user_ids):
+        for ids, embeddings, documents, metadatas in source.iter_user_records(
+            user_id, batch_size
+        ):
+            target.upsert_sessions(
+                user_id=user_id,
+                ids=ids,
+                embeddings=embeddings,
+                texts=documents,
+                metadatas=metadatas,
+                reduced=reduced,
+            )
+            copied += len(ids)
+        if delete_source:
+            source.delete_user(user_id)
+    return copied
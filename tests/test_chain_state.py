@@ -0,0 +1,214 @@
+import random
+from dataclasses import replace
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from mindtrace.analytics.aggregator import (
+    _average_coherence,
+    _group_by_confirmed_tag,
+    aggregate_patterns,
+)
+from mindtrace.analytics.chain_state import ChainStateStore
+from mindtrace.analytics.run_analytics import analyze_sessions
+from mindtrace.core.registry import HashingTestModel
+from mindtrace.core.types import Session
+from mindtrace.nlp.embeddings import EmbeddingMatrix, coherence_from_sum
+
+TAGS = ["work", "sleep", "family"]
+WORDS = [
+    "i", "me", "my", "not", "never", "always", "nothing", "every",
+    "today", "work", "tired", "better", "again", "why", "the", "plan",
+]
+DIM = 32
+STEPS = 150
+
+
+def _text(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(3, 14))
+    return " ".join(words) + rng.choice([".", "?", ". ?", ""])
+
+
+def _embeddings(rng: random.Random, session_ids, as_matrix: bool):
+    # One shared direction plus noise of varying scale, so chains land
+    # on both sides of the coherence threshold.
+    np_rng = np.random.default_rng(rng.randrange(2 ** 32))
+    base = np_rng.normal(size=DIM)
+    vectors = {
+        sid: base + np_rng.normal(scale=rng.choice([0.5, 0.5, 1.5]), size=DIM)
+        for sid in session_ids
+    }
+    if as_matrix:
+        return EmbeddingMatrix.from_dict(vectors)
+    # Legacy form: float64 lists.
+    return {sid: v.tolist() for sid, v in vectors.items()}
+
+
+def _key(observations):
+    return sorted(
+        (o.tag, tuple(o.session_ids), o.coherence, tuple(sorted(o.signals.items())), o.confidence)
+        for o in observations
+    )
+
+
+def _assert_matches(store: ChainStateStore, sessions, embeddings) -> int:
+    expected = aggregate_patterns(sessions, embeddings)
+    assert _key(store.observations()) == _key(expected)
+
+    # Raw coherence, before the 3-decimal rounding, must match too.
+    for tag, chain in _group_by_confirmed_tag(sessions).items():
+        state = store.chains[tag]
+        assert state.session_ids == [s.session_id for s in chain]
+        assert coherence_from_sum(state.total, len(state), state.nonzero) == (
+            _average_coherence(chain, embeddings)
+        )
+    assert set(store.chains) == set(_group_by_confirmed_tag(sessions))
+    return len(expected)
+
+
+@pytest.mark.parametrize("as_matrix", [True, False], ids=["matrix", "dict"])
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_state_matches_batch(tmp_path, seed, as_matrix):
+    rng = random.Random(seed)
+    t0 = datetime(2024, 1, 1)
+    ids = [f"s{i}" for i in range(STEPS)]
+    embeddings = _embeddings(rng, ids, as_matrix)
+
+    store = ChainStateStore("user", path=tmp_path)
+    sessions = []  # store order, current tags
+    unused = list(ids)
+    seen = 0
+
+    for _ in range(STEPS):
+        op = rng.random()
+        if op < 0.55 and unused:
+            sid = unused.pop(0)
+            # Coarse start times, so equal started_at is common.
+            started = t0 + timedelta(days=rng.randrange(20))
+            tags = rng.sample(TAGS, rng.choice([0, 1, 1, 2]))
+            session = Session(sid, started, started + timedelta(minutes=20), _text(rng), tags)
+            store.add_session(session, embeddings[sid])
+            sessions.append(session)
+        elif op < 0.8 and sessions:
+            i = rng.randrange(len(sessions))
+            tags = rng.sample(TAGS, rng.choice([0, 1, 2]))
+            store.update_tags(sessions[i], embeddings[sessions[i].session_id], tags)
+            sessions[i] = replace(sessions[i], confirmed_tags=tags)
+        elif op < 0.9 and sessions:
+            session = sessions.pop(rng.randrange(len(sessions)))
+            store.remove_session(session, embeddings[session.session_id])
+        else:
+            store.save()
+            store = ChainStateStore("user", path=tmp_path)
+
+        seen += _assert_matches(store, sessions, embeddings)
+
+    rebuilt = ChainStateStore("rebuilt", path=tmp_path)
+    rebuilt.rebuild(sessions, embeddings)
+    _assert_matches(rebuilt, sessions, embeddings)
+
+    # The run must have exercised chains that produce observations.
+    assert seen > 0
+
+
+def _ordered_key(observations):
+    return [
+        (o.tag, tuple(o.session_ids), o.coherence, tuple(sorted(o.signals.items())), o.confidence)
+        for o in observations
+    ]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_sync_matches_aggregate_patterns(tmp_path, seed):
+    rng = random.Random(seed)
+    t0 = datetime(2024, 1, 1)
+    ids = [f"s{i}" for i in range(STEPS)]
+    embeddings = _embeddings(rng, ids, as_matrix=bool(seed % 2))
+
+    store = ChainStateStore("user", path=tmp_path)
+    sessions = []
+    unused = list(ids)
+    seen = 0
+
+    for _ in range(STEPS // 2):
+        # Several edits between runs, as between two pipeline calls.
+        for _ in range(rng.randint(1, 4)):
+            op = rng.random()
+            if op < 0.6 and unused:
+                sid = unused.pop(0)
+                started = t0 + timedelta(days=rng.randrange(20))
+                tags = rng.sample(TAGS, rng.choice([0, 1, 1, 2]))
+                sessions.append(
+                    Session(sid, started, started + timedelta(minutes=20), _text(rng), tags)
+                )
+            elif op < 0.85 and sessions:
+                i = rng.randrange(len(sessions))
+                tags = rng.sample(TAGS, rng.choice([0, 1, 2]))
+                sessions[i] = replace(sessions[i], confirmed_tags=tags)
+            elif sessions:
+                sessions.pop(rng.randrange(len(sessions)))
+
+        expected = aggregate_patterns(sessions, embeddings)
+        assert _ordered_key(store.sync(sessions, embeddings)) == _ordered_key(expected)
+        seen += len(expected)
+        if rng.random() < 0.2:
+            store.save()
+            store = ChainStateStore("user", path=tmp_path)
+
+    assert seen > 0
+
+
+def test_sync_rebuilds_when_it_cannot_apply_changes(tmp_path):
+    rng = random.Random(7)
+    t0 = datetime(2024, 1, 1)
+    ids = [f"s{i}" for i in range(30)]
+    embeddings = _embeddings(rng, ids, as_matrix=True)
+    sessions = [
+        Session(sid, t0 + timedelta(days=i % 5), t0 + timedelta(days=i % 5, minutes=5),
+                _text(rng), ["work"])
+        for i, sid in enumerate(ids)
+    ]
+    store = ChainStateStore("user", path=tmp_path)
+    store.sync(sessions, embeddings)
+
+    # Reordered: equal start times now tie-break differently.
+    reordered = sessions[::-1]
+    assert _ordered_key(store.sync(reordered, embeddings)) == (
+        _ordered_key(aggregate_patterns(reordered, embeddings))
+    )
+
+    # A dropped session whose embedding is gone.
+    kept = reordered[1:]
+    partial = {s.session_id: embeddings[s.session_id] for s in kept}
+    assert _ordered_key(store.sync(kept, partial)) == (
+        _ordered_key(aggregate_patterns(kept, partial))
+    )
+    assert store.tracked_session_ids() == {s.session_id for s in kept}
+
+
+def test_analyze_sessions_with_chain_state(tmp_path):
+    rng = random.Random(3)
+    t0 = datetime(2024, 1, 1)
+    model = HashingTestModel(dim=DIM)
+    base = " ".join(rng.choices(WORDS, k=6))
+    sessions = [
+        Session(f"s{i}", t0 + timedelta(days=i), t0 + timedelta(days=i, minutes=5),
+                base + " " + _text(rng), [TAGS[i % 2]])
+        for i in range(24)
+    ]
+    store = ChainStateStore("user", path=tmp_path)
+
+    untagged = [replace(s, confirmed_tags=[]) for s in sessions[6:9]]
+    runs = [sessions[:12], sessions, sessions[:6] + untagged + sessions[9:]]
+    for batch in runs:
+        expected = analyze_sessions(batch, model)
+        assert _ordered_key(analyze_sessions(batch, model, chain_state=store)) == (
+            _ordered_key(expected)
+        )
+
+
+@pytest.mark.parametrize("user_id", ["", "..", "../x", "a/b", "a\\b"])
+def test_user_id_cannot_leave_the_state_directory(tmp_path, user_id):
+    with pytest.raises(ValueError):
+        ChainStateStore(user_id, path=tmp_path)
@@ -0,0 +1,72 @@
+import pytest
+
+from mindtrace.nlp.features import extract_features
+from mindtrace.nlp.text_analyzer import analyze_text
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        (
+            "I never get anything right. I always fail? Why do I always fail?",
+            {
+                "token_count": 13,
+                "unique_ratio": 9 / 13,
+                "repetition_score": 3 / 13,
+                "negation_freq": 1 / 13,
+                "certainty_freq": 3 / 13,
+                "question_ratio": 2 / 1,
+                "first_person_density": 3 / 13,
+            },
+        ),
+        (
+            # "can't" splits into "can" and "t", so it never counts as
+            # certainty; "nothingness" and "nobody" are not "nothing"/"no".
+            "My badge says nothingness; nobody can't know.",
+            {
+                "token_count": 8,
+                "unique_ratio": 1.0,
+                "repetition_score": 1 / 8,
+                "negation_freq": 0.0,
+                "certainty_freq": 0.0,
+                "question_ratio": 0.0,
+                "first_person_density": 1 / 8,
+            },
+        ),
+        (
+            "Not now... no, not ever!",
+            {
+                "token_count": 5,
+                "unique_ratio": 4 / 5,
+                "repetition_score": 2 / 5,
+                "negation_freq": 3 / 5,
+                "certainty_freq": 0.0,
+                "question_ratio": 0.0,
+                "first_person_density": 0.0,
+            },
+        ),
+        ("?!", {}),
+        ("", {}),
+    ],
+)
+def test_extract_features_is_pinned(text, expected):
+    features = extract_features(text)
+    assert features == expected
+    assert type(features.get("token_count", 0)) is int
+
+
+@pytest.mark.parametrize(
+    "text, sentiment, absolutist",
+    [
+        # Substrings used to match: "badge" scored as "bad" and
+        # "nothingness" as "nothing".
+        ("my badge shows nothingness", 0.0, False),
+        ("bad day, nothing helps", -0.4, True),
+        ("Feeling better, calm and happy; good progress", 1.0, False),
+        ("everything is bad but I am calm", 0.0, True),
+    ],
+)
+def test_ingestion_lexicons_match_whole_tokens(text, sentiment, absolutist):
+    analysis = analyze_text(text)
+    assert analysis.sentiment_score == pytest.approx(sentiment)
+    assert analysis.absolutist is absolutist
@@ -0,0 +1,73 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from mindtrace.core.memory_schemas import BehavioralMemory
+from mindtrace.core.pattern_replay import replay_columns, replay_patterns, replay_users
+from mindtrace.core.patterns import evaluate_patterns
+
+TIMELINES = 300
+MAX_LENGTH = 40
+USERS_PER_BATCH = 12
+
+# Threshold values themselves are over-represented, so >= / <= edges
+# are exercised.
+REPETITION = [0.0, 0.5, 0.7, 0.75, 0.8, 0.9, 1.0]
+SENTIMENT = [-1.0, -0.6, -0.3, -0.2, 0.0, 0.1, 0.3, 0.7]
+
+T0 = datetime(2024, 1, 1)
+
+
+def _memory(rng: random.Random, user_id: uuid.UUID, i: int) -> BehavioralMemory:
+    exact = rng.random() < 0.5
+    return BehavioralMemory(
+        entry_id=uuid.uuid4(),
+        user_id=user_id,
+        timestamp=T0 + timedelta(hours=i),
+        repetition_score=rng.choice(REPETITION) if exact else rng.random(),
+        sentiment_score=rng.choice(SENTIMENT) if exact else rng.uniform(-1, 1),
+        absolutist_language=rng.random() < 0.4,
+    )
+
+
+def _timeline(rng: random.Random):
+    user_id = uuid.uuid4()
+    return [_memory(rng, user_id, i) for i in range(rng.randrange(MAX_LENGTH))]
+
+
+def _mismatches(timeline, replay) -> int:
+    assert len(replay) == len(timeline)
+    return sum(
+        replay.result(i) != evaluate_patterns(timeline[:i], memory)
+        for i, memory in enumerate(timeline)
+    )
+
+
+def test_replay_patterns_matches_evaluate_patterns():
+    mismatches = 0
+    for seed in range(TIMELINES):
+        timeline = _timeline(random.Random(seed))
+        mismatches += _mismatches(timeline, replay_patterns(timeline))
+    assert mismatches == 0
+
+
+def test_replay_users_keeps_timelines_apart():
+    mismatches = 0
+    for seed in range(TIMELINES // USERS_PER_BATCH):
+        rng = random.Random(seed)
+        # Empty and short timelines sit between long ones, so any window
+        # leaking across a user boundary changes someone's results.
+        histories = {f"user-{k}": _timeline(rng) for k in range(USERS_PER_BATCH)}
+        histories["empty"] = []
+        replays = replay_users(histories)
+        assert list(replays) == list(histories)
+        for user_id, timeline in histories.items():
+            mismatches += _mismatches(timeline, replays[user_id])
+    assert mismatches == 0
+
+
+def test_replay_columns_rejects_mismatched_lengths():
+    with pytest.raises(ValueError, match="do not add up"):
+        replay_columns([0.5, 0.5], [0.0, 0.0], [False, False], lengths=[1])
@@ -0,0 +1,84 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from mindtrace.core.memory_schemas import BehavioralMemory
+from mindtrace.core.pattern_state import PatternState
+from mindtrace.core.patterns import evaluate_patterns
+from mindtrace.core.session_context import SessionContext
+
+TIMELINES = 300
+MAX_LENGTH = 40
+
+# Threshold values themselves are over-represented, so >= / <= edges
+# are exercised.
+REPETITION = [0.0, 0.5, 0.7, 0.75, 0.8, 0.9, 1.0]
+SENTIMENT = [-1.0, -0.6, -0.3, -0.2, 0.0, 0.1, 0.3, 0.7]
+
+USER = uuid.uuid4()
+T0 = datetime(2024, 1, 1)
+
+
+def _memory(rng: random.Random, i: int) -> BehavioralMemory:
+    exact = rng.random() < 0.5
+    return BehavioralMemory(
+        entry_id=uuid.uuid4(),
+        user_id=USER,
+        timestamp=T0 + timedelta(hours=i),
+        repetition_score=rng.choice(REPETITION) if exact else rng.random(),
+        sentiment_score=rng.choice(SENTIMENT) if exact else rng.uniform(-1, 1),
+        absolutist_language=rng.random() < 0.4,
+    )
+
+
+def _timeline(seed: int):
+    rng = random.Random(seed)
+    return [_memory(rng, i) for i in range(rng.randrange(MAX_LENGTH))]
+
+
+def test_observe_matches_evaluate_patterns():
+    mismatches = 0
+    for seed in range(TIMELINES):
+        timeline = _timeline(seed)
+        state = PatternState()
+        for i, memory in enumerate(timeline):
+            if i and i % 7 == 0:
+                state = PatternState.from_dict(state.to_dict())
+            if state.observe(memory) != evaluate_patterns(timeline[:i], memory):
+                mismatches += 1
+        assert state.count == len(timeline)
+        if timeline:
+            assert PatternState.from_history(timeline[:-1]).evaluate(timeline[-1]) == (
+                evaluate_patterns(timeline[:-1], timeline[-1])
+            )
+    assert mismatches == 0
+
+
+def _pattern_key(ctx: SessionContext):
+    return sorted((p.pattern_type, p.recurrence_level) for p in ctx.active_patterns)
+
+
+@pytest.mark.parametrize("seeded", [False, True], ids=["from-history", "carried"])
+def test_session_context_uses_pattern_state(seeded):
+    timeline = _timeline(1)
+    while len(timeline) < 12:
+        timeline = timeline + _timeline(len(timeline) + 2)
+    history, rest = timeline[:8], timeline[8:]
+
+    state = PatternState.from_history(history) if seeded else PatternState()
+    detected = False
+    for i, current in enumerate(rest):
+        past = history + rest[:i]
+        incremental = SessionContext.from_new_session(
+            USER, [], past, current, [], pattern_state=state,
+        )
+        full = SessionContext.from_new_session(USER, [], past, current, [])
+        assert _pattern_key(incremental) == _pattern_key(full)
+        detected = detected or bool(full.active_patterns)
+        assert incremental.build() | {"generated_at": None} == (
+            full.build() | {"generated_at": None}
+        )
+    assert state.count == len(timeline)
+    assert detected
@@ -0,0 +1,112 @@
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from mindtrace.core.memory_schemas import CognitivePattern
+from mindtrace.storage.pattern_store import CognitivePatternStore
+
+T0 = datetime(2024, 1, 1, 12, 0)
+
+
+def _store(tmp_path, **kwargs) -> CognitivePatternStore:
+    kwargs.setdefault("flush_interval", None)
+    return CognitivePatternStore(tmp_path, **kwargs)
+
+
+def _on_disk(tmp_path, user_id):
+    data = json.loads((tmp_path / f"{user_id}.json").read_text(encoding="utf-8"))
+    return {p["pattern_type"]: p for p in data["patterns"]}
+
+
+def test_upserts_flush_and_reload(tmp_path):
+    user = uuid.uuid4()
+    store = _store(tmp_path)
+    store.upsert(user, "spiral", "low", now=T0.replace(tzinfo=UTC))
+    store.upsert(user, "spiral", "medium", now=(T0 + timedelta(days=1)).replace(tzinfo=UTC))
+    store.upsert(user, "rumination", "low", now=T0.replace(tzinfo=UTC))
+    assert store.flush() == 1
+
+    reloaded = _store(tmp_path)
+    spiral = reloaded.get(user, "spiral")
+    assert spiral.recurrence_level == "medium"
+    assert spiral.first_detected == T0.replace(tzinfo=UTC)
+    assert {p.pattern_type for p in reloaded.patterns(user)} == {"spiral", "rumination"}
+
+
+def test_corrupt_file_is_moved_aside_and_rewritten(tmp_path, caplog):
+    user = uuid.uuid4()
+    (tmp_path / f"{user}.json").write_text('{"version": 1, "patterns": [{"pattern', encoding="utf-8")
+
+    store = _store(tmp_path)
+    assert store.patterns(user) == []
+    store.upsert(user, "spiral", "low")
+    assert store.flush() == 1
+
+    assert set(_on_disk(tmp_path, user)) == {"spiral"}
+    assert len(list(tmp_path.glob(f"{user}.json.corrupt-*"))) == 1
+    assert "Unreadable cognitive pattern file" in caplog.text
+
+
+def test_invalid_records_do_not_stop_the_flusher(tmp_path):
+    good, bad = uuid.uuid4(), uuid.uuid4()
+    store = _store(tmp_path, flush_interval=0.02)
+    store.upsert(bad, "spiral", "low")
+    # Another process leaves a file that parses but does not validate.
+    (tmp_path / f"{bad}.json").write_text(
+        json.dumps({"version": 1, "patterns": [{"pattern_type": "spiral"}]}), encoding="utf-8"
+    )
+    store.upsert(good, "rumination", "low")
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and not (
+        (tmp_path / f"{good}.json").exists() and not store._dirty
+    ):
+        time.sleep(0.02)
+    thread = store._thread
+    store.close()
+
+    assert thread is not None and not store._dirty
+    assert set(_on_disk(tmp_path, bad)) == {"spiral"}
+    assert set(_on_disk(tmp_path, good)) == {"rumination"}
+
+
+def test_merge_accepts_naive_and_aware_timestamps(tmp_path):
+    user = uuid.uuid4()
+    # Written by an older version, with naive timestamps.
+    old = CognitivePattern(
+        user_id=user,
+        pattern_type="spiral",
+        description="old",
+        recurrence_level="low",
+        first_detected=T0 - timedelta(days=3),
+        last_detected=T0 - timedelta(days=2),
+    )
+    (tmp_path / f"{user}.json").write_text(
+        json.dumps({"version": 1, "patterns": [old.model_dump(mode="json")]}), encoding="utf-8"
+    )
+
+    store = _store(tmp_path, flush_interval=None)
+    # A worker that had not loaded the user yet when the file was written.
+    store._users[str(user)] = {}
+    store.upsert(user, "spiral", "medium", now=T0.replace(tzinfo=UTC))
+    assert store.flush() == 1
+
+    merged = _on_disk(tmp_path, user)["spiral"]
+    assert merged["recurrence_level"] == "medium"
+    assert merged["pattern_id"] == str(old.pattern_id)
+    assert datetime.fromisoformat(merged["first_detected"]) == (
+        (T0 - timedelta(days=3)).replace(tzinfo=UTC)
+    )
+
+
+@pytest.mark.parametrize("user_id", ["", "..", "../x", "a/b", "a\\b"])
+def test_user_id_cannot_leave_the_store_directory(tmp_path, user_id):
+    store = _store(tmp_path)
+    with pytest.raises(ValueError):
+        store.upsert(user_id, "spiral", "low")
+    with pytest.raises(ValueError):
+        store.patterns(user_id)
+    assert not store._dirty
@@ -0,0 +1,56 @@
+import itertools
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from mindtrace.nlp.quantization import EmbeddingCodec, PCAReducer, evaluate_codec
+
+DIM = 16
+
+
+def _corpus(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+
+def _mean_pairwise(matrix) -> float:
+    # Zero rows have similarity 0 with everything but still count as
+    # chain members, as in the aggregator's chain coherence.
+    sims = []
+    for a, b in itertools.combinations(np.asarray(matrix, dtype=np.float64), 2):
+        norm = np.linalg.norm(a) * np.linalg.norm(b)
+        sims.append(a @ b / norm if norm else 0.0)
+    return float(np.mean(sims))
+
+
+def test_coherence_error_treats_zero_rows_like_the_aggregator():
+    corpus = _corpus(5)
+    # The reducer maps the row equal to its mean to an all-zero vector.
+    reducer = PCAReducer(np.eye(DIM, dtype=np.float32)[:4], corpus[0])
+    codec = EmbeddingCodec(reducer=reducer)
+    coded = codec.roundtrip(corpus)
+    assert not coded[0].any()
+
+    expected = abs(_mean_pairwise(corpus) - _mean_pairwise(coded))
+    report = evaluate_codec(codec, corpus)
+    assert report["coherence_error"] == pytest.approx(expected, abs=1e-9)
+
+
+def test_self_query_recall_samples_rows():
+    n = 2000
+    corpus = _corpus(n)
+
+    tracemalloc.start()
+    try:
+        report = evaluate_codec(
+            EmbeddingCodec("float16"), corpus, k=5, max_pairs=1000, max_queries=50
+        )
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # An n x n float64 similarity matrix alone would be 32 MB.
+    assert peak < n * n * 8 // 4
+    assert report["k"] == 5 and 0.9 <= report["recall_at_k"] <= 1.0
+
+    exact = evaluate_codec(EmbeddingCodec(), corpus[:200], k=5)
+    assert exact["recall_at_k"] == 1.0 and exact["coherence_error"] == 0.0
@@ -0,0 +1,100 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from mindtrace.core import registry
+from mindtrace.core.memory_ingestion import MemoryIngestor
+from mindtrace.core.registry import HashingTestModel
+from mindtrace.core.repetition import RepetitionTracker
+from mindtrace.nlp.embeddings import EmbeddingEncoder
+
+DIM = 8
+
+
+def _unit(i: int) -> np.ndarray:
+    v = np.zeros(DIM, dtype=np.float32)
+    v[i] = 1.0
+    return v
+
+
+def test_scores_against_recent_history():
+    tracker = RepetitionTracker(history=3)
+    assert tracker.score("u", _unit(0)) == 0.0
+    assert tracker.score("u", _unit(0) * 5) == pytest.approx(1.0)
+    assert tracker.score("u", _unit(1)) == 0.0
+    # Negative similarity is clamped to 0.
+    assert tracker.score("u", -_unit(1)) == 0.0
+    tracker.score("u", _unit(2))
+
+    # Both _unit(0) entries have now left the 3-entry window.
+    assert tracker.score("u", _unit(0), update=False) == 0.0
+    assert tracker.score("u", (_unit(1) + _unit(2)), update=False) == pytest.approx(2 ** -0.5)
+
+
+def test_mean_mode_and_update_flag():
+    tracker = RepetitionTracker(history=4, mode="mean")
+    tracker.score("u", _unit(0))
+    tracker.score("u", _unit(1))
+    assert tracker.score("u", _unit(0), update=False) == pytest.approx(0.5)
+    assert tracker.score("u", _unit(0), update=False) == pytest.approx(0.5)
+
+    with pytest.raises(ValueError):
+        RepetitionTracker(mode="median")
+
+
+def test_users_and_dimensions_are_separate():
+    tracker = RepetitionTracker()
+    tracker.score("a", _unit(0))
+    assert tracker.score("b", _unit(0)) == 0.0
+    # A new embedding size starts that user's history over.
+    assert tracker.score("a", np.ones(DIM * 2)) == 0.0
+    assert tracker.score("a", np.ones(DIM * 2)) == pytest.approx(1.0)
+
+
+def test_least_recently_scored_users_are_evicted():
+    tracker = RepetitionTracker(max_users=2)
+    tracker.score("a", _unit(0))
+    tracker.score("b", _unit(0))
+    tracker.score("a", _unit(1))  # "a" is now the most recent
+    tracker.score("c", _unit(0))  # evicts "b"
+
+    assert len(tracker) == 2
+    assert tracker.score("a", _unit(1), update=False) == pytest.approx(1.0)
+    assert tracker.score("b", _unit(0)) == 0.0  # history lost; "c" evicted now
+    assert tracker.score("c", _unit(0), update=False) == 0.0
+    assert len(tracker) == 2
+
+
+def test_ingest_scores_repeated_entries():
+    ingestor = MemoryIngestor(
+        uuid.uuid4(),
+        encoder=EmbeddingEncoder(HashingTestModel(dim=64)),
+        repetition_tracker=RepetitionTracker(),
+    )
+    _, first = ingestor.ingest("work again and again, always tired")
+    _, second = ingestor.ingest("work again and again, always tired")
+    _, other = ingestor.ingest("family dinner by the lake")
+    assert first.repetition_score == 0.0
+    assert second.repetition_score == pytest.approx(1.0)
+    assert other.repetition_score < 0.5
+
+
+def test_ingest_without_a_loadable_model_scores_zero(monkeypatch):
+    calls = []
+
+    def unavailable():
+        calls.append(1)
+        raise ModuleNotFoundError("No module named 'sentence_transformers'")
+
+    reg = registry.get_registry()
+    monkeypatch.setenv(registry.MODEL_ENV_VAR, "unavailable-test-model")
+    monkeypatch.setitem(reg._factories, "unavailable-test-model", unavailable)
+    monkeypatch.setattr(reg, "_unavailable", {})
+
+    ingestor = MemoryIngestor(uuid.uuid4(), repetition_tracker=RepetitionTracker())
+    for _ in range(3):
+        _, behavioral = ingestor.ingest("the same entry")
+        assert behavioral.repetition_score == 0.0
+    # The failed load is not retried on every ingest.
+    assert len(calls) == 1
@@ -0,0 +1,84 @@
+import os
+import shutil
+from datetime import datetime, timedelta
+
+import pytest
+
+from mindtrace.core.types import Session
+from mindtrace.storage import session_archive
+from mindtrace.storage.session_archive import SessionArchive, write_session_archive
+
+T0 = datetime(2024, 1, 1)
+
+
+def _sessions(prefix: str, n: int = 3):
+    return [
+        Session(
+            session_id=f"{prefix}{i}",
+            started_at=T0 + timedelta(hours=i),
+            ended_at=T0 + timedelta(hours=i, minutes=30),
+            text=f"{prefix} text {i}",
+            confirmed_tags=["work"] if i % 2 else [],
+            user_id="u1",
+        )
+        for i in range(n)
+    ]
+
+
+def _ids(path):
+    return [s.session_id for s in SessionArchive(path).iter_sessions()]
+
+
+def test_rewrites_publish_new_generations(tmp_path):
+    path = tmp_path / "archive"
+    assert write_session_archive(_sessions("a"), path) == 3
+    old = SessionArchive(path)
+    write_session_archive(_sessions("b", 2), path)
+    write_session_archive(_sessions("c", 4), path)
+
+    assert _ids(path) == ["c0", "c1", "c2", "c3"]
+    assert SessionArchive(path).load_sessions(tag="work")[0].text == "c text 1"
+    # Only the current and previous generations are kept; a handle on
+    # a pruned one still reads its mapped columns.
+    assert sorted(p.name for p in path.glob("gen-*")) == ["gen-1", "gen-2"]
+    assert [s.session_id for s in old.iter_sessions()] == ["a0", "a1", "a2"]
+
+
+def test_crash_before_publish_keeps_previous_archive(tmp_path, monkeypatch):
+    path = tmp_path / "archive"
+    write_session_archive(_sessions("a"), path)
+
+    real_replace = os.replace
+
+    def crash_on_current(src, dst):
+        if os.path.basename(dst) == "CURRENT":
+            raise KeyboardInterrupt("crash")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(session_archive.os, "replace", crash_on_current)
+    with pytest.raises(KeyboardInterrupt):
+        write_session_archive(_sessions("b"), path)
+    monkeypatch.undo()
+
+    assert _ids(path) == ["a0", "a1", "a2"]
+    # The generation renamed in but never published is skipped and cleaned up.
+    write_session_archive(_sessions("c", 1), path)
+    assert _ids(path) == ["c0"]
+    assert sorted(p.name for p in path.glob("gen-*")) == ["gen-0", "gen-2"]
+
+
+def test_reads_and_replaces_pre_generation_archive(tmp_path):
+    path = tmp_path / "archive"
+    write_session_archive(_sessions("a"), path)
+    # Lay gen-0 out the way archives were written before generations.
+    for entry in (path / "gen-0").iterdir():
+        shutil.move(str(entry), path / entry.name)
+    (path / "gen-0").rmdir()
+    (path / "CURRENT").unlink()
+
+    assert SessionArchive(path).generation is None
+    assert _ids(path) == ["a0", "a1", "a2"]
+
+    write_session_archive(_sessions("b"), path)
+    assert _ids(path) == ["b0", "b1", "b2"]
+    assert not (path / "manifest.json").exists()
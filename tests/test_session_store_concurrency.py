@@ -0,0 +1,122 @@
+import multiprocessing as mp
+import threading
+from datetime import datetime, timedelta
+
+from mindtrace.core.types import Session
+from mindtrace.storage.session_store import JsonLogSessionBackend
+
+PROCESSES = 4
+THREADS = 4
+SESSIONS_PER_THREAD = 25
+COMPACTIONS = 20
+
+T0 = datetime(2024, 1, 1)
+
+
+def _backend(directory) -> JsonLogSessionBackend:
+    return JsonLogSessionBackend(directory / "sessions.json", directory / "sessions.log")
+
+
+def _session_id(proc: int, thread: int, i: int) -> str:
+    return f"p{proc}-t{thread}-{i}"
+
+
+def _final_tags(proc: int, thread: int, i: int) -> list:
+    return [f"tag-{(proc + thread + i) % 3}", f"edit-{i}"]
+
+
+def _writer(directory, proc: int, thread: int) -> None:
+    backend = _backend(directory)
+    for i in range(SESSIONS_PER_THREAD):
+        sid = _session_id(proc, thread, i)
+        backend.append(Session(
+            session_id=sid,
+            started_at=T0 + timedelta(minutes=i),
+            ended_at=T0 + timedelta(minutes=i + 1),
+            text=f"entry {sid}",
+            confirmed_tags=[],
+            user_id=f"user-{proc}",
+        ))
+        backend.update_tags_many({sid: ["first"]})
+        backend.update_tags_many({sid: _final_tags(proc, thread, i)})
+        if i % 5 == 0:
+            # Partly consumed iterator, left open while others compact.
+            it = backend.iter_sessions(user_id=f"user-{proc}")
+            next(it, None)
+
+
+def _process(directory, proc: int) -> None:
+    threads = [
+        threading.Thread(target=_writer, args=(directory, proc, t))
+        for t in range(THREADS)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def _compactor(directory, stop: threading.Event) -> None:
+    backend = _backend(directory)
+    done = 0
+    while not stop.is_set() or done < COMPACTIONS:
+        backend.compact()
+        done += 1
+        stop.wait(0.01)
+
+
+def test_concurrent_appends_tag_edits_and_compactions(tmp_path):
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=_process, args=(tmp_path, p)) for p in range(PROCESSES)]
+    stop = threading.Event()
+    compactor = threading.Thread(target=_compactor, args=(tmp_path, stop))
+
+    compactor.start()
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=300)
+    stop.set()
+    compactor.join(timeout=300)
+
+    assert all(p.exitcode == 0 for p in procs)
+    assert not compactor.is_alive()
+
+    expected = {
+        _session_id(p, t, i): _final_tags(p, t, i)
+        for p in range(PROCESSES)
+        for t in range(THREADS)
+        for i in range(SESSIONS_PER_THREAD)
+    }
+
+    for check in (lambda b: b.load_all(), lambda b: list(b.iter_sessions())):
+        stored = {s.session_id: s.confirmed_tags for s in check(_backend(tmp_path))}
+        assert stored == expected
+
+    _backend(tmp_path).compact()
+    stored = {s.session_id: s.confirmed_tags for s in _backend(tmp_path).load_all()}
+    assert stored == expected
+
+
+def test_open_iterator_does_not_block_compaction(tmp_path):
+    backend = _backend(tmp_path)
+    for i in range(5):
+        backend.append(Session(
+            session_id=f"s{i}",
+            started_at=T0 + timedelta(minutes=i),
+            ended_at=T0 + timedelta(minutes=i + 1),
+            text="entry",
+            confirmed_tags=["a"],
+        ))
+
+    cold = _backend(tmp_path)
+    it = cold.iter_sessions(tag="a")
+    first = next(it)
+
+    # The open iterator must not hold the shared lock compaction waits on.
+    worker = threading.Thread(target=cold.compact, daemon=True)
+    worker.start()
+    worker.join(timeout=10)
+    assert not worker.is_alive()
+
+    assert [first.session_id] + [s.session_id for s in it] == [f"s{i}" for i in range(5)]
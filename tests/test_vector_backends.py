@@ -0,0 +1,107 @@
+import multiprocessing as mp
+
+import numpy as np
+import pytest
+
+from mindtrace.storage.flat_index import FlatIndex, FlatVectorStore
+from mindtrace.storage.vector_store import MindTraceVectorStore
+
+PROCESSES = 4
+UPSERTS_PER_PROCESS = 30
+DIM = 8
+
+
+def _vectors(n: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, DIM)).astype(np.float32)
+
+
+def _fill(store, vectors) -> None:
+    store.upsert_sessions(
+        "u1",
+        ids=[f"s{i}" for i in range(len(vectors))],
+        embeddings=vectors.tolist(),
+        texts=[f"text {i}" for i in range(len(vectors))],
+        metadatas=[{"i": i} for i in range(len(vectors))],
+    )
+
+
+@pytest.mark.parametrize("shared", [False, True], ids=["per-user", "shared"])
+def test_backends_agree_on_cosine_distance(tmp_path, shared):
+    pytest.importorskip("chromadb")
+    # Unnormalized on purpose: L2 and cosine rank these differently.
+    vectors = _vectors(30) * np.linspace(0.1, 10, 30, dtype=np.float32)[:, None]
+    queries = _vectors(5, seed=1) * 3
+
+    flat = FlatVectorStore(tmp_path / "flat")
+    chroma = MindTraceVectorStore(str(tmp_path / "chroma"), shared_collection=shared)
+    _fill(flat, vectors)
+    _fill(chroma, vectors)
+
+    expected = flat.query_similar_sessions_batch("u1", queries, top_k=5)
+    actual = chroma.query_similar_sessions_batch("u1", queries, top_k=5)
+    for want, got in zip(expected, actual):
+        assert [h.session_id for h in got] == [h.session_id for h in want]
+        np.testing.assert_allclose(
+            [h.distance for h in got], [h.distance for h in want], atol=1e-4
+        )
+
+
+def _writer(path, proc: int) -> None:
+    index = FlatIndex(path)
+    vectors = _vectors(UPSERTS_PER_PROCESS, seed=proc)
+    for i, vector in enumerate(vectors):
+        sid = f"p{proc}-{i}"
+        index.upsert([sid], [vector], [sid], [{"proc": proc}])
+        if i % 10 == 9:
+            index.delete([f"p{proc}-{i - 1}"])
+
+
+def test_processes_sharing_an_index_lose_no_rows(tmp_path):
+    path = tmp_path / "u1"
+    stale = FlatIndex(path)
+    stale.upsert(["seed"], _vectors(1, seed=99), ["seed"], [{}])
+
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=_writer, args=(path, p)) for p in range(PROCESSES)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+
+    expected = {"seed"} | {
+        f"p{p}-{i}"
+        for p in range(PROCESSES)
+        for i in range(UPSERTS_PER_PROCESS)
+        if i % 10 != 8
+    }
+    for index in (FlatIndex(path), stale):
+        ids, matrix, documents, _ = index.records()
+        assert set(ids) == expected and len(ids) == len(expected)
+        assert documents == ids
+        assert len(index) == len(expected)
+
+    # The stale handle writes on top of the others' rows, not over them.
+    stale.upsert(["late"], _vectors(1, seed=100), ["late"], [{}])
+    assert set(FlatIndex(path).records()[0]) == expected | {"late"}
+    hits = FlatIndex(path).search(_vectors(1, seed=100), top_k=1)
+    assert hits[0][0].session_id == "late" and hits[0][0].distance == pytest.approx(0, abs=1e-5)
+
+
+def test_shared_collection_keeps_user_and_session_ids_apart(tmp_path):
+    pytest.importorskip("chromadb")
+    store = MindTraceVectorStore(str(tmp_path / "chroma"), shared_collection=True)
+    vector = _vectors(1).tolist()
+    # "a" + "b::c" and "a::b" + "c" would share the record id "a::b::c".
+    store.upsert_sessions("a", ["b::c"], vector, ["t"], [{}])
+    with pytest.raises(ValueError, match="must not contain"):
+        store.upsert_sessions("a::b", ["c"], vector, ["t"], [{}])
+
+    hits = store.query_similar_sessions_batch("a", vector, top_k=5)
+    assert [h.session_id for h in hits[0]] == ["b::c"]
+    assert [ids for ids, *_ in store.iter_user_records("a")] == [["b::c"]]
+    with pytest.raises(ValueError):
+        store.query_similar_sessions_batch("a::b", vector)
+    with pytest.raises(ValueError):
+        store.delete_user("a::b")
+    assert store.list_user_ids() == ["a"]
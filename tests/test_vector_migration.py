@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from mindtrace.nlp.quantization import EmbeddingCodec, RandomProjection
+from mindtrace.storage.flat_index import FlatVectorStore
+from mindtrace.storage.vector_store import migrate_vector_layout
+
+DIM = 64
+REDUCED = 16
+
+
+def _codec(seed: int = 0) -> EmbeddingCodec:
+    return EmbeddingCodec("int8", RandomProjection(DIM, REDUCED, seed=seed))
+
+
+def _fill(store, users=("a", "b"), n=40):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(n, DIM)).astype(np.float32)
+    for user in users:
+        store.upsert_sessions(
+            user,
+            ids=[f"{user}{i}" for i in range(n)],
+            embeddings=vectors.tolist(),
+            texts=[f"text {i}" for i in range(n)],
+            metadatas=[{"i": i} for i in range(n)],
+        )
+    return vectors
+
+
+def _top(store, user, queries, k=5):
+    hits = store.query_similar_sessions_batch(user, queries, top_k=k, include_metadata=False)
+    return [[(h.session_id, round(h.distance, 4)) for h in row] for row in hits]
+
+
+def test_migration_with_reduced_codec_round_trips(tmp_path):
+    source = FlatVectorStore(tmp_path / "source", codec=_codec())
+    vectors = _fill(source)
+
+    target = FlatVectorStore(tmp_path / "target", codec=_codec())
+    assert migrate_vector_layout(source, target) == 80
+
+    # Stored once in the reduced space: same rows, same ranking.
+    for user in ("a", "b"):
+        src_ids, src_vecs, src_docs, src_meta = next(source.iter_user_records(user))
+        dst_ids, dst_vecs, dst_docs, dst_meta = next(target.iter_user_records(user))
+        assert dst_ids == src_ids and dst_docs == src_docs and dst_meta == src_meta
+        assert np.asarray(dst_vecs).shape == (40, REDUCED)
+        np.testing.assert_allclose(dst_vecs, src_vecs, atol=0.02)
+        assert [[sid for sid, _ in row] for row in _top(target, user, vectors[:8])] == (
+            [[sid for sid, _ in row] for row in _top(source, user, vectors[:8])]
+        )
+
+    # And back again, through a fresh handle on the migrated data.
+    back = FlatVectorStore(tmp_path / "back", codec=_codec())
+    migrate_vector_layout(FlatVectorStore(tmp_path / "target", codec=_codec()), back)
+    assert [h[0] for h in _top(back, "a", vectors[:1])[0]] == (
+        [h[0] for h in _top(source, "a", vectors[:1])[0]]
+    )
+
+
+def test_migration_out_of_reduced_space_is_rejected(tmp_path):
+    source = FlatVectorStore(tmp_path / "source", codec=_codec())
+    _fill(source)
+
+    for codec in (None, EmbeddingCodec("int8"), _codec(seed=1)):
+        target = FlatVectorStore(tmp_path / f"target-{id(codec)}", codec=codec)
+        with pytest.raises(ValueError):
+            migrate_vector_layout(source, target)
+        assert target.list_user_ids() == []
+
+
+def test_migration_into_reduced_space_reduces_once(tmp_path):
+    source = FlatVectorStore(tmp_path / "source")
+    vectors = _fill(source, users=("a",))
+
+    target = FlatVectorStore(tmp_path / "target", codec=_codec())
+    migrate_vector_layout(source, target)
+    direct = FlatVectorStore(tmp_path / "direct", codec=_codec())
+    _fill(direct, users=("a",))
+
+    assert _top(target, "a", vectors[:8]) == _top(direct, "a", vectors[:8])